@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Callable
 from typing import Any
 
 _SECTION_SEPARATOR = "\n\n---\n\n"
@@ -14,57 +18,75 @@ class SystemPrompt:
     to append named blocks (skills summary, tool hints, etc.).  Call `build()`
     to get the final string, or pass the instance directly to `build_messages`.
 
+    The base and sections are stable by default. Sections added with
+    ``cacheable=False`` (dates, per-request state) are rendered after all
+    stable ones, so the stable prefix stays byte-identical across requests
+    and providers can serve it from their prompt cache.
+
     Example::
 
         system = (
             SystemPrompt(base="You are a concise assistant.")
             .add_section("Available Skills", skills_xml)
+            .add_section("Today", date.today().isoformat(), cacheable=False)
         )
         msgs = build_messages(system, history)
     """
 
     def __init__(self, base: str | None = None) -> None:
         self._base = base or ""
-        self._sections: list[tuple[str, str]] = []
+        self._sections: list[tuple[str, str, bool]] = []
 
-    def add_section(self, heading: str, content: str) -> "SystemPrompt":
+    def add_section(
+        self, heading: str, content: str, cacheable: bool = True
+    ) -> "SystemPrompt":
         """Append a named section to the system prompt.
 
         Sections with empty content are silently skipped at build time.
         Returns self to allow chaining.
         """
-        self._sections.append((heading, content))
+        self._sections.append((heading, content, cacheable))
         return self
 
     def build(self) -> str | None:
-        """Assemble all parts into a single string.
+        """Assemble all parts into a single string, stable parts first.
 
         Returns None when there is nothing to render (no base, no sections
         with content), so callers can treat it the same as a missing prompt.
         """
-        parts: list[str] = []
-        if self._base:
-            parts.append(self._base)
-        for heading, content in self._sections:
-            if content and content.strip():
-                parts.append(f"# {heading}\n\n{content}")
+        parts = [p for p in self.build_parts() if p]
         if not parts:
             return None
         return _SECTION_SEPARATOR.join(parts)
 
+    def build_parts(self) -> tuple[str | None, str | None]:
+        """Render the stable prefix and the per-request remainder separately."""
+        stable: list[str] = [self._base] if self._base else []
+        volatile: list[str] = []
+        for heading, content, cacheable in self._sections:
+            if content and content.strip():
+                part = f"# {heading}\n\n{content}"
+                (stable if cacheable else volatile).append(part)
+        return (
+            _SECTION_SEPARATOR.join(stable) or None,
+            _SECTION_SEPARATOR.join(volatile) or None,
+        )
+
 
 def build_messages(
     system: SystemPrompt | str | None,
     history: list[dict[str, Any]],
 ) -> list[dict[str, Any]]:
-    """Return a new messages list, prepending a system message if provided."""
+    """Return a new messages list, prepending the system prompt if provided.
+
+    A `SystemPrompt` with per-request sections becomes two system messages,
+    the stable prefix first, so providers can cache the first one on its own.
+    """
     if isinstance(system, SystemPrompt):
-        system_str = system.build()
+        parts = [p for p in system.build_parts() if p]
     else:
-        system_str = system
-    messages = []
-    if system_str:
-        messages.append({"role": "system", "content": system_str})
+        parts = [system] if system else []
+    messages = [{"role": "system", "content": part} for part in parts]
     messages.extend(history)
     return messages
 
@@ -90,3 +112,188 @@ def add_tool_results(
 ) -> None:
     """Append tool result messages (role=tool) to the messages list."""
     messages.extend(results)
+
+
+TokenCounter = Callable[[dict[str, Any]], int]
+
+_ELIDED_TOOL_RESULT = "[Tool output elided to fit the context window ({chars} chars)]"
+
+
+def estimate_tokens(message: dict[str, Any]) -> int:
+    """Cheap tokenizer-free estimate: ~4 characters per token plus framing."""
+    return len(json.dumps(message, ensure_ascii=False, default=str)) // 4 + 4
+
+
+class TokenCounts:
+    """LRU cache of message token counts, keyed by a hash of the message content.
+
+    Share one per model (and token counter) between `ContextBudget`s, so the
+    earlier messages of a conversation are not recounted on every request.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._counts: OrderedDict[bytes, int] = OrderedDict()
+
+    def get(self, message: dict[str, Any], counter: TokenCounter) -> int:
+        key = hashlib.blake2b(
+            json.dumps(message, sort_keys=True, default=str).encode(), digest_size=16
+        ).digest()
+        tokens = self._counts.get(key)
+        if tokens is not None:
+            self._counts.move_to_end(key)
+            return tokens
+        tokens = self._counts[key] = counter(message)
+        if len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+        return tokens
+
+
+class ContextBudget:
+    """Keeps the messages sent to the provider within a token budget.
+
+    `fit()` remembers the counts of the list it returned. Leading messages
+    that are still the same objects next time reuse their counts, so
+    re-checking a growing history only counts the messages appended since.
+    Messages are assumed not to change in place once counted; `fit()` itself
+    replaces the messages it elides. Other messages are looked up in
+    `token_counts`, when given, before being counted.
+
+    When the history is over budget, `fit()` trims it in three passes, stopping
+    as soon as it fits:
+
+    1. Elide the content of tool results in earlier turns.
+    2. Drop the oldest turns (a user message and everything up to the next one),
+       so a tool call is never separated from its result.
+    3. Elide tool results in the current turn, oldest first, keeping the most
+       recent batch.
+
+    The system messages and the current turn are never dropped.
+
+    Args:
+        max_tokens: Input token budget for the model.
+        token_counter: Counts one message; defaults to `estimate_tokens`.
+        token_counts: Counts shared across budgets for the same model.
+
+    Example::
+
+        budget = ContextBudget(max_tokens=128_000)
+        report = budget.fit(messages, reserved=tool_tokens)
+        if report:
+            ...  # messages was trimmed in place
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        token_counter: TokenCounter | None = None,
+        token_counts: TokenCounts | None = None,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self._count = token_counter or estimate_tokens
+        self._token_counts = token_counts
+        # (message, tokens) for the list the last `fit()` returned.
+        self._counted: list[tuple[dict[str, Any], int]] = []
+
+    def count(self, message: dict[str, Any]) -> int:
+        """Return the token count for one message, from `token_counts` when possible."""
+        if self._token_counts is None:
+            return self._count(message)
+        return self._token_counts.get(message, self._count)
+
+    def _counts(self, messages: list[dict[str, Any]]) -> list[int]:
+        counts: list[int] = []
+        for message, (counted, tokens) in zip(messages, self._counted, strict=False):
+            if message is not counted:
+                break
+            counts.append(tokens)
+        counts.extend(self.count(m) for m in messages[len(counts) :])
+        return counts
+
+    def fit(
+        self, messages: list[dict[str, Any]], reserved: int = 0
+    ) -> dict[str, Any] | None:
+        """Trim `messages` in place to fit the budget.
+
+        Args:
+            messages: OpenAI-format messages, optionally starting with system messages.
+            reserved: Tokens already spoken for, e.g. the tool schemas.
+
+        Returns:
+            A report of what was trimmed, or None if nothing had to change.
+        """
+        budget = self.max_tokens - reserved
+        counts = self._counts(messages)
+        total = sum(counts)
+        if total <= budget:
+            self._counted = list(zip(messages, counts, strict=True))
+            return None
+
+        tokens_before = total
+        pinned = 0
+        while pinned < len(messages) and messages[pinned].get("role") == "system":
+            pinned += 1
+        turns = _split_turns(messages, pinned)
+        dropped = 0
+        elided = 0
+
+        def elide(turn: list[int], keep_last_batch: bool) -> None:
+            nonlocal total, elided
+            tool_indices = [i for i in turn if messages[i].get("role") == "tool"]
+            if keep_last_batch:
+                # The trailing run of tool messages answers the latest tool calls.
+                while tool_indices and tool_indices[-1] == turn[-1]:
+                    turn = turn[:-1]
+                    tool_indices.pop()
+            for i in tool_indices:
+                if total <= budget:
+                    return
+                content = messages[i].get("content")
+                if not isinstance(content, str) or content.startswith(
+                    "[Tool output elided"
+                ):
+                    continue
+                messages[i] = {
+                    **messages[i],
+                    "content": _ELIDED_TOOL_RESULT.format(chars=len(content)),
+                }
+                new_count = self.count(messages[i])
+                total += new_count - counts[i]
+                counts[i] = new_count
+                elided += 1
+
+        for turn in turns[:-1]:
+            elide(turn, keep_last_batch=False)
+
+        while total > budget and len(turns) > 1:
+            turn = turns.pop(0)
+            total -= sum(counts[i] for i in turn)
+            dropped += len(turn)
+
+        if total > budget and turns:
+            elide(turns[-1], keep_last_batch=True)
+
+        keep = set(range(pinned))
+        for turn in turns:
+            keep.update(turn)
+        self._counted = [(m, counts[i]) for i, m in enumerate(messages) if i in keep]
+        messages[:] = [m for m, _ in self._counted]
+
+        return {
+            "budget": self.max_tokens,
+            "tokensBefore": tokens_before + reserved,
+            "tokensAfter": total + reserved,
+            "droppedMessages": dropped,
+            "elidedToolResults": elided,
+            "fits": total <= budget,
+        }
+
+
+def _split_turns(messages: list[dict[str, Any]], start: int) -> list[list[int]]:
+    """Group message indices into turns, each starting at a user message."""
+    turns: list[list[int]] = []
+    for i in range(start, len(messages)):
+        if not turns or messages[i].get("role") == "user":
+            turns.append([])
+        turns[-1].append(i)
+    return turns
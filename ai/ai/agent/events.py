@@ -66,6 +66,10 @@ class FilePart:
 class DataPart:
     data_type: str  # used as suffix in "data-{data_type}"
     data: dict[str, Any]
+    # Parts with the same id replace each other on the client; transient parts are
+    # shown while streaming but not kept in the message.
+    id: str | None = None
+    transient: bool = False
 
 
 @dataclass
@@ -80,6 +84,12 @@ class ToolInputDelta:
     input_text_delta: str
 
 
+@dataclass
+class ToolInputPartial:
+    tool_call_id: str
+    input: Any  # best-effort parse of the arguments streamed so far
+
+
 @dataclass
 class ToolInputAvailable:
     tool_call_id: str
@@ -132,6 +142,7 @@ AgentEvent = Union[
     DataPart,
     ToolInputStart,
     ToolInputDelta,
+    ToolInputPartial,
     ToolInputAvailable,
     ToolOutputAvailable,
     StartStep,
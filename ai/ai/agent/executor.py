@@ -0,0 +1,145 @@
+"""Tool-call scheduling for a single agent iteration."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Mapping
+from typing import Any, Self
+
+from ai.agent.metrics import RunTimings
+from ai.agent.tools.base import Tool
+
+
+class ToolExecutor:
+    """Runs the tool calls of one model turn as asyncio tasks.
+
+    Calls are started with `submit()` and collected either one at a time with
+    `wait()` or in completion order with `as_completed()`. A semaphore caps how
+    many calls execute at once; with ``max_concurrency=1`` calls run strictly in
+    submission order, which is how the sequential agent loop uses it.
+
+    Always call `aclose()` (or use ``async with``) so unfinished calls are
+    cancelled when the iteration is abandoned.
+
+    With `timings`, each finished call is recorded as a ``tool`` timing that
+    covers execution only, not the wait for a concurrency slot.
+
+    Example::
+
+        async with ToolExecutor(tools, max_concurrency=4) as executor:
+            for call in calls:
+                executor.submit(call.id, call.name, call.arguments)
+            async for call_id, result in executor.as_completed(ids):
+                ...
+    """
+
+    def __init__(
+        self,
+        tools: Mapping[str, Tool],
+        max_concurrency: int | None = None,
+        timings: RunTimings | None = None,
+        iteration: int | None = None,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._tools = tools
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+        self._tasks: dict[str, asyncio.Task[str]] = {}
+        self._timings = timings
+        self._iteration = iteration
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def submit(
+        self, tool_call_id: str, tool_name: str, arguments: dict[str, Any]
+    ) -> None:
+        """Start executing a tool call. Submitting the same id twice is a no-op."""
+        if tool_call_id in self._tasks:
+            return
+        self._tasks[tool_call_id] = asyncio.create_task(
+            self._run(tool_call_id, tool_name, arguments),
+            name=f"tool:{tool_name}:{tool_call_id}",
+        )
+
+    def is_submitted(self, tool_call_id: str) -> bool:
+        return tool_call_id in self._tasks
+
+    async def wait(self, tool_call_id: str) -> str:
+        """Return a submitted call's result, re-raising its exception if it failed."""
+        return await self._tasks[tool_call_id]
+
+    async def as_completed(
+        self, tool_call_ids: list[str]
+    ) -> AsyncGenerator[tuple[str, str], None]:
+        """Yield ``(tool_call_id, result)`` pairs as the given calls finish."""
+        by_task = {self._tasks[call_id]: call_id for call_id in tool_call_ids}
+        pending = set(by_task)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            # asyncio.wait returns an unordered set; keep submission order for ties
+            for task in sorted(done, key=lambda t: tool_call_ids.index(by_task[t])):
+                yield by_task[task], task.result()
+
+    async def discard(self, tool_call_id: str) -> None:
+        """Cancel a submitted call and forget it so the id can be submitted again."""
+        task = self._tasks.pop(tool_call_id, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancel any unfinished calls and wait for them to unwind."""
+        for task in self._tasks.values():
+            task.cancel()
+        # Also collects exceptions of calls that were never awaited (e.g. a
+        # speculative call whose stream failed) so asyncio does not log them.
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _run(
+        self, tool_call_id: str, tool_name: str, arguments: dict[str, Any]
+    ) -> str:
+        if self._semaphore is None:
+            return await self._timed_call(tool_call_id, tool_name, arguments)
+        async with self._semaphore:
+            return await self._timed_call(tool_call_id, tool_name, arguments)
+
+    async def _timed_call(
+        self, tool_call_id: str, tool_name: str, arguments: dict[str, Any]
+    ) -> str:
+        started = time.perf_counter()
+        try:
+            result = await self._call(tool_name, arguments)
+        except Exception:
+            self._record(tool_call_id, tool_name, started, error=True)
+            raise
+        self._record(tool_call_id, tool_name, started, error=False)
+        return result
+
+    def _record(
+        self, tool_call_id: str, tool_name: str, started: float, error: bool
+    ) -> None:
+        if self._timings is None:
+            return
+        self._timings.since(
+            "tool",
+            started,
+            self._iteration,
+            toolName=tool_name,
+            toolCallId=tool_call_id,
+            error=error,
+        )
+
+    async def _call(self, tool_name: str, arguments: dict[str, Any]) -> str:
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            return f"Tool '{tool_name}' not found."
+        return await tool.call(arguments)
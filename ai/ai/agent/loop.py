@@ -3,14 +3,18 @@
 from __future__ import annotations
 
 import json
+import logging
+import time
 import uuid
 from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from typing import Any
 
 from ai.agent import context
-from ai.agent.context import SystemPrompt
+from ai.agent.context import ContextBudget, SystemPrompt
 from ai.agent.events import (
     AgentEvent,
+    DataPart,
     Error,
     Finish,
     TextDelta,
@@ -18,11 +22,21 @@ from ai.agent.events import (
     TextStart,
     ToolInputAvailable,
     ToolInputDelta,
+    ToolInputPartial,
     ToolInputStart,
     ToolOutputAvailable,
 )
+from ai.agent.executor import ToolExecutor
+from ai.agent.metrics import RunTimings
+from ai.agent.results import ReadToolResult, ToolResultStore
 from ai.agent.tools.base import Tool
-from ai.providers.base import LLMProvider
+from ai.agent.tools.catalog import ToolCatalog
+from ai.providers.base import LLMProvider, Usage
+from ai.utils.json_stream import IncrementalJSONParser
+
+logger = logging.getLogger(__name__)
+
+_PARTIAL_EVERY_FRAGMENT_BELOW = 4096
 
 
 class AgentLoop:
@@ -33,21 +47,74 @@ class AgentLoop:
         loop = AgentLoop(provider=my_provider, tools=[MyTool()], model="gpt-4o")
         async for event in loop.run(messages):
             ...  # handle AgentEvent instances
+
+    ``tools`` may also be a prebuilt `ToolCatalog`, which skips collecting the
+    tool schemas when the same tools are used for many runs.
+
+    With ``parallel_tool_calls=True`` the tool calls of a single model turn run
+    concurrently (at most ``max_concurrent_tools`` at a time, unbounded when
+    None). `ToolOutputAvailable` events are emitted as each call finishes, while
+    the tool-result messages are still appended in the order the model issued
+    the calls so the history sent to the provider stays deterministic.
+
+    With ``speculative_tool_calls=True`` a tool call starts executing as soon as
+    its argument JSON is complete, while the model is still streaming later
+    calls or trailing text. Only the start time changes: events are emitted,
+    results appended and errors raised exactly as on the non-speculative path.
+
+    With ``partial_tool_inputs=True`` a `ToolInputPartial` carrying the
+    best-effort parsed input follows `ToolInputDelta` while arguments stream.
+
+    With a `ContextBudget` the messages are trimmed to fit it before every
+    provider call, and each trim is reported as a ``context-trim`` `DataPart`.
+
+    With ``max_tool_result_chars`` set, tool outputs above that size are kept in
+    a per-run `ToolResultStore`: the model gets a head/tail preview plus a
+    handle, and a built-in ``read_tool_result`` tool to page through the rest.
+    `ToolOutputAvailable` still carries the full output.
+
+    Latency is recorded into ``timings`` (a fresh `RunTimings` per run when
+    None): time to first token and stream duration per iteration, each tool
+    call, and the whole run. Pass a `RunTimings` with hooks to feed a metrics
+    collector; with ``emit_timings=True`` the records are also sent as a
+    ``timings`` `DataPart` just before `Finish` (or the final `Error`).
+
+    Token usage reported by the provider is summed over the iterations of the
+    current run in `usage`, which stays valid if the run is cancelled.
     """
 
     def __init__(
         self,
         provider: LLMProvider,
-        tools: list[Tool],
+        tools: list[Tool] | ToolCatalog,
         model: str,
         system: SystemPrompt | str | None = None,
         max_iterations: int = 10,
+        parallel_tool_calls: bool = False,
+        max_concurrent_tools: int | None = None,
+        speculative_tool_calls: bool = False,
+        partial_tool_inputs: bool = False,
+        context_budget: ContextBudget | None = None,
+        max_tool_result_chars: int | None = None,
+        timings: RunTimings | None = None,
+        emit_timings: bool = False,
     ) -> None:
         self.provider = provider
         self.model = model
         self.system = system
         self.max_iterations = max_iterations
-        self._tools: dict[str, Tool] = {t.name: t for t in tools}
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_concurrent_tools = max_concurrent_tools
+        self.speculative_tool_calls = speculative_tool_calls
+        self.partial_tool_inputs = partial_tool_inputs
+        self.context_budget = context_budget
+        self.max_tool_result_chars = max_tool_result_chars
+        self.timings = timings
+        self.emit_timings = emit_timings
+        self.usage = Usage()
+        self.catalog = (
+            tools if isinstance(tools, ToolCatalog) else ToolCatalog.build(tools)
+        )
 
     async def run(
         self,
@@ -61,114 +128,253 @@ class AgentLoop:
         Yields:
             Typed AgentEvent instances (TextDelta, ToolInputDelta, Finish, …).
         """
-        tool_schemas = [t.to_schema() for t in self._tools.values()]
+        run_started = time.perf_counter()
+        self.usage = Usage()
+        timings = self.timings if self.timings is not None else RunTimings()
+        catalog = self.catalog
+        result_store: ToolResultStore | None = None
+        if self.max_tool_result_chars is not None:
+            result_store = ToolResultStore(self.max_tool_result_chars)
+            catalog = catalog.extend([ReadToolResult(result_store)])
+
+        tool_schemas = list(catalog.schemas)
         msgs = context.build_messages(self.system, messages)
+        concurrency = self.max_concurrent_tools if self.parallel_tool_calls else 1
+        schema_tokens = (
+            sum(self.context_budget.count(s) for s in tool_schemas)
+            if self.context_budget
+            else 0
+        )
+
+        for iteration in range(self.max_iterations):
+            if self.context_budget is not None:
+                report = self.context_budget.fit(msgs, reserved=schema_tokens)
+                if report:
+                    yield DataPart(data_type="context-trim", data=report)
 
-        for _ in range(self.max_iterations):
             text_started = False
             text_id: str | None = None
             text_content = ""
 
-            # tool_calls_state: index → {id, name, arguments}
+            # tool_calls_state: index → {id, name, arguments (parser), started, …}
             tool_calls_state: dict[int, dict[str, Any]] = {}
 
             finish_reason: str | None = None
 
-            async for chunk in self.provider.stream(msgs, tool_schemas, self.model):
-                if chunk.finish_reason:
-                    finish_reason = chunk.finish_reason
-
-                if chunk.content:
-                    if not text_started:
-                        text_id = str(uuid.uuid4())
-                        yield TextStart(id=text_id)
-                        text_started = True
-                    text_content += chunk.content
-                    yield TextDelta(id=text_id, delta=chunk.content)
-
-                for tc in chunk.tool_calls:
-                    state = tool_calls_state.setdefault(
-                        tc.index,
-                        {"id": None, "name": None, "arguments": "", "started": False},
-                    )
-                    if tc.id:
-                        state["id"] = tc.id
-                    if tc.name:
-                        state["name"] = tc.name
-                    if tc.arguments:
-                        state["arguments"] += tc.arguments
-
-                    if state["id"] and state["name"] and not state["started"]:
-                        yield ToolInputStart(
-                            tool_call_id=state["id"],
-                            tool_name=state["name"],
-                        )
-                        state["started"] = True
-
-                    if state["started"] and tc.arguments:
-                        yield ToolInputDelta(
-                            tool_call_id=state["id"],
-                            input_text_delta=tc.arguments,
+            # Closing the provider stream explicitly releases its connection as
+            # soon as the run is cancelled or abandoned, not when it is collected.
+            stream_started = time.perf_counter()
+            first_token = False
+            usage: Usage | None = None
+            async with (
+                ToolExecutor(
+                    catalog.tools, concurrency, timings, iteration
+                ) as executor,
+                aclosing(
+                    self.provider.stream(msgs, tool_schemas, self.model)
+                ) as stream,
+            ):
+                async for chunk in stream:
+                    if not first_token and (chunk.content or chunk.tool_calls):
+                        first_token = True
+                        timings.since("ttft", stream_started, iteration)
+
+                    if chunk.finish_reason:
+                        finish_reason = chunk.finish_reason
+                    if chunk.usage is not None:
+                        # Providers report cumulative usage; keep the latest.
+                        usage = chunk.usage
+
+                    if chunk.content:
+                        if not text_started:
+                            text_id = str(uuid.uuid4())
+                            yield TextStart(id=text_id)
+                            text_started = True
+                        text_content += chunk.content
+                        yield TextDelta(id=text_id, delta=chunk.content)
+
+                    for tc in chunk.tool_calls:
+                        state = tool_calls_state.setdefault(
+                            tc.index,
+                            {
+                                "id": None,
+                                "name": None,
+                                "arguments": IncrementalJSONParser(),
+                                "started": False,
+                                "speculated": False,
+                                "dispatched": None,
+                                "partial_size": 0,
+                            },
                         )
-
-            if text_started and text_id:
-                yield TextEnd(id=text_id)
-
-            if not tool_calls_state:
-                yield Finish(finish_reason=finish_reason or "stop")
-                return
-
-            # Execute tool calls and collect results
-            assistant_tool_calls: list[dict[str, Any]] = []
-            tool_result_messages: list[dict[str, Any]] = []
-
-            for state in tool_calls_state.values():
-                tool_call_id = state["id"]
-                tool_name = state["name"]
-                arguments_str = state["arguments"]
-
-                if not tool_call_id:
-                    continue
-
-                try:
-                    arguments = json.loads(arguments_str)
-                except json.JSONDecodeError:
-                    arguments = {}
-
-                assistant_tool_calls.append(
-                    {
-                        "id": tool_call_id,
-                        "type": "function",
-                        "function": {"name": tool_name, "arguments": arguments_str},
+                        if tc.id:
+                            state["id"] = tc.id
+                        if tc.name:
+                            state["name"] = tc.name
+                        if tc.arguments:
+                            state["arguments"].feed(tc.arguments)
+
+                        if state["id"] and state["name"] and not state["started"]:
+                            yield ToolInputStart(
+                                tool_call_id=state["id"],
+                                tool_name=state["name"],
+                            )
+                            state["started"] = True
+
+                        if state["started"] and tc.arguments:
+                            yield ToolInputDelta(
+                                tool_call_id=state["id"],
+                                input_text_delta=tc.arguments,
+                            )
+                            if self.partial_tool_inputs and _partial_due(state):
+                                yield ToolInputPartial(
+                                    tool_call_id=state["id"],
+                                    input=state["arguments"].partial(),
+                                )
+
+                        if self.speculative_tool_calls and state["arguments"].complete:
+                            self._dispatch(executor, state)
+
+                # Prompt tokens and how many of them the provider served from its
+                # prompt cache.
+                cache_usage = {}
+                if usage is not None:
+                    self.usage += usage
+                    cache_usage = {
+                        "promptTokens": usage.prompt_tokens,
+                        "cachedTokens": usage.cached_tokens,
                     }
-                )
+                timings.since("stream", stream_started, iteration, **cache_usage)
 
-                yield ToolInputAvailable(
-                    tool_call_id=tool_call_id,
-                    tool_name=tool_name,
-                    input=arguments,
-                )
+                if text_started and text_id:
+                    yield TextEnd(id=text_id)
 
-                tool = self._tools.get(tool_name)
-                if tool:
-                    result = await tool.call(arguments)
+                if not tool_calls_state:
+                    timings.since("run", run_started)
+                    if self.emit_timings:
+                        yield DataPart(
+                            data_type="timings", data={"records": timings.to_list()}
+                        )
+                    yield Finish(finish_reason=finish_reason or "stop")
+                    return
+
+                # Execute tool calls and collect results
+                assistant_tool_calls: list[dict[str, Any]] = []
+                tool_result_messages: list[dict[str, Any]] = []
+                calls: list[tuple[str, str, dict[str, Any]]] = []
+
+                for state in tool_calls_state.values():
+                    tool_call_id = state["id"]
+                    tool_name = state["name"]
+                    arguments_str = state["arguments"].text
+
+                    if not tool_call_id:
+                        continue
+
+                    arguments = _parse_arguments(tool_name, state["arguments"])
+                    if (
+                        state["dispatched"] is not None
+                        and state["dispatched"] != arguments
+                    ):
+                        # Speculation ran on arguments that did not survive to the
+                        # end of the stream; run the call again with the final ones.
+                        await executor.discard(tool_call_id)
+
+                    assistant_tool_calls.append(
+                        {
+                            "id": tool_call_id,
+                            "type": "function",
+                            "function": {"name": tool_name, "arguments": arguments_str},
+                        }
+                    )
+                    calls.append((tool_call_id, tool_name, arguments))
+
+                results: dict[str, str] = {}
+                if self.parallel_tool_calls:
+                    for tool_call_id, tool_name, arguments in calls:
+                        yield ToolInputAvailable(
+                            tool_call_id=tool_call_id,
+                            tool_name=tool_name,
+                            input=arguments,
+                        )
+                        executor.submit(tool_call_id, tool_name, arguments)
+                    async for tool_call_id, result in executor.as_completed(
+                        [call[0] for call in calls]
+                    ):
+                        results[tool_call_id] = result
+                        yield ToolOutputAvailable(
+                            tool_call_id=tool_call_id, output=result
+                        )
                 else:
-                    result = f"Tool '{tool_name}' not found."
-
-                yield ToolOutputAvailable(tool_call_id=tool_call_id, output=result)
+                    for tool_call_id, tool_name, arguments in calls:
+                        yield ToolInputAvailable(
+                            tool_call_id=tool_call_id,
+                            tool_name=tool_name,
+                            input=arguments,
+                        )
+                        executor.submit(tool_call_id, tool_name, arguments)
+                        result = await executor.wait(tool_call_id)
+                        results[tool_call_id] = result
+                        yield ToolOutputAvailable(
+                            tool_call_id=tool_call_id, output=result
+                        )
 
+            for tool_call_id, tool_name, _ in calls:
+                content = results[tool_call_id]
+                if result_store is not None and tool_name != ReadToolResult.name:
+                    content = result_store.elide(content)
                 tool_result_messages.append(
                     {
                         "role": "tool",
                         "tool_call_id": tool_call_id,
                         "name": tool_name,
-                        "content": result,
+                        "content": content,
                     }
                 )
 
             context.add_assistant_turn(msgs, text_content or None, assistant_tool_calls)
             context.add_tool_results(msgs, tool_result_messages)
 
+        timings.since("run", run_started)
+        if self.emit_timings:
+            yield DataPart(data_type="timings", data={"records": timings.to_list()})
         yield Error(
             error_text=f"Reached maximum iterations ({self.max_iterations}) without finishing."
         )
+
+    def _dispatch(self, executor: ToolExecutor, state: dict[str, Any]) -> None:
+        """Start a streamed tool call early once its argument JSON has closed."""
+        if state["speculated"] or not (state["id"] and state["name"]):
+            return
+        state["speculated"] = True
+        try:
+            arguments = state["arguments"].value()
+        except json.JSONDecodeError:
+            return  # trailing garbage; the call runs after the stream as usual
+        state["dispatched"] = arguments
+        executor.submit(state["id"], state["name"], arguments)
+
+
+def _parse_arguments(tool_name: str, parser: IncrementalJSONParser) -> dict[str, Any]:
+    try:
+        return parser.value()
+    except json.JSONDecodeError:
+        logger.warning(
+            "Malformed arguments for tool '%s' (%d chars); calling it with {}",
+            tool_name,
+            parser.size,
+        )
+        return {}
+
+
+def _partial_due(state: dict[str, Any]) -> bool:
+    """Throttle partial-input events so large arguments stay linear to stream.
+
+    Small inputs get a partial after every fragment; past a few KB one is only
+    emitted once the input has grown by a quarter since the last one.
+    """
+    size = state["arguments"].size
+    last = state["partial_size"]
+    if size > _PARTIAL_EVERY_FRAGMENT_BELOW and size - last < last // 4:
+        return False
+    state["partial_size"] = size
+    return True
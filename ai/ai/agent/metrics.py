@@ -0,0 +1,90 @@
+"""Latency records for agent runs."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Timing:
+    """One measured stage of a run.
+
+    `name` is one of ``ttft`` (time to first token of an iteration),
+    ``stream`` (full provider stream of an iteration), ``tool`` (one tool
+    call), ``mcp_setup`` (connecting to one MCP server) or ``run`` (the whole
+    agent loop).
+    """
+
+    name: str
+    duration_ms: float
+    iteration: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "name": self.name,
+            "durationMs": round(self.duration_ms, 3),
+        }
+        if self.iteration is not None:
+            data["iteration"] = self.iteration
+        data.update(self.attributes)
+        return data
+
+
+MetricsHook = Callable[[Timing], None]
+
+
+class RunTimings:
+    """Collects the `Timing` records of one run and forwards each to hooks.
+
+    Hooks are called synchronously as records are made, so they should be
+    cheap (append to a buffer, update a histogram). A failing hook is logged
+    and never breaks the run.
+
+    Example::
+
+        timings = RunTimings(hooks=[collector.record])
+        started = time.perf_counter()
+        ...
+        timings.since("mcp_setup", started, server="files")
+    """
+
+    def __init__(self, hooks: Iterable[MetricsHook] = ()) -> None:
+        self.hooks = list(hooks)
+        self.records: list[Timing] = []
+
+    def record(
+        self,
+        name: str,
+        duration_ms: float,
+        iteration: int | None = None,
+        **attributes: Any,
+    ) -> Timing:
+        timing = Timing(name, duration_ms, iteration, attributes)
+        self.records.append(timing)
+        for hook in self.hooks:
+            try:
+                hook(timing)
+            except Exception:
+                logger.exception("Metrics hook %r failed", hook)
+        return timing
+
+    def since(
+        self,
+        name: str,
+        started: float,
+        iteration: int | None = None,
+        **attributes: Any,
+    ) -> Timing:
+        """Record the time elapsed since `started` (a `time.perf_counter()` value)."""
+        duration_ms = (time.perf_counter() - started) * 1000
+        return self.record(name, duration_ms, iteration, **attributes)
+
+    def to_list(self) -> list[dict[str, Any]]:
+        return [t.to_dict() for t in self.records]
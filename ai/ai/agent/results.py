@@ -0,0 +1,82 @@
+"""Per-run store for oversized tool outputs, with a tool to page through them."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+from ai.agent.tools.base import Tool
+
+_ELIDED_NOTICE = (
+    "\n\n[... {omitted} of {total} characters omitted. The full output is stored "
+    "as handle '{handle}'; call read_tool_result with this handle and an offset "
+    "to read the rest ...]\n\n"
+)
+
+
+class ToolResultStore:
+    """Keeps tool outputs above a size threshold out of the prompt.
+
+    `elide()` stores an oversized output and returns a head/tail preview that
+    names a handle; everything else passes through unchanged. The model reads
+    the stored output on demand with the `ReadToolResult` tool, so a single
+    large ``read_file`` or ``run_bash`` result is not re-sent on every later
+    iteration.
+
+    Args:
+        threshold: Outputs longer than this many characters are stored.
+        preview_chars: Characters kept from the head and from the tail.
+    """
+
+    def __init__(self, threshold: int, preview_chars: int | None = None) -> None:
+        self.threshold = threshold
+        self.preview_chars = preview_chars or max(threshold // 4, 1)
+        self._results: dict[str, str] = {}
+
+    def get(self, handle: str) -> str | None:
+        return self._results.get(handle)
+
+    def elide(self, output: str) -> str:
+        """Return `output` unchanged, or store it and return a preview with a handle."""
+        if len(output) <= self.threshold:
+            return output
+        handle = f"result-{len(self._results) + 1}"
+        self._results[handle] = output
+        head = output[: self.preview_chars]
+        tail = output[-self.preview_chars :]
+        notice = _ELIDED_NOTICE.format(
+            omitted=len(output) - len(head) - len(tail),
+            total=len(output),
+            handle=handle,
+        )
+        return head + notice + tail
+
+
+class ReadToolResult(Tool):
+    """Read part of a tool output that was too large to show in full.
+
+    Use the handle from the truncation notice. Returns characters from
+    `offset` onward, up to `limit`, followed by the offset to continue from.
+    """
+
+    class Input(BaseModel):
+        handle: str = Field(description="Handle from the truncation notice")
+        offset: int = Field(0, ge=0, description="Character offset to start from")
+        limit: int | None = Field(
+            None, ge=1, description="Maximum characters to return"
+        )
+
+    def __init__(self, store: ToolResultStore) -> None:
+        self._store = store
+
+    async def execute(self, input: Input) -> str:
+        output = self._store.get(input.handle)
+        if output is None:
+            return f"No stored result with handle '{input.handle}'."
+        # Pages must themselves fit under the threshold or they would be elided.
+        limit = min(input.limit or self._store.threshold, self._store.threshold)
+        end = min(input.offset + limit, len(output))
+        page = output[input.offset : end]
+        total = len(output)
+        if end >= total:
+            return f"{page}\n\n[end of result, {total} characters]"
+        return f"{page}\n\n[chars {input.offset}-{end} of {total}; next offset {end}]"
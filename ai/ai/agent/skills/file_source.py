@@ -35,7 +35,8 @@ class FileSkillSource(SkillSource):
 
     Each skill lives in its own subdirectory and contains a SKILL.md with
     YAML frontmatter (``name``, ``description``) followed by the skill body.
-    The frontmatter ``name`` must match the directory name.
+    The frontmatter ``name`` must match the directory name. The directory is
+    read on every call until `preload()` keeps its skills in memory.
 
     Args:
         skills_dir: Directory containing skill subdirectories.
@@ -49,9 +50,32 @@ class FileSkillSource(SkillSource):
 
     def __init__(self, skills_dir: Path | None = None) -> None:
         self._dir = skills_dir or _DEFAULT_SKILLS_DIR
+        self._skills: list[Skill] | None = None
+        self._bodies: dict[str, str | None] = {}
+
+    def preload(self) -> int:
+        """Read every skill once and serve later calls from memory.
+
+        Returns the number of skills loaded.
+        """
+        skills = self._read_metadata()
+        self._bodies = {skill.name: self._read_content(skill.name) for skill in skills}
+        self._skills = skills
+        return len(skills)
 
     def list_metadata(self) -> list[Skill]:
         """Return metadata for all valid skills in the directory."""
+        if self._skills is not None:
+            return list(self._skills)
+        return self._read_metadata()
+
+    def load_content(self, name: str) -> str | None:
+        """Return body content for the named skill, or None if not found."""
+        if self._skills is not None:
+            return self._bodies.get(name)
+        return self._read_content(name)
+
+    def _read_metadata(self) -> list[Skill]:
         if not self._dir.is_dir():
             return []
 
@@ -73,8 +97,7 @@ class FileSkillSource(SkillSource):
 
         return skills
 
-    def load_content(self, name: str) -> str | None:
-        """Return body content for the named skill, or None if not found."""
+    def _read_content(self, name: str) -> str | None:
         skill_file = self._dir / name / "SKILL.md"
         if not skill_file.is_file():
             return None
@@ -48,9 +48,11 @@ class SkillsLoader:
     def build_summary_xml(self) -> str:
         """Return an ``<available_skills>`` XML block for the system prompt.
 
-        Lists all available skills with their names and descriptions.
+        Lists all available skills with their names and descriptions, sorted
+        by name so the block is identical across requests (and cacheable)
+        whatever order the sources return them in.
         """
-        skills = self.list_metadata()
+        skills = sorted(self.list_metadata(), key=lambda skill: skill.name)
         parts: list[str] = []
         for skill in skills:
             parts.append(
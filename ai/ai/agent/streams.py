@@ -0,0 +1,158 @@
+"""Stages that wrap an agent event stream."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+
+from ai.agent.events import (
+    AgentEvent,
+    ReasoningDelta,
+    TextDelta,
+    ToolInputDelta,
+)
+
+_DONE = object()
+_TIMEOUT = object()
+
+Delta = TextDelta | ToolInputDelta | ReasoningDelta
+
+
+class _Pump:
+    """Drives an event generator from a dedicated task into a one-slot queue.
+
+    Context managers inside the generator (anyio cancel scopes in MCP sessions
+    in particular) must be entered and exited in the same task. That is not
+    guaranteed when a generator is advanced from different tasks or cancelled
+    from another one, so stages that need timeouts pump the stream instead of
+    awaiting `__anext__` under a timeout.
+    """
+
+    def __init__(self, events: AsyncGenerator[AgentEvent, None], name: str) -> None:
+        self._queue: asyncio.Queue[object] = asyncio.Queue(maxsize=1)
+        self._task = asyncio.create_task(self._run(events), name=name)
+        self._getter: asyncio.Future[object] | None = None
+
+    async def _run(self, events: AsyncGenerator[AgentEvent, None]) -> None:
+        async with aclosing(events):
+            async for event in events:
+                await self._queue.put(event)
+        await self._queue.put(_DONE)
+
+    async def _next(self) -> object:
+        """The next queued event, or the run's failure once none are left."""
+        get = asyncio.ensure_future(self._queue.get())
+        try:
+            await asyncio.wait({get, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not get.done():
+                get.cancel()
+        if get.done() and not get.cancelled():
+            return get.result()
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        # The task ended without queueing `_DONE`, so it raised.
+        return self._task.exception()
+
+    async def get(self, timeout: float | None = None) -> object:
+        """Return the next event, `_DONE`, or `_TIMEOUT`; re-raise a failure."""
+        if self._getter is None:
+            self._getter = asyncio.ensure_future(self._next())
+        done, _ = await asyncio.wait({self._getter}, timeout=timeout)
+        if not done:
+            return _TIMEOUT
+        item, self._getter = self._getter.result(), None
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    async def aclose(self) -> None:
+        """Cancel the run if it is still going and wait for it to unwind."""
+        if self._getter is not None:
+            self._getter.cancel()
+        if not self._task.done():
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+async def coalesce_deltas(
+    events: AsyncGenerator[AgentEvent, None],
+    max_delay: float = 0.015,
+    max_chars: int = 2048,
+) -> AsyncGenerator[AgentEvent, None]:
+    """Merge consecutive deltas of the same part into fewer, larger events.
+
+    Runs of `TextDelta`, `ReasoningDelta` or `ToolInputDelta` with the same id
+    are concatenated. A merged delta is released when a different event
+    arrives (which is then passed through unchanged), when it reaches
+    `max_chars`, or `max_delay` seconds after its first piece arrived, so the
+    added latency is bounded even when the model pauses mid-answer.
+    """
+    pump = _Pump(events, "coalesce-deltas")
+    pending: Delta | None = None
+    deadline = 0.0
+    try:
+        while True:
+            timeout = None if pending is None else max(0.0, deadline - time.monotonic())
+            item = await pump.get(timeout)
+            if item is _TIMEOUT:
+                assert pending is not None
+                yield pending
+                pending = None
+                continue
+            if item is _DONE:
+                if pending is not None:
+                    yield pending
+                return
+
+            merged = _merge(pending, item) if pending is not None else None
+            if merged is not None:
+                pending = merged
+            else:
+                if pending is not None:
+                    yield pending
+                    pending = None
+                if not isinstance(item, Delta):
+                    yield item  # type: ignore[misc]
+                    continue
+                pending = item
+                deadline = time.monotonic() + max_delay
+            if _size(pending) >= max_chars:
+                yield pending
+                pending = None
+    finally:
+        await pump.aclose()
+
+
+def _merge(pending: Delta, item: object) -> Delta | None:
+    """Return `pending` extended by `item`, or None if they are different parts."""
+    if (
+        isinstance(pending, TextDelta)
+        and isinstance(item, TextDelta)
+        and pending.id == item.id
+    ):
+        return TextDelta(id=pending.id, delta=pending.delta + item.delta)
+    if (
+        isinstance(pending, ReasoningDelta)
+        and isinstance(item, ReasoningDelta)
+        and pending.id == item.id
+    ):
+        return ReasoningDelta(id=pending.id, delta=pending.delta + item.delta)
+    if (
+        isinstance(pending, ToolInputDelta)
+        and isinstance(item, ToolInputDelta)
+        and pending.tool_call_id == item.tool_call_id
+    ):
+        return ToolInputDelta(
+            tool_call_id=pending.tool_call_id,
+            input_text_delta=pending.input_text_delta + item.input_text_delta,
+        )
+    return None
+
+
+def _size(delta: Delta) -> int:
+    if isinstance(delta, ToolInputDelta):
+        return len(delta.input_text_delta)
+    return len(delta.delta)
@@ -4,9 +4,12 @@ from __future__ import annotations
 
 import inspect
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Hashable
 from typing import Any, ClassVar
 
 from pydantic import BaseModel
+from ai.agent.tools.cache import ToolResultCache, cache_key
+from ai.agent.tools.runtime import ToolRuntime
 from ai.utils.text import camel_to_snake_case
 
 
@@ -19,6 +22,16 @@ class Tool(ABC):
     `name` defaults to the snake_case class name; `description` defaults to
     the class docstring. Both can be overridden as class variables.
 
+    Tools whose output depends only on their input can set ``cacheable = True``
+    (and optionally ``cache_ttl`` in seconds). Their results are then shared
+    through `result_cache`, keyed by `cache_scope`, name and validated input,
+    and identical concurrent calls run once. Replace `Tool.result_cache` to
+    change the cache for all tools, or set it per class.
+
+    Tools that call HTTP APIs use `runtime`, a shared `ToolRuntime` with a
+    pooled client, an HTTP cache and per-host limits. Replace `Tool.runtime`
+    to configure it for all tools, or set it per class or instance.
+
     Example::
 
         class GetWeather(Tool):
@@ -34,6 +47,12 @@ class Tool(ABC):
 
     name: ClassVar[str]
     description: ClassVar[str]
+    _schema: ClassVar[dict[str, Any] | None] = None
+
+    cacheable: ClassVar[bool] = False
+    cache_ttl: ClassVar[float | None] = None
+    result_cache: ClassVar[ToolResultCache] = ToolResultCache()
+    runtime: ClassVar[ToolRuntime] = ToolRuntime()
 
     class Input(BaseModel):
         """Override to define the tool's input parameters."""
@@ -51,16 +70,58 @@ class Tool(ABC):
 
     async def call(self, args: dict[str, Any]) -> str:
         """Validate `args` against `Input` and call `execute`."""
-        return await self.execute(self.Input.model_validate(args))
+        input = self.Input.model_validate(args)
+        if not self.cacheable:
+            return await self.execute(input)
+        return await self._call_cached(
+            input.model_dump(mode="json"), lambda: self.execute(input)
+        )
+
+    @property
+    def cache_scope(self) -> Hashable:
+        """Separates cache entries of same-named tools that may answer differently."""
+        return None
+
+    async def _call_cached(
+        self, arguments: Any, run: Callable[[], Awaitable[str]]
+    ) -> str:
+        return await self.result_cache.get_or_call(
+            cache_key(self.name, arguments, self.cache_scope),
+            run,
+            ttl=self.cache_ttl,
+            store=self._should_cache,
+        )
+
+    def _should_cache(self, output: str) -> bool:
+        """Override to keep outputs such as error messages out of the cache."""
+        return True
+
+    @property
+    def schema_key(self) -> Hashable:
+        """Identifies this tool's schema: tools with equal keys have equal schemas."""
+        return type(self)
 
     def to_schema(self) -> dict[str, Any]:
-        """Return an OpenAI function-calling tool schema."""
-        schema = self.Input.model_json_schema()
+        """Return an OpenAI function-calling tool schema.
+
+        The schema only depends on the class, so it is generated once per class
+        and shared between instances; treat it as read-only.
+        """
+        cls = type(self)
+        cached = cls.__dict__.get("_schema")
+        if cached is None:
+            cached = cls._build_schema()
+            cls._schema = cached
+        return cached
+
+    @classmethod
+    def _build_schema(cls) -> dict[str, Any]:
+        schema = cls.Input.model_json_schema()
         return {
             "type": "function",
             "function": {
-                "name": self.name,
-                "description": self.description,
+                "name": cls.name,
+                "description": cls.description,
                 "parameters": {
                     "type": "object",
                     "properties": schema.get("properties", {}),
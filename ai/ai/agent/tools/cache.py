@@ -0,0 +1,148 @@
+"""Result cache for tools whose output depends only on their arguments."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+def cache_key(tool_name: str, arguments: Any, scope: Hashable = None) -> Hashable:
+    """Key for a call: scope, tool name and the arguments as canonical JSON."""
+    canonical = json.dumps(
+        arguments,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return (scope, tool_name, canonical)
+
+
+def _scope_of(key: Hashable) -> Hashable:
+    return key[0] if isinstance(key, tuple) and len(key) == 3 else None
+
+
+class ToolResultCache:
+    """LRU cache of tool outputs with per-entry TTL and in-flight coalescing.
+
+    Concurrent `get_or_call()` calls for a key that is already executing wait
+    for that execution instead of starting their own, whether or not the
+    result will be stored. The shared execution is cancelled only once every
+    caller waiting on it has been cancelled. Exceptions are never cached.
+
+    Args:
+        max_entries: Least recently used entries are evicted beyond this size.
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        # key -> (expires_at or None, output)
+        self._entries: OrderedDict[Hashable, tuple[float | None, str]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future[str]] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def invalidate(self, scope: Hashable) -> None:
+        """Drop the entries of `scope` (see `cache_key`), e.g. after a write.
+
+        Calls of that scope still running are not stored when they finish, and
+        later calls do not wait for them.
+        """
+        for key in [k for k in self._entries if _scope_of(k) == scope]:
+            del self._entries[key]
+        for key in [k for k in self._inflight if _scope_of(k) == scope]:
+            del self._inflight[key]
+
+    async def get_or_call(
+        self,
+        key: Hashable,
+        call: Callable[[], Awaitable[str]],
+        ttl: float | None = None,
+        store: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Return the cached output for `key`, or run `call` and cache its output.
+
+        Args:
+            key: Cache key, e.g. from `cache_key()`.
+            call: Produces the output on a miss.
+            ttl: Seconds to keep the output; None keeps it until evicted, and 0
+                only coalesces concurrent calls without storing the output.
+            store: Optional predicate; outputs it rejects are not stored.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, output = entry
+            if expires_at is None or expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return output
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t, ttl, store))
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            # Shielded so one waiter being cancelled does not cancel the others.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _finish(
+        self,
+        key: Hashable,
+        task: asyncio.Future[str],
+        ttl: float | None,
+        store: Callable[[str], bool] | None,
+    ) -> None:
+        if self._inflight.get(key) is not task:
+            return  # invalidated while running
+        del self._inflight[key]
+        if task.cancelled() or task.exception() is not None or ttl == 0:
+            return
+        output = task.result()
+        if store is not None and not store(output):
+            return
+        expires_at = None if ttl is None else self._clock() + ttl
+        self._entries[key] = (expires_at, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
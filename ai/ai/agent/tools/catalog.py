@@ -0,0 +1,67 @@
+"""Immutable set of tools with their provider schemas precomputed."""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from ai.agent.tools.base import Tool
+
+
+@dataclass(frozen=True)
+class ToolCatalog:
+    """Tools by name plus the schema list sent to the provider.
+
+    `AgentLoop` accepts a catalog in place of a tool list so the schemas are
+    not rebuilt on every run. Tool instances are often bound to per-request
+    state (a DB session, an MCP session), so a long-lived catalog is reused
+    through `rebind()`: it swaps in the new instances and keeps the schemas as
+    long as every tool's `schema_key` is unchanged.
+
+    Example::
+
+        catalog = ToolCatalog.build(tools)
+        ...
+        catalog = catalog.rebind(tools_for_next_request)
+    """
+
+    tools: Mapping[str, Tool]
+    schemas: tuple[dict[str, Any], ...]
+    signature: tuple[Hashable, ...]
+
+    @classmethod
+    def build(cls, tools: Iterable[Tool]) -> ToolCatalog:
+        """Build a catalog; later tools replace earlier ones with the same name."""
+        by_name = {t.name: t for t in tools}
+        return cls(
+            tools=MappingProxyType(by_name),
+            schemas=tuple(t.to_schema() for t in by_name.values()),
+            signature=tuple(t.schema_key for t in by_name.values()),
+        )
+
+    def rebind(self, tools: Iterable[Tool]) -> ToolCatalog:
+        """Return a catalog for `tools`; schemas are kept if the signature matches."""
+        by_name = {t.name: t for t in tools}
+        signature = tuple(t.schema_key for t in by_name.values())
+        if signature != self.signature:
+            return ToolCatalog.build(by_name.values())
+        return ToolCatalog(MappingProxyType(by_name), self.schemas, signature)
+
+    def extend(self, tools: Iterable[Tool]) -> ToolCatalog:
+        """Return a catalog with `tools` added (or replacing tools of the same name)."""
+        added = {t.name: t for t in tools}
+        if any(name in self.tools for name in added):
+            return ToolCatalog.build([*self.tools.values(), *added.values()])
+        return ToolCatalog(
+            tools=MappingProxyType({**self.tools, **added}),
+            schemas=self.schemas + tuple(t.to_schema() for t in added.values()),
+            signature=self.signature + tuple(t.schema_key for t in added.values()),
+        )
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.tools
@@ -0,0 +1,246 @@
+"""Shared HTTP runtime for tools: pooled client, HTTP cache and per-host limits."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+# Not replayed from the cache: the stored body is already decoded.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# Requests carrying these are never served from or stored in the shared cache.
+_CREDENTIAL_HEADERS = ("authorization", "proxy-authorization", "cookie")
+
+
+def _cache_control(headers: httpx.Headers) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else None
+    return directives
+
+
+def freshness(headers: httpx.Headers, default_ttl: float | None) -> float | None:
+    """Seconds a response may be reused, or None if it must not be stored.
+
+    ``Cache-Control: no-store``, ``no-cache`` (which would need revalidation)
+    and ``private`` (the cache is shared by every user), and ``Vary: *``, are
+    not stored. Otherwise ``max-age`` applies, then
+    ``Expires``, then `default_ttl` for responses without either, less the
+    response's ``Age``.
+    """
+    directives = _cache_control(headers)
+    if directives.keys() & {"no-store", "no-cache", "private"}:
+        return None
+    if headers.get("vary", "").strip() == "*":
+        return None
+    ttl: float | None = default_ttl
+    max_age = directives.get("max-age")
+    if max_age is not None:
+        try:
+            ttl = float(max_age)
+        except ValueError:
+            return None
+    elif "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"])
+            date = parsedate_to_datetime(headers["date"]) if "date" in headers else None
+        except (TypeError, ValueError):
+            return None
+        ttl = (
+            (expires - date).total_seconds()
+            if date
+            else expires.timestamp() - time.time()
+        )
+    if ttl is None:
+        return None
+    try:
+        ttl -= float(headers.get("age", 0))
+    except ValueError:
+        pass
+    return ttl if ttl > 0 else None
+
+
+class HTTPCache:
+    """LRU cache of successful GET responses, fresh for their `freshness`.
+
+    Responses are keyed by URL and all request headers, so requests that differ
+    in a header (``Accept``, ``Accept-Language``, ...) never share an entry,
+    whatever the response's ``Vary`` says. Requests with credentials
+    (``Authorization``, ``Cookie``) bypass the cache entirely.
+
+    Args:
+        max_entries: Least recently used entries are evicted beyond this size.
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self, max_entries: int = 512, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        # (url, request headers) -> (expires_at, status, headers, body)
+        self._entries: OrderedDict[
+            Hashable, tuple[float, int, list[tuple[str, str]], bytes]
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(request: httpx.Request) -> Hashable | None:
+        """Cache key of `request`, or None if it must not be cached."""
+        if request.method != "GET" or any(
+            name in request.headers for name in _CREDENTIAL_HEADERS
+        ):
+            return None
+        headers = sorted(
+            (name.lower(), value) for name, value in request.headers.multi_items()
+        )
+        return (str(request.url), tuple(headers))
+
+    def get(self, request: httpx.Request) -> httpx.Response | None:
+        key = self.key(request)
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        _, status, headers, body = entry
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+    def put(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        default_ttl: float | None,
+    ) -> None:
+        key = self.key(request)
+        if key is None or response.status_code != 200 or self.max_entries <= 0:
+            return
+        ttl = freshness(response.headers, default_ttl)
+        if ttl is None:
+            return
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in _DROPPED_HEADERS
+        ]
+        self._entries[key] = (
+            self._clock() + ttl,
+            response.status_code,
+            headers,
+            response.content,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ToolRuntime:
+    """Process-wide HTTP access for tools.
+
+    One pooled `httpx.AsyncClient` (created on first use, with `timeout`
+    seconds per operation and `connect_timeout` to connect) is shared by every
+    tool, so calls to the same API reuse connections. At most `max_per_host`
+    requests run at once per host; further ones wait. `get` serves fresh
+    responses from an `HTTPCache` that follows the server's ``Cache-Control``
+    (see `freshness`). Tools reach it as `Tool.runtime`; close it with
+    `aclose` on shutdown (a later call opens a new client).
+
+    Example::
+
+        response = await self.runtime.get(url, params=params, cache_ttl=300)
+        response.raise_for_status()
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 50,
+        max_per_host: int = 8,
+        cache: HTTPCache | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.cache = cache if cache is not None else HTTPCache()
+        self._client = client
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self.requests = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def get(
+        self,
+        url: str,
+        params: Mapping[str, Any] | None = None,
+        headers: Mapping[str, str] | None = None,
+        cache_ttl: float | None = None,
+    ) -> httpx.Response:
+        """GET `url`, from the cache while fresh.
+
+        `cache_ttl` is how long to keep responses that carry no freshness
+        information of their own; by default they are not stored.
+        """
+        request = self.client.build_request("GET", url, params=params, headers=headers)
+        cached = self.cache.get(request)
+        if cached is not None:
+            return cached
+        response = await self.send(request)
+        self.cache.put(request, response, cache_ttl)
+        return response
+
+    async def send(self, request: httpx.Request) -> httpx.Response:
+        """Send `request` (uncached) within its host's concurrency limit."""
+        host = request.url.host
+        limit = self._hosts.get(host)
+        if limit is None:
+            limit = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        async with limit:
+            self.requests += 1
+            return await self.client.send(request)
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        self._hosts.clear()
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "cacheEntries": len(self.cache),
+            "cacheHits": self.cache.hits,
+            "cacheMisses": self.cache.misses,
+        }
@@ -2,7 +2,6 @@
 
 import json
 
-import httpx
 from pydantic import BaseModel, Field
 
 from ai.agent.tools.base import Tool
@@ -11,6 +10,10 @@ from ai.agent.tools.base import Tool
 class GetCurrentWeather(Tool):
     """Get current weather for a location."""
 
+    # Forecasts update every 15 minutes; reuse responses for the same point until
+    # then. Cached by the shared HTTP runtime, not as tool results.
+    http_cache_ttl = 900.0
+
     class Input(BaseModel):
         latitude: float = Field(description="Latitude of the location")
         longitude: float = Field(description="Longitude of the location")
@@ -25,7 +28,8 @@ class GetCurrentWeather(Tool):
             "daily": "sunrise,sunset",
             "timezone": "auto",
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return json.dumps(response.json())
+        response = await self.runtime.get(
+            url, params=params, cache_ttl=self.http_cache_ttl
+        )
+        response.raise_for_status()
+        return json.dumps(response.json())
@@ -1,10 +1,14 @@
 """MCP client: open sessions and yield native Tool instances for each MCP tool."""
 
+import hashlib
+import json
 import logging
+import time
 from collections.abc import AsyncGenerator
 from contextlib import AsyncExitStack, asynccontextmanager
 from typing import Any
 
+from ai.agent.metrics import RunTimings
 from ai.agent.tools.base import Tool
 
 from .tool import MCPToolWrapper
@@ -17,30 +21,49 @@ logger = logging.getLogger(__name__)
 async def mcp_tools_context(
     configs: list[tuple[str, dict[str, Any]]],
     timeout: int = 30,
+    cache_ttl: float | None = 60.0,
+    timings: RunTimings | None = None,
 ) -> AsyncGenerator[list[Tool], None]:
     """Open MCP sessions for each config and yield a list of native Tool instances.
 
     Each MCP tool becomes an MCPToolWrapper that can be passed directly to AgentLoop
     alongside any other tools — no special MCP handling required by the caller.
+    Cached results of read-only tools are scoped to the exact server config, so
+    two servers that share a name (or credentials) never share results.
 
     Failed servers are skipped with a warning so one bad config won't block the rest.
+    With `timings`, connecting to and listing each server is recorded as an
+    ``mcp_setup`` timing.
     """
     async with AsyncExitStack() as stack:
         tools: list[Tool] = []
         for server_name, cfg in configs:
+            started = time.perf_counter()
             try:
                 session = await stack.enter_async_context(mcp_session_context(cfg))
                 list_result = await session.list_tools()
+                scope = _config_hash(cfg)
                 for tool_def in list_result.tools:
                     tools.append(
-                        MCPToolWrapper(session, server_name, tool_def, timeout=timeout)
+                        MCPToolWrapper(
+                            session,
+                            server_name,
+                            tool_def,
+                            timeout=timeout,
+                            cache_scope=scope,
+                            cache_ttl=cache_ttl,
+                        )
                     )
                 logger.debug(
                     "MCP server '%s': connected, %d tools registered",
                     server_name,
                     len(list_result.tools),
                 )
+                if timings is not None:
+                    timings.since("mcp_setup", started, server=server_name, ok=True)
             except Exception as e:
+                if timings is not None:
+                    timings.since("mcp_setup", started, server=server_name, ok=False)
                 logger.warning(
                     "Skipping MCP server '%s' (%s): %s",
                     server_name,
@@ -48,3 +71,8 @@ async def mcp_tools_context(
                     e,
                 )
         yield tools
+
+
+def _config_hash(cfg: dict[str, Any]) -> str:
+    payload = json.dumps(cfg, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
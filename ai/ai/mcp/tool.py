@@ -1,26 +1,52 @@
 """MCPToolWrapper: wraps a single MCP server tool as a native Tool."""
 
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Any
-
-from mcp import ClientSession
-from mcp.types import TextContent
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, Any
 
 from ai.agent.tools.base import Tool
 
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
 logger = logging.getLogger(__name__)
 
+# Schemas keyed by (server name, tool-definition hash), shared across sessions so
+# reconnecting to an unchanged server on every request reuses them.
+_SCHEMA_CACHE: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+_SCHEMA_CACHE_SIZE = 1024
+
+
+def _tool_def_hash(name: str, description: str, input_schema: dict[str, Any]) -> str:
+    payload = json.dumps([name, description, input_schema], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
 
 class MCPToolWrapper(Tool):
-    """Wraps a single MCP server tool as a native Tool."""
+    """Wraps a single MCP server tool as a native Tool.
+
+    Results are cached per `cache_scope` (identifying the server config) when
+    the tool definition says it is safe: tools annotated ``readOnlyHint`` are
+    cached for ``cache_ttl`` seconds, and identical concurrent calls to tools
+    annotated ``idempotentHint`` run once but are not stored. Error and timeout
+    outputs are never stored. A call to any tool that is not read-only drops
+    the server's cached results, since it may have changed what they read;
+    without a `cache_scope` nothing is dropped, as the unscoped entries
+    belong to built-in tools.
+    """
 
     def __init__(
         self,
-        session: ClientSession,
+        session: "ClientSession",
         server_name: str,
         tool_def: Any,
         timeout: int = 30,
+        cache_scope: Hashable = None,
+        cache_ttl: float | None = 60.0,
     ) -> None:
         self.name = f"{server_name}:{tool_def.name}"  # type: ignore[misc]
         self.description = tool_def.description or tool_def.name  # type: ignore[misc]
@@ -28,9 +54,31 @@ class MCPToolWrapper(Tool):
         self._original_name = tool_def.name
         self._input_schema: dict[str, Any] = tool_def.inputSchema or {}
         self._timeout = timeout
+        self._schema_key = (
+            server_name,
+            _tool_def_hash(self.name, self.description, self._input_schema),
+        )
+        self._cache_scope = cache_scope
+        annotations = getattr(tool_def, "annotations", None)
+        read_only = bool(getattr(annotations, "readOnlyHint", False))
+        idempotent = bool(getattr(annotations, "idempotentHint", False))
+        self._read_only = read_only
+        self.cacheable = read_only or idempotent  # type: ignore[misc]
+        self.cache_ttl = cache_ttl if read_only else 0  # type: ignore[misc]
+
+    @property
+    def cache_scope(self) -> Hashable:
+        return self._cache_scope
+
+    @property
+    def schema_key(self) -> Hashable:
+        """(server name, hash of the tool definition)."""
+        return self._schema_key
 
     async def execute(self, input: Any) -> str:
         """Call the MCP tool with the given arguments dict."""
+        from mcp.types import TextContent
+
         try:
             result = await asyncio.wait_for(
                 self._session.call_tool(self._original_name, arguments=input),
@@ -66,10 +114,33 @@ class MCPToolWrapper(Tool):
 
     async def call(self, args: dict[str, Any]) -> str:
         """Pass args dict directly to execute (schema is dynamic, no Pydantic Input model)."""
-        return await self.execute(args)
+        try:
+            if not self.cacheable:
+                return await self.execute(args)
+            return await self._call_cached(args, lambda: self.execute(args))
+        finally:
+            if not self._read_only and self._cache_scope is not None:
+                self.result_cache.invalidate(self._cache_scope)
+
+    def _should_cache(self, output: str) -> bool:
+        return not output.startswith(("(error)", "(MCP tool call timed out"))
 
     def to_schema(self) -> dict[str, Any]:
-        """Return OpenAI function-calling schema derived from the MCP tool definition."""
+        """Return OpenAI function-calling schema derived from the MCP tool definition.
+
+        Cached by `schema_key`; treat the result as read-only.
+        """
+        cached = _SCHEMA_CACHE.get(self._schema_key)
+        if cached is not None:
+            _SCHEMA_CACHE.move_to_end(self._schema_key)
+            return cached
+        cached = self._schema_from_definition()
+        _SCHEMA_CACHE[self._schema_key] = cached
+        if len(_SCHEMA_CACHE) > _SCHEMA_CACHE_SIZE:
+            _SCHEMA_CACHE.popitem(last=False)
+        return cached
+
+    def _schema_from_definition(self) -> dict[str, Any]:
         schema = dict(self._input_schema)
         if "type" not in schema:
             schema["type"] = "object"
@@ -2,19 +2,24 @@
 
 from collections.abc import AsyncGenerator, Callable
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from mcp.client.stdio import StdioServerParameters, stdio_client
-
-from mcp import ClientSession
+# The mcp SDK is slow to import, so transports import it when they connect.
+if TYPE_CHECKING:
+    from mcp import ClientSession
 
 # Factory: (config: dict) -> AbstractAsyncContextManager[ClientSession]
 McpTransportFactory = Callable[[dict[str, Any]], Any]
 
 
 @asynccontextmanager
-async def _stdio_session(config: dict[str, Any]) -> AsyncGenerator[ClientSession, None]:
+async def _stdio_session(
+    config: dict[str, Any],
+) -> AsyncGenerator["ClientSession", None]:
     """Create MCP session for stdio transport."""
+    from mcp import ClientSession
+    from mcp.client.stdio import StdioServerParameters, stdio_client
+
     params = StdioServerParameters(
         command=config["command"],
         args=config.get("args") or [],
@@ -29,9 +34,10 @@ async def _stdio_session(config: dict[str, Any]) -> AsyncGenerator[ClientSession
 @asynccontextmanager
 async def _streamable_http_session(
     config: dict[str, Any],
-) -> AsyncGenerator[ClientSession, None]:
+) -> AsyncGenerator["ClientSession", None]:
     """Create MCP session for streamable-http transport."""
     import httpx
+    from mcp import ClientSession
     from mcp.client.streamable_http import streamable_http_client
 
     url = config["url"]
@@ -60,7 +66,7 @@ TRANSPORT_REGISTRY: dict[str, McpTransportFactory] = {
 @asynccontextmanager
 async def mcp_session_context(
     config: dict[str, Any],
-) -> AsyncGenerator[ClientSession, None]:
+) -> AsyncGenerator["ClientSession", None]:
     """Create MCP session from config using registered transport. Yields ClientSession."""
     transport = config.get("transport", "")
     factory = TRANSPORT_REGISTRY.get(transport)
@@ -16,11 +16,40 @@ class ToolCallDelta:
     arguments: str = ""
 
 
+@dataclass
+class Usage:
+    """Token counts of one provider call; `cached_tokens` is included in the prompt."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def __add__(self, other: Usage) -> Usage:
+        return Usage(
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            cached_tokens=self.cached_tokens + other.cached_tokens,
+        )
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "cachedTokens": self.cached_tokens,
+        }
+
+
 @dataclass
 class ChunkDelta:
     content: str | None = None
     tool_calls: list[ToolCallDelta] = field(default_factory=list)
     finish_reason: str | None = None
+    # Set on the chunk that carries the call's token usage (usually the last).
+    usage: Usage | None = None
 
 
 class LLMProvider(ABC):
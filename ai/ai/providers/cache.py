@@ -0,0 +1,259 @@
+"""Exact-match response cache for provider calls."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from ai.providers.base import ChunkDelta, LLMProvider
+from ai.providers.replay import _decode, _encode
+
+logger = logging.getLogger(__name__)
+
+# Streams that ended on their own; "length" and "content_filter" are cut short.
+_COMPLETE_FINISH_REASONS = frozenset({"stop", "tool_calls"})
+
+# Store writes between two purges of expired and excess rows.
+_PURGE_EVERY = 100
+
+_enabled: ContextVar[bool] = ContextVar("response_cache_enabled", default=True)
+
+
+@contextmanager
+def no_response_cache() -> Iterator[None]:
+    """Bypass `CachingProvider` for calls made in this context (and tasks it starts)."""
+    token = _enabled.set(False)
+    try:
+        yield
+    finally:
+        _enabled.reset(token)
+
+
+def cache_key(
+    model: str, messages: list[dict[str, Any]], tools: list[dict[str, Any]]
+) -> str:
+    """Stable hash of everything that determines the completion request."""
+    payload = json.dumps(
+        [model, messages, tools], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+class SQLiteResponseStore:
+    """On-disk tier for `CachingProvider`: one row per cached response.
+
+    `purge` deletes expired rows and, beyond `max_rows`, the oldest written;
+    `CachingProvider` calls it every few writes. Calls block on disk I/O;
+    `CachingProvider` runs them in a worker thread.
+    """
+
+    def __init__(self, path: str | Path, max_rows: int = 10_000) -> None:
+        self.path = Path(path)
+        self.max_rows = max_rows
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, "
+                "chunks TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def get(
+        self, key: str, now: float
+    ) -> tuple[float | None, list[dict[str, Any]]] | None:
+        """The response's expiry time and chunks, unless missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, chunks FROM responses "
+                "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now),
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def set(
+        self,
+        key: str,
+        model: str,
+        chunks: list[dict[str, Any]],
+        expires_at: float | None,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, model, json.dumps(chunks, separators=(",", ":")), expires_at),
+            )
+
+    def purge(self, now: float) -> int:
+        """Delete expired rows, then the oldest beyond `max_rows`; return how many."""
+        with self._lock, self._conn:
+            expired = self._conn.execute(
+                "DELETE FROM responses "
+                "WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (now,),
+            ).rowcount
+            # INSERT OR REPLACE gives a rewritten key a new rowid: oldest write first.
+            excess = self._conn.execute(
+                "DELETE FROM responses WHERE rowid IN ("
+                "SELECT rowid FROM responses ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            ).rowcount
+        return expired + excess
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingProvider(LLMProvider):
+    """Serves repeated identical requests from a cache instead of the network.
+
+    Requests are keyed by `cache_key` (model, messages and tool schemas). A
+    miss streams from `inner` while recording the chunks; if the stream
+    completes with a "stop" or "tool_calls" finish, the recording is stored
+    for `ttl` seconds (None keeps it until evicted). A hit replays the
+    recorded chunks without delay and without token usage, since no tokens
+    were spent. Errors, abandoned streams and truncated answers are never
+    stored.
+
+    The in-memory tier keeps the `max_entries` most recently used responses;
+    an optional `store` (e.g. `SQLiteResponseStore`) keeps them across
+    restarts and processes. Use `no_response_cache()` to bypass the cache for
+    a request.
+
+    Example::
+
+        provider = CachingProvider(
+            LiteLLMProvider(), ttl=3600, store=SQLiteResponseStore("cache.db")
+        )
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        max_entries: int = 256,
+        ttl: float | None = None,
+        store: SQLiteResponseStore | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.inner = inner
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._clock = clock
+        self._memory: OrderedDict[str, tuple[float | None, list[dict[str, Any]]]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._store_writes = 0
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        if not _enabled.get():
+            self.bypassed += 1
+            async with aclosing(self.inner.stream(messages, tools, model)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+            return
+
+        key = cache_key(model, messages, tools)
+        recorded = await self._get(key)
+        if recorded is not None:
+            self.hits += 1
+            for data in recorded:
+                chunk = _decode(data)
+                chunk.usage = None
+                yield chunk
+            return
+
+        self.misses += 1
+        recorded = []
+        finish_reason = None
+        async with aclosing(self.inner.stream(messages, tools, model)) as chunks:
+            async for chunk in chunks:
+                data = _encode(chunk, 0)
+                del data["d"]
+                recorded.append(data)
+                finish_reason = chunk.finish_reason or finish_reason
+                yield chunk
+        if finish_reason in _COMPLETE_FINISH_REASONS:
+            await self._set(key, model, recorded)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "entries": len(self._memory),
+        }
+
+    def clear(self) -> None:
+        """Empty the in-memory tier."""
+        self._memory.clear()
+
+    async def _get(self, key: str) -> list[dict[str, Any]] | None:
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, chunks = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                return chunks
+            del self._memory[key]
+        if self.store is None:
+            return None
+        try:
+            entry = await asyncio.to_thread(self.store.get, key, now)
+        except Exception:
+            logger.exception("Response cache lookup failed")
+            return None
+        if entry is None:
+            return None
+        self._remember(key, *entry)
+        return entry[1]
+
+    async def _set(self, key: str, model: str, chunks: list[dict[str, Any]]) -> None:
+        now = self._clock()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        self._remember(key, expires_at, chunks)
+        if self.store is None:
+            return
+        try:
+            await asyncio.to_thread(self.store.set, key, model, chunks, expires_at)
+        except Exception:
+            logger.exception("Response cache write failed")
+            return
+        # `get` skips expired rows but leaves them; purge now and then so the
+        # file stays bounded.
+        self._store_writes += 1
+        if self._store_writes % _PURGE_EVERY == 0:
+            try:
+                await asyncio.to_thread(self.store.purge, now)
+            except Exception:
+                logger.exception("Response cache purge failed")
+
+    def _remember(
+        self, key: str, expires_at: float | None, chunks: list[dict[str, Any]]
+    ) -> None:
+        self._memory[key] = (expires_at, chunks)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,247 @@
+"""Hedged provider calls: fall back to another model when the first one is slow."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Callable, Mapping
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any
+
+from ai.providers.base import ChunkDelta, LLMProvider
+from ai.providers.ratelimit import on_throttle
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class StreamStalled(TimeoutError):
+    """No chunk arrived from the provider within the stall timeout."""
+
+
+@dataclass
+class HedgeStats:
+    """Counters of a `HedgingProvider`."""
+
+    requests: int = 0
+    # Fallback requests fired because the first chunk was late ...
+    hedges: int = 0
+    # ... and how many of those the fallback won.
+    hedge_wins: int = 0
+    # Fallback requests fired because the primary failed before its first chunk.
+    fallbacks: int = 0
+    stalls: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedgeWins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+            "stalls": self.stalls,
+        }
+
+
+class _Attempt:
+    """One provider call, streamed by its own task so calls can race."""
+
+    def __init__(self, model: str, chunks: AsyncGenerator[ChunkDelta, None]) -> None:
+        self.model = model
+        self._loop = asyncio.get_running_loop()
+        # When the request goes out: later than now if it waits on a rate limiter.
+        self.sent_at = self._loop.time()
+        self._queue: asyncio.Queue[object] = asyncio.Queue(maxsize=8)
+        self._task = asyncio.create_task(self._run(chunks), name=f"llm-{model}")
+        self._getter: asyncio.Future[object] | None = None
+
+    async def _run(self, chunks: AsyncGenerator[ChunkDelta, None]) -> None:
+        with on_throttle(self._throttled):
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    await self._queue.put(chunk)
+        await self._queue.put(_DONE)
+
+    def _throttled(self, wait: float) -> None:
+        self.sent_at = max(self.sent_at, self._loop.time() + wait)
+
+    def next(self) -> asyncio.Future[object]:
+        """Future of the next item; stays the same until `take()` is called."""
+        if self._getter is None:
+            self._getter = asyncio.ensure_future(self._next())
+        return self._getter
+
+    async def _next(self) -> object:
+        """The next queued chunk, or the call's failure once none are left."""
+        get = asyncio.ensure_future(self._queue.get())
+        try:
+            await asyncio.wait({get, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not get.done():
+                get.cancel()
+        if get.done() and not get.cancelled():
+            return get.result()
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        # The task ended without queueing `_DONE`, so it raised.
+        return self._task.exception()
+
+    def take(self) -> object:
+        """The completed next item: a chunk or `_DONE`; re-raises a failure."""
+        assert self._getter is not None
+        item, self._getter = self._getter.result(), None
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    async def cancel(self) -> None:
+        if self._getter is not None:
+            self._getter.cancel()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class HedgingProvider(LLMProvider):
+    """Wraps a provider to cut tail latency with a fallback model.
+
+    If the first chunk has not arrived `ttft_timeout` seconds after the call
+    started, the same request is also sent to the model's fallback, and
+    whichever answers first is streamed while the other is cancelled. A
+    primary that fails before its first chunk is retried on the fallback
+    right away. Once streaming, a gap of more than `stall_timeout` seconds
+    between chunks raises `StreamStalled` instead of hanging the turn; output
+    has already been sent at that point, so it is not switched mid-answer.
+    Time a call spends waiting on a `RateLimitedProvider` beneath this one
+    counts toward neither timeout.
+
+    `fallbacks` maps a model to its fallback, as a mapping or a function
+    returning None for models without one. Token usage is that of the
+    winning call; the cancelled call's tokens are not reported.
+
+    Example::
+
+        provider = HedgingProvider(
+            LiteLLMProvider(),
+            {"gemini/gemini-3.1-pro-preview": "gemini/gemini-3-flash-preview"},
+            ttft_timeout=4.0,
+            stall_timeout=30.0,
+        )
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        fallbacks: Mapping[str, str] | Callable[[str], str | None],
+        ttft_timeout: float | None = None,
+        stall_timeout: float | None = None,
+        fallback_provider: LLMProvider | None = None,
+    ) -> None:
+        self.inner = inner
+        self.fallback_provider = fallback_provider or inner
+        self._fallbacks = fallbacks
+        self.ttft_timeout = ttft_timeout
+        self.stall_timeout = stall_timeout
+        self.stats = HedgeStats()
+
+    def fallback_for(self, model: str) -> str | None:
+        if callable(self._fallbacks):
+            fallback = self._fallbacks(model)
+        else:
+            fallback = self._fallbacks.get(model)
+        return fallback if fallback != model else None
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        self.stats.requests += 1
+        attempts = [_Attempt(model, self.inner.stream(messages, tools, model))]
+        try:
+            winner, item = await self._first_chunk(attempts, messages, tools)
+            for attempt in attempts:
+                if attempt is not winner:
+                    await attempt.cancel()
+            attempts = [winner]
+            while item is not _DONE:
+                yield item  # type: ignore[misc]
+                done, _ = await asyncio.wait(
+                    {winner.next()}, timeout=self.stall_timeout
+                )
+                if not done:
+                    self.stats.stalls += 1
+                    raise StreamStalled(
+                        f"No output from {winner.model} for {self.stall_timeout}s"
+                    )
+                item = winner.take()
+        finally:
+            for attempt in attempts:
+                await attempt.cancel()
+
+    async def _first_chunk(
+        self,
+        attempts: list[_Attempt],
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+    ) -> tuple[_Attempt, object]:
+        """Race the primary (and, once fired, the fallback) to a first chunk."""
+        loop = asyncio.get_running_loop()
+        primary = attempts[0]
+        fallback = self.fallback_for(primary.model)
+        hedged = False
+
+        def start_fallback() -> None:
+            nonlocal fallback
+            assert fallback is not None
+            logger.info("Sending %s request to fallback %s", primary.model, fallback)
+            stream = self.fallback_provider.stream(messages, tools, fallback)
+            attempts.append(_Attempt(fallback, stream))
+            fallback = None
+
+        while True:
+            can_hedge = fallback is not None and self.ttft_timeout is not None
+            timeout = self.ttft_timeout if can_hedge else self.stall_timeout
+            pending = {attempt.next(): attempt for attempt in attempts}
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            while not done and timeout is not None:
+                # Time spent waiting on a local rate limiter does not count.
+                left = max(a.sent_at for a in attempts) + timeout - loop.time()
+                if left <= 0:
+                    break
+                done, _ = await asyncio.wait(
+                    pending, timeout=left, return_when=asyncio.FIRST_COMPLETED
+                )
+            if not done:
+                if can_hedge:
+                    self.stats.hedges += 1
+                    hedged = True
+                    start_fallback()
+                    continue
+                self.stats.stalls += 1
+                raise StreamStalled(
+                    f"No output from {primary.model} for {self.stall_timeout}s"
+                )
+
+            for future in done:
+                attempt = pending[future]
+                try:
+                    item = attempt.take()
+                except Exception:
+                    attempts.remove(attempt)
+                    if attempts:
+                        continue
+                    if attempt is primary and fallback is not None:
+                        logger.warning(
+                            "%s failed; retrying on %s", primary.model, fallback
+                        )
+                        self.stats.fallbacks += 1
+                        start_fallback()
+                        break
+                    raise
+                if hedged and attempt is not primary:
+                    self.stats.hedge_wins += 1
+                return attempt, item
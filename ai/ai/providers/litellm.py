@@ -2,17 +2,28 @@
 
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Collection
 from typing import Any
 
-import litellm
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta, Usage
 
-from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta
+_EPHEMERAL = {"type": "ephemeral"}
 
 
 class LiteLLMProvider(LLMProvider):
     """LLM provider backed by LiteLLM, supporting OpenAI, Anthropic, Gemini, and more.
 
+    Prompt caching: OpenAI and Gemini cache repeated prompt prefixes on their
+    own. Providers listed in `cache_control_providers` (LiteLLM provider
+    names) need explicit breakpoints instead, so for their models the last
+    tool schema and the leading system message are marked with
+    ``cache_control``, covering tools, base prompt and skills. Tokens served
+    from a cache are reported in `Usage.cached_tokens`.
+
+    ``litellm`` takes seconds to import, so it is imported on first use
+    rather than with this module. Import it ahead of time (e.g. from a
+    startup thread) so the first request doesn't wait for it.
+
     Usage::
 
         provider = LiteLLMProvider()
@@ -20,41 +31,113 @@ class LiteLLMProvider(LLMProvider):
             ...
     """
 
+    def __init__(
+        self, cache_control_providers: Collection[str] = ("anthropic", "bedrock")
+    ) -> None:
+        self.cache_control_providers = frozenset(cache_control_providers)
+
     async def stream(
         self,
         messages: list[dict[str, Any]],
         tools: list[dict[str, Any]],
         model: str,
     ) -> AsyncGenerator[ChunkDelta, None]:
+        import litellm
+
+        if self.cache_control_providers and _llm_provider(model) in (
+            self.cache_control_providers
+        ):
+            messages, tools = mark_cacheable_prefix(messages, tools)
+
         kwargs: dict[str, Any] = {
             "model": model,
             "messages": messages,
             "tools": tools or None,  # some providers reject an empty list
             "stream": True,
+            "stream_options": {"include_usage": True},
         }
 
         response = await litellm.acompletion(**kwargs)
+        try:
+            async for chunk in response:
+                usage = _usage(getattr(chunk, "usage", None))
+                if not chunk.choices:
+                    if usage is not None:
+                        yield ChunkDelta(usage=usage)
+                    continue
 
-        async for chunk in response:
-            if not chunk.choices:
-                continue
-
-            choice = chunk.choices[0]
-            delta = choice.delta
-
-            tool_call_deltas: list[ToolCallDelta] = []
-            for tc in delta.tool_calls or []:
-                tool_call_deltas.append(
-                    ToolCallDelta(
-                        index=tc.index,
-                        id=tc.id,
-                        name=tc.function.name if tc.function else None,
-                        arguments=tc.function.arguments or "" if tc.function else "",
+                choice = chunk.choices[0]
+                delta = choice.delta
+
+                tool_call_deltas: list[ToolCallDelta] = []
+                for tc in delta.tool_calls or []:
+                    tool_call_deltas.append(
+                        ToolCallDelta(
+                            index=tc.index,
+                            id=tc.id,
+                            name=tc.function.name if tc.function else None,
+                            arguments=tc.function.arguments or ""
+                            if tc.function
+                            else "",
+                        )
                     )
+
+                yield ChunkDelta(
+                    content=delta.content,
+                    tool_calls=tool_call_deltas,
+                    finish_reason=choice.finish_reason,
+                    usage=usage,
                 )
+        finally:
+            # Release the HTTP connection right away when the consumer stops early.
+            aclose = getattr(response, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+def mark_cacheable_prefix(
+    messages: list[dict[str, Any]], tools: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Copies of `messages` and `tools` with cache breakpoints on the stable prefix.
 
-            yield ChunkDelta(
-                content=delta.content,
-                tool_calls=tool_call_deltas,
-                finish_reason=choice.finish_reason,
-            )
+    The last tool schema and the first system message (the stable part of a
+    `SystemPrompt`) get ``cache_control``; everything else is left as is.
+    """
+    if tools:
+        tools = [*tools[:-1], {**tools[-1], "cache_control": _EPHEMERAL}]
+    if messages and messages[0].get("role") == "system":
+        content = messages[0]["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        if content:
+            content = [*content[:-1], {**content[-1], "cache_control": _EPHEMERAL}]
+        messages = [{**messages[0], "content": content}, *messages[1:]]
+    return messages, tools
+
+
+def _llm_provider(model: str) -> str | None:
+    import litellm
+
+    try:
+        return litellm.get_llm_provider(model)[1]
+    except litellm.BadRequestError:  # unknown provider
+        return None
+
+
+def _usage(raw: Any) -> Usage | None:
+    """Normalize a LiteLLM usage block.
+
+    Cached prompt tokens are in prompt_tokens_details for every provider
+    LiteLLM normalizes; Anthropic responses also carry cache_read_input_tokens.
+    """
+    if not raw:
+        return None
+    details = getattr(raw, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or getattr(
+        raw, "cache_read_input_tokens", 0
+    )
+    return Usage(
+        prompt_tokens=getattr(raw, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(raw, "completion_tokens", 0) or 0,
+        cached_tokens=cached or 0,
+    )
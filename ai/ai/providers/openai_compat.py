@@ -0,0 +1,224 @@
+"""Direct provider for OpenAI-compatible streaming chat completion APIs."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+from collections.abc import AsyncGenerator, Mapping
+from typing import Any
+
+import httpx
+
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta, Usage
+
+
+class OpenAICompatibleError(RuntimeError):
+    """The API answered with an error status or an in-stream error object."""
+
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SSEDecoder:
+    """Incremental ``text/event-stream`` parser returning each event's data.
+
+    Only ``data`` fields matter for chat completions; ``event``, ``id``,
+    ``retry`` and comment lines are skipped. Lines end in ``\\n`` or
+    ``\\r\\n``. Payloads stay bytes, which ``json.loads`` takes directly.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = b""
+        self._data: list[bytes] = []
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        buffer = self._buffer + chunk if self._buffer else chunk
+        events: list[bytes] = []
+        start = 0
+        while (end := buffer.find(b"\n", start)) >= 0:
+            line = buffer[start:end]
+            start = end + 1
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if not line:
+                if self._data:
+                    events.append(
+                        self._data[0]
+                        if len(self._data) == 1
+                        else b"\n".join(self._data)
+                    )
+                    self._data = []
+            elif line.startswith(b"data:"):
+                self._data.append(line[6:] if line[5:6] == b" " else line[5:])
+        self._buffer = buffer[start:]
+        return events
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Streams from an OpenAI-compatible ``/chat/completions`` endpoint.
+
+    Talks to the API directly instead of through LiteLLM: one long-lived
+    `httpx.AsyncClient` pools connections (over HTTP/2 when the ``h2``
+    package is installed and the server negotiates it) and a small SSE parser
+    builds `ChunkDelta` objects straight from the decoded JSON. Works with
+    OpenAI, vLLM, llama.cpp, Ollama and other servers speaking the same
+    protocol. `model` is sent as is, so pass the name the server expects.
+
+    Error statuses raise `OpenAICompatibleError` carrying ``status_code``, and
+    timeouts and network failures raise `TimeoutError` and `ConnectionError`,
+    so `ResilientProvider` retries them like LiteLLM's exceptions. Call
+    `aclose()` on shutdown.
+
+    Example::
+
+        provider = OpenAICompatibleProvider(
+            "http://localhost:8000/v1", api_key=os.environ["VLLM_API_KEY"]
+        )
+        async for chunk in provider.stream(messages, tools, model="llama-3.1-8b"):
+            ...
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeout: float = 600.0,
+        connect_timeout: float = 10.0,
+        max_connections: int = 100,
+        http2: bool | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._headers = {"Accept": "text/event-stream", **(headers or {})}
+        if api_key:
+            self._headers["Authorization"] = f"Bearer {api_key}"
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+        self._client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            http2=http2,
+        )
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        body: dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        if tools:  # some servers reject an empty list
+            body["tools"] = tools
+
+        try:
+            async with self._client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                json=body,
+                headers=self._headers,
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise OpenAICompatibleError(
+                        _error_message(response.content) or response.reason_phrase,
+                        response.status_code,
+                    )
+                # Read through the end of the body rather than stopping at
+                # [DONE]: a response left unfinished closes its connection
+                # instead of returning it to the pool.
+                decoder = SSEDecoder()
+                async for raw in response.aiter_bytes():
+                    for data in decoder.feed(raw):
+                        if data != b"[DONE]" and (
+                            (chunk := _chunk(json.loads(data))) is not None
+                        ):
+                            yield chunk
+                # A body cut off without the final blank line still ends its event.
+                for data in decoder.feed(b"\n\n"):
+                    if (
+                        data != b"[DONE]"
+                        and (chunk := _chunk(json.loads(data))) is not None
+                    ):
+                        yield chunk
+        # Surface transport failures as the builtins `is_transient` retries.
+        except httpx.TimeoutException as e:
+            raise TimeoutError(str(e) or type(e).__name__) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e) or type(e).__name__) from e
+
+    async def connect(self) -> None:
+        """Open a pooled connection ahead of the first request."""
+        try:
+            await self._client.get(f"{self.base_url}/models", headers=self._headers)
+        except httpx.HTTPError:
+            pass
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _chunk(data: dict[str, Any]) -> ChunkDelta | None:
+    if "error" in data:
+        error = data["error"]
+        message = error.get("message") if isinstance(error, dict) else str(error)
+        raise OpenAICompatibleError(message or "stream error", _error_code(error))
+    usage = _usage(data.get("usage"))
+    choices = data.get("choices")
+    if not choices:
+        return ChunkDelta(usage=usage) if usage is not None else None
+
+    choice = choices[0]
+    delta = choice.get("delta") or {}
+    tool_calls: list[ToolCallDelta] = []
+    for tc in delta.get("tool_calls") or ():
+        function = tc.get("function") or {}
+        tool_calls.append(
+            ToolCallDelta(
+                index=tc.get("index", 0),
+                id=tc.get("id"),
+                name=function.get("name"),
+                arguments=function.get("arguments") or "",
+            )
+        )
+    return ChunkDelta(
+        content=delta.get("content"),
+        tool_calls=tool_calls,
+        finish_reason=choice.get("finish_reason"),
+        usage=usage,
+    )
+
+
+def _usage(raw: dict[str, Any] | None) -> Usage | None:
+    if not raw:
+        return None
+    details = raw.get("prompt_tokens_details") or {}
+    return Usage(
+        prompt_tokens=raw.get("prompt_tokens") or 0,
+        completion_tokens=raw.get("completion_tokens") or 0,
+        cached_tokens=details.get("cached_tokens") or 0,
+    )
+
+
+def _error_message(body: bytes) -> str | None:
+    try:
+        error = json.loads(body).get("error")
+    except (ValueError, AttributeError):
+        return body.decode(errors="replace")[:500] or None
+    if isinstance(error, dict):
+        return error.get("message")
+    return str(error) if error else None
+
+
+def _error_code(error: Any) -> int | None:
+    code = error.get("code") if isinstance(error, dict) else None
+    return code if isinstance(code, int) else None
@@ -0,0 +1,351 @@
+"""Client-side token-bucket rate limiting of provider calls (RPM and TPM)."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable, Iterator, Mapping
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+from ai.providers.base import ChunkDelta, LLMProvider
+
+# Rough characters per token, for estimating a request before it is sent.
+_CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Upstream limits for one (provider, key, model); None means unlimited."""
+
+    rpm: float | None = None
+    tpm: float | None = None
+
+
+class RateLimitExceeded(RuntimeError):
+    """The wait for capacity would exceed the limiter's `max_wait`.
+
+    Deliberately has no ``status_code``: the call never reached the provider,
+    so it is neither retried nor counted against the model's health (see
+    `ResilientProvider`).
+    """
+
+    def __init__(self, key: str, wait: float) -> None:
+        super().__init__(f"Rate limit for {key}: capacity in {wait:.1f}s")
+        self.key = key
+        self.retry_after = wait
+
+
+_throttle_listener: ContextVar[Callable[[float], None] | None] = ContextVar(
+    "rate_limit_throttle_listener", default=None
+)
+
+
+@contextmanager
+def on_throttle(listener: Callable[[float], None]) -> Iterator[None]:
+    """Call `listener(seconds)` when a call in this context waits on the limiter.
+
+    For callers timing provider calls (e.g. `HedgingProvider`), so a local wait
+    is not mistaken for a slow upstream.
+    """
+    token = _throttle_listener.set(listener)
+    try:
+        yield
+    finally:
+        _throttle_listener.reset(token)
+
+
+# A bucket to debit: (name, cost, refill per second, capacity).
+Debit = tuple[str, float, float, float]
+
+
+class RateLimitStore(Protocol):
+    """Bucket state, shared by every limiter that uses the same store."""
+
+    async def reserve(self, debits: list[Debit], now: float) -> float:
+        """Debit all buckets at once; return seconds until the debt is paid."""
+        ...
+
+    async def credit(
+        self, name: str, amount: float, rate: float, capacity: float, now: float
+    ) -> None:
+        """Give back `amount` (negative takes more) after reconciling usage."""
+        ...
+
+
+def _refill(
+    state: tuple[float, float] | None, now: float, rate: float, capacity: float
+) -> float:
+    if state is None:
+        return capacity
+    level, updated_at = state
+    return min(capacity, level + max(0.0, now - updated_at) * rate)
+
+
+def _reserve(
+    states: dict[str, tuple[float, float]], debits: list[Debit], now: float
+) -> float:
+    """Debit `states` in place; buckets may go negative (reserved capacity)."""
+    wait = 0.0
+    for name, cost, rate, capacity in debits:
+        level = _refill(states.get(name), now, rate, capacity) - cost
+        states[name] = (level, now)
+        if level < 0:
+            wait = max(wait, -level / rate)
+    return wait
+
+
+class MemoryRateLimitStore:
+    """Buckets in this process's memory."""
+
+    def __init__(self) -> None:
+        self._states: dict[str, tuple[float, float]] = {}
+
+    async def reserve(self, debits: list[Debit], now: float) -> float:
+        return _reserve(self._states, debits, now)
+
+    async def credit(
+        self, name: str, amount: float, rate: float, capacity: float, now: float
+    ) -> None:
+        level = _refill(self._states.get(name), now, rate, capacity)
+        self._states[name] = (min(capacity, level + amount), now)
+
+
+class SQLiteRateLimitStore:
+    """Buckets in a SQLite file, shared by worker processes on one node.
+
+    Each reservation is one ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers see each other's debits. Calls run in a worker thread. Use a
+    wall clock (the default `time.time`) with it, since monotonic clocks are
+    not comparable across processes.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    async def reserve(self, debits: list[Debit], now: float) -> float:
+        return await asyncio.to_thread(self._reserve, debits, now)
+
+    async def credit(
+        self, name: str, amount: float, rate: float, capacity: float, now: float
+    ) -> None:
+        await asyncio.to_thread(self._credit, name, amount, rate, capacity, now)
+
+    def _reserve(self, debits: list[Debit], now: float) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                states = self._load([name for name, *_ in debits])
+                wait = _reserve(states, debits, now)
+                self._store(states)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def _credit(
+        self, name: str, amount: float, rate: float, capacity: float, now: float
+    ) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                level = _refill(self._load([name]).get(name), now, rate, capacity)
+                self._store({name: (min(capacity, level + amount), now)})
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _load(self, names: list[str]) -> dict[str, tuple[float, float]]:
+        placeholders = ",".join("?" * len(names))
+        rows = self._conn.execute(
+            "SELECT name, level, updated_at FROM buckets "
+            f"WHERE name IN ({placeholders})",
+            names,
+        ).fetchall()
+        return {name: (level, updated_at) for name, level, updated_at in rows}
+
+    def _store(self, states: dict[str, tuple[float, float]]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)",
+            [(name, level, updated_at) for name, (level, updated_at) in states.items()],
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def limits_by_prefix(
+    limits: Mapping[str, Mapping[str, float | None]],
+) -> Callable[[str], RateLimit | None]:
+    """`RateLimitedProvider` limits from config keyed by model ID or prefix.
+
+    The most specific key wins: ``"gemini/gemini-3-flash-preview"`` over
+    ``"gemini"`` over ``"*"``.
+    """
+    parsed = {
+        key: RateLimit(value.get("rpm"), value.get("tpm"))
+        for key, value in limits.items()
+    }
+
+    def lookup(model: str) -> RateLimit | None:
+        parts = model.split("/")
+        for end in range(len(parts), 0, -1):
+            limit = parsed.get("/".join(parts[:end]))
+            if limit is not None:
+                return limit
+        return parsed.get("*")
+
+    return lookup
+
+
+def rate_limit_key(provider: str, api_key: str | None, model: str) -> str:
+    """Bucket key for (provider, API key, model), without the key itself."""
+    fingerprint = hashlib.sha256(api_key.encode()).hexdigest()[:12] if api_key else "-"
+    return f"{provider}:{fingerprint}:{model}"
+
+
+def estimate_tokens(
+    messages: list[dict[str, Any]], tools: list[dict[str, Any]], completion: int
+) -> int:
+    """Rough prompt size from character counts, plus `completion` expected output."""
+    chars = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            chars += sum(len(part.get("text") or "") for part in content)
+        for call in message.get("tool_calls") or ():
+            chars += len(call.get("function", {}).get("arguments") or "")
+    for tool in tools:
+        function = tool.get("function", tool)
+        chars += len(function.get("description") or "") + len(
+            str(function.get("parameters", ""))
+        )
+    return chars // _CHARS_PER_TOKEN + completion
+
+
+class RateLimitedProvider(LLMProvider):
+    """Holds calls back to stay under upstream requests- and tokens-per-minute.
+
+    Each (provider, key, model) has a request bucket and a token bucket
+    refilling at `RateLimit.rpm` and `RateLimit.tpm` per minute, each holding
+    up to a minute's worth. A call reserves one request and its estimated
+    tokens (`estimate_tokens`, with `completion_tokens` expected output) and
+    sleeps until the buckets have paid off the reservation, so a burst is
+    spread out at the allowed rate instead of being sent and answered with
+    429s. When the response reports its usage, the difference from the
+    estimate goes back into (or out of) the token bucket.
+
+    `limits(model)` returns the model's `RateLimit` (None for unlimited) and
+    `key(model)` its bucket key (see `rate_limit_key`). The `store` holds the
+    buckets; a `SQLiteRateLimitStore` shares them between worker processes.
+    With `max_wait`, a call that would wait longer fails with
+    `RateLimitExceeded` instead.
+
+    Example::
+
+        provider = RateLimitedProvider(
+            LiteLLMProvider(),
+            limits_by_prefix({"gemini": {"rpm": 1000, "tpm": 1_000_000}}),
+        )
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        limits: Callable[[str], RateLimit | None],
+        key: Callable[[str], str] | None = None,
+        store: RateLimitStore | None = None,
+        completion_tokens: int = 512,
+        max_wait: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.inner = inner
+        self.limits = limits
+        self.key = key or (lambda model: model)
+        self.store = store or MemoryRateLimitStore()
+        self.completion_tokens = completion_tokens
+        self.max_wait = max_wait
+        self._clock = clock
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        limit = self.limits(model)
+        if limit is None or (limit.rpm is None and limit.tpm is None):
+            async with aclosing(self.inner.stream(messages, tools, model)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+            return
+
+        key = self.key(model)
+        estimate = estimate_tokens(messages, tools, self.completion_tokens)
+        debits: list[Debit] = []
+        if limit.rpm:
+            debits.append((f"{key}:rpm", 1, limit.rpm / 60, limit.rpm))
+        if limit.tpm:
+            debits.append((f"{key}:tpm", estimate, limit.tpm / 60, limit.tpm))
+        wait = await self.store.reserve(debits, self._clock())
+        if wait > 0:
+            if self.max_wait is not None and wait > self.max_wait:
+                await self._refund(debits)
+                raise RateLimitExceeded(key, wait)
+            self.throttled += 1
+            self.waited_seconds += wait
+            listener = _throttle_listener.get()
+            if listener is not None:
+                listener(wait)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Nothing was sent: hand the reservation to the callers still waiting.
+                await self._refund(debits)
+                raise
+
+        used: int | None = None
+        async with aclosing(self.inner.stream(messages, tools, model)) as chunks:
+            async for chunk in chunks:
+                if chunk.usage is not None:
+                    used = chunk.usage.total_tokens
+                yield chunk
+        if limit.tpm and used is not None and used != estimate:
+            await self.store.credit(
+                f"{key}:tpm", estimate - used, limit.tpm / 60, limit.tpm, self._clock()
+            )
+
+    async def _refund(self, debits: list[Debit]) -> None:
+        now = self._clock()
+        for name, cost, rate, capacity in debits:
+            await self.store.credit(name, cost, rate, capacity, now)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "throttled": self.throttled,
+            "waitedSeconds": round(self.waited_seconds, 3),
+        }
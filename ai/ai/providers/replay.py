@@ -0,0 +1,162 @@
+"""Record provider streams to disk and play them back offline."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from pathlib import Path
+from typing import IO, Any
+
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta, Usage
+
+# Fixture format: JSON Lines, one provider call per line:
+#   {"model": "...", "complete": true, "chunks": [chunk, ...]}
+# where each chunk only carries the fields that are set:
+#   {"d": ms since previous chunk (or since the call started),
+#    "c": content, "f": finish_reason,
+#    "t": [[index, id, name, arguments], ...], "u": [prompt, completion, cached]}
+# Paths ending in ".gz" are gzip-compressed.
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps a provider and appends every call it streams to a fixture file.
+
+    Chunks are passed through unchanged; the time before each one is recorded
+    so `ReplayProvider` can reproduce the original pacing. A call whose stream
+    is abandoned or fails is still written, marked ``"complete": false``.
+    Writes happen in a worker thread, so the event loop does not block on disk.
+
+    Example::
+
+        provider = RecordingProvider(LiteLLMProvider(), "fixtures/weather.jsonl")
+    """
+
+    def __init__(self, inner: LLMProvider, path: str | Path) -> None:
+        self.inner = inner
+        self.path = Path(path)
+        # Concurrent calls append from different threads; keep lines whole.
+        self._lock = threading.Lock()
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        chunks: list[dict[str, Any]] = []
+        complete = False
+        last = time.perf_counter()
+        try:
+            async with aclosing(self.inner.stream(messages, tools, model)) as stream:
+                async for chunk in stream:
+                    now = time.perf_counter()
+                    chunks.append(_encode(chunk, (now - last) * 1000))
+                    last = now
+                    yield chunk
+            complete = True
+        finally:
+            record = {"model": model, "complete": complete, "chunks": chunks}
+            await asyncio.to_thread(
+                self._append, json.dumps(record, separators=(",", ":")) + "\n"
+            )
+
+    def _append(self, line: str) -> None:
+        with self._lock, _open(self.path, "a") as f:
+            f.write(line)
+
+
+class ReplayProvider(LLMProvider):
+    """Plays back calls recorded by `RecordingProvider`, in recorded order.
+
+    With ``realtime=True`` chunks are released on the recorded schedule
+    (scaled by `time_scale`), measured from the start of each call so sleep
+    overhead does not accumulate. With ``realtime=False`` they are yielded as
+    fast as possible. `loop=True` starts over after the last call, which is
+    convenient for benchmarks; otherwise running out of calls raises.
+
+    Example::
+
+        provider = ReplayProvider("fixtures/weather.jsonl", realtime=False)
+        loop = AgentLoop(provider, tools, model="replay")
+    """
+
+    def __init__(
+        self,
+        source: str | Path | list[dict[str, Any]],
+        realtime: bool = True,
+        time_scale: float = 1.0,
+        loop: bool = False,
+    ) -> None:
+        self.calls = source if isinstance(source, list) else load_fixture(source)
+        if not self.calls:
+            raise ValueError("Replay fixture contains no calls")
+        self.realtime = realtime
+        self.time_scale = time_scale
+        self.loop = loop
+        self._next = 0
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        if self._next >= len(self.calls):
+            if not self.loop:
+                raise RuntimeError(
+                    f"Replay fixture exhausted after {len(self.calls)} calls"
+                )
+            self._next = 0
+        call = self.calls[self._next]
+        self._next += 1
+
+        started = time.perf_counter()
+        offset = 0.0
+        for data in call["chunks"]:
+            if self.realtime:
+                offset += data.get("d", 0) / 1000 * self.time_scale
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield _decode(data)
+
+
+def load_fixture(path: str | Path) -> list[dict[str, Any]]:
+    """Read the recorded calls of a fixture file."""
+    with _open(Path(path), "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def _encode(chunk: ChunkDelta, delay_ms: float) -> dict[str, Any]:
+    data: dict[str, Any] = {"d": round(delay_ms, 3)}
+    if chunk.content is not None:
+        data["c"] = chunk.content
+    if chunk.finish_reason is not None:
+        data["f"] = chunk.finish_reason
+    if chunk.tool_calls:
+        data["t"] = [[t.index, t.id, t.name, t.arguments] for t in chunk.tool_calls]
+    if chunk.usage is not None:
+        u = chunk.usage
+        data["u"] = [u.prompt_tokens, u.completion_tokens, u.cached_tokens]
+    return data
+
+
+def _decode(data: dict[str, Any]) -> ChunkDelta:
+    usage = data.get("u")
+    return ChunkDelta(
+        content=data.get("c"),
+        tool_calls=[ToolCallDelta(*t) for t in data.get("t", ())],
+        finish_reason=data.get("f"),
+        usage=Usage(*usage) if usage else None,
+    )
@@ -0,0 +1,229 @@
+"""Retries with backoff and per-model circuit breakers for provider calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Callable
+from contextlib import aclosing
+from typing import Any
+
+from ai.providers.base import ChunkDelta, LLMProvider
+from ai.providers.ratelimit import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Rate limits, timeouts and server-side failures; litellm exceptions carry these.
+_TRANSIENT_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+class CircuitOpenError(RuntimeError):
+    """The model's circuit breaker is open; the call was not attempted."""
+
+    status_code = 503
+
+    def __init__(self, model: str, retry_after: float) -> None:
+        super().__init__(f"{model} is unavailable; retry in {retry_after:.0f}s")
+        self.model = model
+        self.retry_after = retry_after
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether retrying the call could succeed (rate limit, timeout, 5xx, network)."""
+    if isinstance(error, (CircuitOpenError, RateLimitExceeded)):
+        return False
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in _TRANSIENT_STATUS
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker for one model.
+
+    Closed: calls go through and outcomes from the last `window` seconds are
+    kept. Once at least `min_calls` were seen and the failure share reaches
+    `failure_rate`, the breaker opens and rejects calls for `reset_timeout`
+    seconds. Then it is half-open: one probe call is let through, closing the
+    breaker on success or reopening it on failure.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: float = 60.0,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == OPEN
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            return HALF_OPEN
+        return self._state
+
+    def acquire(self, model: str) -> None:
+        """Allow a call or raise `CircuitOpenError`."""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._probing:
+            self._state = HALF_OPEN
+            self._probing = True
+            return
+        retry_after = max(0.0, self._opened_at + self.reset_timeout - self._clock())
+        raise CircuitOpenError(model, retry_after)
+
+    def release(self) -> None:
+        """The call ended without an outcome (e.g. the caller went away)."""
+        self._probing = False
+
+    def record(self, ok: bool) -> None:
+        now = self._clock()
+        if self._probing:
+            self._probing = False
+            if ok:
+                self._state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open(now)
+            return
+        self._outcomes.append((now, ok))
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+        failures = sum(1 for _, success in self._outcomes if not success)
+        total = len(self._outcomes)
+        if (
+            self._state == CLOSED
+            and total >= self.min_calls
+            and failures / total >= self.failure_rate
+        ):
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "recentCalls": len(self._outcomes),
+            "recentFailures": sum(1 for _, ok in self._outcomes if not ok),
+            "retryAfter": (
+                round(max(0.0, self._opened_at + self.reset_timeout - self._clock()), 1)
+                if state == OPEN
+                else None
+            ),
+        }
+
+
+class ResilientProvider(LLMProvider):
+    """Wraps a provider with retries and a circuit breaker per model.
+
+    A call that fails with a transient error (see `is_transient`) before its
+    first chunk is retried up to `max_retries` times after a full-jitter
+    exponential backoff of up to `max_delay` seconds. Errors after the first
+    chunk propagate, since output has been sent already. Successes and
+    transient failures feed the model's `CircuitBreaker` (client errors count
+    as neither), and while it is open calls fail immediately with
+    `CircuitOpenError` instead of waiting on a dead upstream.
+
+    Example::
+
+        provider = ResilientProvider(LiteLLMProvider(), max_retries=2)
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        retryable: Callable[[BaseException], bool] = is_transient,
+    ) -> None:
+        self.inner = inner
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._breaker_factory = breaker_factory
+        self._retryable = retryable
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.retries = 0
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        breaker = self.breakers.get(model)
+        if breaker is None:
+            breaker = self.breakers[model] = self._breaker_factory()
+        return breaker
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        breaker = self.breaker(model)
+        attempt = 0
+        while True:
+            breaker.acquire(model)
+            started = False
+            recorded = False
+            try:
+                async with aclosing(
+                    self.inner.stream(messages, tools, model)
+                ) as chunks:
+                    async for chunk in chunks:
+                        started = True
+                        yield chunk
+                breaker.record(True)
+                recorded = True
+                return
+            except RateLimitExceeded:
+                # Throttled locally before the call: says nothing about the model.
+                raise
+            except Exception as e:
+                transient = self._retryable(e)
+                # Client errors (bad request, auth) say nothing about model health:
+                # they are released below, counting as neither success nor failure.
+                if transient:
+                    breaker.record(False)
+                    recorded = True
+                if started or not transient or attempt >= self.max_retries:
+                    raise
+                delay = random.uniform(
+                    0, min(self.max_delay, self.base_delay * 2**attempt)
+                )
+                logger.warning(
+                    "%s failed (%s); retry %d in %.2fs", model, e, attempt + 1, delay
+                )
+            finally:
+                if not recorded:
+                    breaker.release()
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        """Breaker state per model that has been called."""
+        return {model: breaker.to_dict() for model, breaker in self.breakers.items()}
@@ -0,0 +1,45 @@
+"""Per-model selection between provider implementations."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Callable
+from contextlib import aclosing
+from typing import Any
+
+from ai.providers.base import ChunkDelta, LLMProvider
+
+# A model's provider and the model name that provider expects, or None for default.
+Route = tuple[LLMProvider, str] | None
+
+
+class RoutingProvider(LLMProvider):
+    """Sends each call to the provider `route` picks for its model.
+
+    `route(model)` returns the provider and the model name to send it (the
+    catalog ID often differs from the upstream name), or None to use
+    `default` with the model unchanged. Wrappers such as `ResilientProvider`
+    go around the router, so breakers and stats stay keyed by catalog ID.
+
+    Example::
+
+        direct = OpenAICompatibleProvider("http://localhost:8000/v1")
+        provider = RoutingProvider(
+            LiteLLMProvider(),
+            lambda model: (direct, "llama") if model == "local/llama" else None,
+        )
+    """
+
+    def __init__(self, default: LLMProvider, route: Callable[[str], Route]) -> None:
+        self.default = default
+        self.route = route
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        provider, upstream_model = self.route(model) or (self.default, model)
+        async with aclosing(provider.stream(messages, tools, upstream_model)) as chunks:
+            async for chunk in chunks:
+                yield chunk
@@ -0,0 +1,186 @@
+"""Incremental parser for JSON documents that arrive in fragments."""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+# Next character that matters inside a string, and outside of one. Everything
+# in between is skipped at C speed, so long string values cost almost nothing.
+_IN_STRING = re.compile(r'["\\]')
+_STRUCTURAL = re.compile(r'["{}\[\],:]')
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """Consumes JSON text fragment by fragment, e.g. streamed tool-call arguments.
+
+    Fragments are kept in a list and joined once, so building a large document
+    is linear rather than quadratic in its size. A lightweight scanner tracks
+    nesting as fragments arrive, which gives two things a plain
+    concat-then-``json.loads`` cannot:
+
+    - `complete` turns True as soon as the top-level object or array closes
+      (a top-level scalar is only known to be complete once fully parsed).
+    - `partial()` returns a best-effort value for the text seen so far, with
+      open strings and containers closed (``{"path": "a.py", "content": "de``
+      becomes ``{"path": "a.py", "content": "de"}``).
+
+    Example::
+
+        parser = IncrementalJSONParser()
+        for fragment in fragments:
+            if parser.feed(fragment):
+                break  # document closed
+        arguments = parser.value()
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[str] = []
+        self._text: str | None = ""
+        self._size = 0
+        self._stack: list[str] = []
+        # Parallel to _stack: for objects, whether the next string is a key.
+        self._expect_key: list[bool] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._complete = False
+        # Longest prefix known to parse once the containers open at that
+        # point are closed: (prefix length, closing brackets).
+        self._checkpoint: tuple[int, str] | None = None
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level object or array has been closed."""
+        return self._complete
+
+    @property
+    def size(self) -> int:
+        """Number of characters consumed so far."""
+        return self._size
+
+    @property
+    def text(self) -> str:
+        """The full text consumed so far."""
+        if self._text is None:
+            self._text = "".join(self._chunks)
+            self._chunks = [self._text]
+        return self._text
+
+    def feed(self, fragment: str) -> bool:
+        """Consume the next fragment. Returns `complete`."""
+        if not fragment:
+            return self._complete
+        offset = self._size
+        self._chunks.append(fragment)
+        self._text = None
+        self._size += len(fragment)
+        if not self._complete:
+            self._scan(fragment, offset)
+        return self._complete
+
+    def value(self) -> Any:
+        """Parse the full text; raises `json.JSONDecodeError` if it is not valid."""
+        return json.loads(self.text)
+
+    def partial(self) -> Any:
+        """Return a best-effort value for the text consumed so far.
+
+        Returns None when nothing parseable has arrived yet.
+        """
+        if self._complete:
+            try:
+                return self.value()
+            except json.JSONDecodeError:
+                return None
+        closers = self._closers()
+        if self._in_string and not self._string_is_key:
+            # Close the open string value; drop a dangling escape or \u sequence.
+            text = _trim_escape(self.text)
+            try:
+                return json.loads(text + '"' + closers)
+            except json.JSONDecodeError:
+                pass
+        if self._checkpoint is None:
+            return None
+        end, closers = self._checkpoint
+        try:
+            return json.loads(self.text[:end] + closers)
+        except json.JSONDecodeError:
+            return None
+
+    def _closers(self) -> str:
+        return "".join(_CLOSERS[c] for c in reversed(self._stack))
+
+    def _scan(self, fragment: str, offset: int) -> None:
+        pos = 0
+        end = len(fragment)
+        while pos < end:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _IN_STRING.search(fragment, pos)
+                if match is None:
+                    return
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if not self._string_is_key:
+                    self._checkpoint = (offset + pos, self._closers())
+                continue
+
+            match = _STRUCTURAL.search(fragment, pos)
+            if match is None:
+                return
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                self._in_string = True
+                self._string_is_key = bool(self._expect_key and self._expect_key[-1])
+            elif char in "{[":
+                self._stack.append(char)
+                self._expect_key.append(char == "{")
+                self._checkpoint = (offset + pos, self._closers())
+            elif char in "}]":
+                if not self._stack:
+                    return
+                self._stack.pop()
+                self._expect_key.pop()
+                self._checkpoint = (offset + pos, self._closers())
+                if not self._stack:
+                    self._complete = True
+                    return
+            elif char == ",":
+                if self._stack:
+                    # Everything before the comma is a finished member.
+                    self._checkpoint = (offset + pos - 1, self._closers())
+                    if self._stack[-1] == "{":
+                        self._expect_key[-1] = True
+            elif char == ":":
+                if self._stack and self._stack[-1] == "{":
+                    self._expect_key[-1] = False
+
+
+def _trim_escape(text: str) -> str:
+    """Drop an unfinished escape sequence from the end of a string prefix."""
+    backslash = text.rfind("\\", max(0, len(text) - 6))
+    if backslash == -1:
+        return text
+    # Count the run of backslashes: an even run is a sequence of escaped
+    # backslashes, not the start of a new escape.
+    run_start = backslash
+    while run_start > 0 and text[run_start - 1] == "\\":
+        run_start -= 1
+    if (backslash - run_start + 1) % 2 == 0:
+        return text
+    tail = text[backslash + 1 :]
+    if tail == "" or (tail[0] == "u" and len(tail) < 5):
+        return text[:backslash]
+    return text
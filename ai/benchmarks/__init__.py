@@ -0,0 +1 @@
+"""Micro-benchmarks for the ai package; run with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,108 @@
+"""Streamed tool-argument parsing: concat-then-parse vs IncrementalJSONParser.
+
+Simulates a model streaming a ``write_file`` call whose ``content`` argument is
+hundreds of KB, delivered in small fragments the way providers emit them.
+
+Usage::
+
+    python -m benchmarks.bench_json_stream
+    python -m benchmarks.bench_json_stream --sizes 100,400,800 --fragment 8 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ai.utils.json_stream import IncrementalJSONParser
+
+
+def _payload(size_kb: int) -> str:
+    line = 'def handler(event):\n    return {"status": "ok", "path": "C:\\\\tmp"}\n'
+    content = (line * (size_kb * 1024 // len(line) + 1))[: size_kb * 1024]
+    return json.dumps({"path": "src/generated.py", "content": content})
+
+
+def _fragments(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def concat_then_parse(fragments: list[str]) -> Any:
+    """What AgentLoop did before: grow a string held in a dict, parse at the end."""
+    state = {"arguments": ""}
+    for fragment in fragments:
+        state["arguments"] += fragment
+    return json.loads(state["arguments"])
+
+
+def incremental(fragments: list[str]) -> Any:
+    parser = IncrementalJSONParser()
+    for fragment in fragments:
+        parser.feed(fragment)
+    assert parser.complete
+    return parser.value()
+
+
+def _best_of(
+    fn: Callable[[list[str]], Any], fragments: list[str], repeat: int
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(fragments)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(sizes_kb: list[int], fragment: int, repeat: int) -> list[dict[str, Any]]:
+    results = []
+    for size_kb in sizes_kb:
+        fragments = _fragments(_payload(size_kb), fragment)
+        assert concat_then_parse(fragments) == incremental(fragments)
+        baseline = _best_of(concat_then_parse, fragments, repeat)
+        streamed = _best_of(incremental, fragments, repeat)
+        results.append(
+            {
+                "size_kb": size_kb,
+                "fragments": len(fragments),
+                "concat_then_parse_ms": round(baseline * 1000, 3),
+                "incremental_ms": round(streamed * 1000, 3),
+                "speedup": round(baseline / streamed, 2),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", default="100,300,600,900", help="payload sizes in KB"
+    )
+    parser.add_argument(
+        "--fragment", type=int, default=16, help="characters per fragment"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--json", action="store_true", help="print JSON instead of a table"
+    )
+    args = parser.parse_args()
+
+    results = run([int(s) for s in args.sizes.split(",")], args.fragment, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    header = ("size", "fragments", "concat+parse", "incremental", "speedup")
+    print("{:>7} {:>10} {:>13} {:>12} {:>8}".format(*header))
+    for r in results:
+        print(
+            f"{r['size_kb']:>5}KB {r['fragments']:>10} "
+            f"{r['concat_then_parse_ms']:>11.1f}ms {r['incremental_ms']:>10.1f}ms "
+            f"{r['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
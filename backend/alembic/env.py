@@ -11,7 +11,9 @@ from alembic import context
 # When adding new SQLAlchemy models in other domain modules, import those
 # modules here so their models are registered with Base.metadata.
 from src.ai.mcp import models as mcp_models  # noqa: F401 - register UserMcp
+from src.ai.runs import models as run_models  # noqa: F401 - register AgentRunLog
 from src.ai.skills import models as skill_models  # noqa: F401 - register UserSkill
+from src.ai.usage import models as usage_models  # noqa: F401 - register UserModelUsage
 from src.database import Base
 from src.user import models as user_models  # noqa: F401 - register User with Base.metadata
 
@@ -0,0 +1 @@
+"""Backend benchmarks; run with ``python -m benchmarks.<name>`` from backend/."""
@@ -0,0 +1,260 @@
+"""AgentLoop hot-path benchmarks: loop throughput, SSE formatting, message conversion, memory.
+
+Everything runs against `SyntheticProvider`, so results need no network or
+API keys and are comparable across runs. Output is JSON when ``--json`` or
+``--output`` is given, for tracking over time.
+
+Usage::
+
+    python -m benchmarks.bench_agent
+    python -m benchmarks.bench_agent --only loop,format --repeat 3 --json
+    python -m benchmarks.bench_agent --output bench-results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from ai.agent.events import AgentEvent
+from ai.agent.loop import AgentLoop
+from ai.agent.streams import coalesce_deltas
+
+from src.ai.adapters.messages import ClientMessage, convert_to_openai_messages
+from src.ai.formatter import event_to_dict, format_events
+
+from .synthetic import EchoTool, SyntheticProvider
+
+# name -> SyntheticProvider settings
+LOOP_SCENARIOS: dict[str, dict[str, Any]] = {
+    "text_1k_chunks": {"text_chunks": 1000},
+    "tools_8x4kb": {"text_chunks": 50, "tool_calls": 8, "argument_size": 4096},
+    "tool_256kb_args": {"text_chunks": 10, "tool_calls": 1, "argument_size": 256 * 1024},
+}
+HISTORY_SIZES = (10, 100, 1000)
+CONCURRENCY_LEVELS = (1, 10, 100)
+
+
+def _loop(provider: SyntheticProvider, **kwargs: Any) -> AgentLoop:
+    return AgentLoop(provider, [EchoTool()], model="synthetic", **kwargs)
+
+
+async def _collect(loop: AgentLoop) -> list[AgentEvent]:
+    return [e async for e in loop.run([{"role": "user", "content": "go"}])]
+
+
+async def _replay(events: list[AgentEvent]) -> AsyncGenerator[AgentEvent, None]:
+    for event in events:
+        yield event
+
+
+async def _best_of(fn: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def bench_loop(repeat: int) -> list[dict[str, Any]]:
+    """Events per second through AgentLoop.run, tools included."""
+    results = []
+    for name, settings in LOOP_SCENARIOS.items():
+        provider = SyntheticProvider(**settings)
+        events = len(await _collect(_loop(provider)))
+        best = await _best_of(lambda p=provider: _collect(_loop(p)), repeat)
+        results.append(
+            {
+                "scenario": name,
+                "events": events,
+                "run_ms": round(best * 1000, 3),
+                "events_per_sec": round(events / best),
+            }
+        )
+    return results
+
+
+async def bench_format(repeat: int) -> list[dict[str, Any]]:
+    """Per-event cost of event_to_dict and format_events, and frames left after coalescing."""
+    results = []
+    for name, settings in LOOP_SCENARIOS.items():
+        events = await _collect(_loop(SyntheticProvider(**settings)))
+
+        async def to_dict(events: list[AgentEvent] = events) -> None:
+            for event in events:
+                event_to_dict(event)
+
+        async def sse(events: list[AgentEvent] = events) -> None:
+            async for _ in format_events(_replay(events)):
+                pass
+
+        frames = len([e async for e in coalesce_deltas(_replay(events), max_delay=60)])
+        dict_best = await _best_of(to_dict, repeat)
+        sse_best = await _best_of(sse, repeat)
+        results.append(
+            {
+                "scenario": name,
+                "events": len(events),
+                "event_to_dict_us_per_event": round(dict_best / len(events) * 1e6, 3),
+                "format_events_us_per_event": round(sse_best / len(events) * 1e6, 3),
+                "coalesced_frames": frames,
+            }
+        )
+    return results
+
+
+def _history(size: int) -> list[ClientMessage]:
+    """Alternating user/assistant turns; every other assistant turn calls a tool."""
+    messages = []
+    for i in range(size):
+        if i % 2 == 0:
+            messages.append({"role": "user", "parts": [{"type": "text", "text": f"q{i} " * 20}]})
+            continue
+        parts: list[dict[str, Any]] = [{"type": "text", "text": f"a{i} " * 40}]
+        if i % 4 == 1:
+            parts.append(
+                {
+                    "type": "tool-echo",
+                    "toolCallId": f"call_{i}",
+                    "state": "output-available",
+                    "input": {"payload": "y" * 200},
+                    "output": "200",
+                }
+            )
+        messages.append({"role": "assistant", "parts": parts})
+    return [ClientMessage.model_validate(m) for m in messages]
+
+
+async def bench_convert(repeat: int) -> list[dict[str, Any]]:
+    """Cost of convert_to_openai_messages for growing histories."""
+    results = []
+    for size in HISTORY_SIZES:
+        history = _history(size)
+
+        async def convert(history: list[ClientMessage] = history) -> None:
+            convert_to_openai_messages(history)
+
+        best = await _best_of(convert, repeat)
+        results.append(
+            {
+                "messages": size,
+                "convert_ms": round(best * 1000, 3),
+                "us_per_message": round(best / size * 1e6, 3),
+            }
+        )
+    return results
+
+
+async def bench_memory(repeat: int) -> list[dict[str, Any]]:
+    """Peak traced memory per run with N runs in flight at once."""
+    results = []
+    for concurrency in CONCURRENCY_LEVELS:
+        # A small per-chunk delay keeps every run alive at the same time.
+        provider = SyntheticProvider(
+            text_chunks=200, tool_calls=2, argument_size=8192, chunk_delay=0.0005
+        )
+        gc.collect()
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            await asyncio.gather(*(_collect(_loop(provider)) for _ in range(concurrency)))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        results.append(
+            {
+                "concurrent_runs": concurrency,
+                "peak_kb": round((peak - baseline) / 1024, 1),
+                "kb_per_run": round((peak - baseline) / 1024 / concurrency, 1),
+            }
+        )
+    return results
+
+
+BENCHMARKS: dict[str, Callable[[int], Awaitable[list[dict[str, Any]]]]] = {
+    "loop": bench_loop,
+    "format": bench_format,
+    "convert": bench_convert,
+    "memory": bench_memory,
+}
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(names: list[str], repeat: int) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        }
+    }
+    for name in names:
+        report[name] = await BENCHMARKS[name](repeat)
+    return report
+
+
+def _print_table(report: dict[str, Any]) -> None:
+    for name in BENCHMARKS:
+        rows = report.get(name)
+        if not rows:
+            continue
+        print(f"\n{name}")
+        columns = list(rows[0])
+        widths = [max(len(c), *(len(str(r[c])) for r in rows)) for c in columns]
+        print("  ".join(c.rjust(w) for c, w in zip(columns, widths, strict=True)))
+        for row in rows:
+            print("  ".join(str(row[c]).rjust(w) for c, w in zip(columns, widths, strict=True)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--only", default=",".join(BENCHMARKS), help=f"subset of {','.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="best of N timings")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of tables")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    names = [n for n in args.only.split(",") if n]
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(names, args.repeat))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        _print_table(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Provider streaming overhead: LiteLLMProvider vs OpenAICompatibleProvider.
+
+Both providers stream the same scripted responses from `mock_openai`, run in a
+subprocess so the client's CPU time per chunk is measured on its own. Needs no
+network or API keys.
+
+Usage::
+
+    python -m benchmarks.bench_providers
+    python -m benchmarks.bench_providers --chunks 2000 --requests 20 --concurrency 1,8 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ai.providers.base import LLMProvider
+from ai.providers.litellm import LiteLLMProvider
+from ai.providers.openai_compat import OpenAICompatibleProvider
+
+_MESSAGES = [{"role": "user", "content": "go"}]
+
+
+def _start_mock(text_chunks: int) -> tuple[subprocess.Popen[str], str]:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.mock_openai",
+            "--port",
+            "0",
+            "--text-chunks",
+            str(text_chunks),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("mock_openai did not start")
+    return process, line.rsplit(" ", 1)[-1].strip()
+
+
+async def _stream_once(provider: LLMProvider, model: str) -> int:
+    return sum([1 async for _ in provider.stream(_MESSAGES, [], model)])
+
+
+async def _measure(
+    provider: LLMProvider, model: str, requests: int, concurrency: int
+) -> dict[str, Any]:
+    await _stream_once(provider, model)  # open connections, warm caches
+    pending = iter(range(requests))
+    chunks = 0
+
+    async def worker() -> None:
+        nonlocal chunks
+        for _ in pending:
+            chunks += await _stream_once(provider, model)
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return {
+        "chunks": chunks,
+        "wall_ms": round(wall * 1000, 1),
+        "chunks_per_s": round(chunks / wall),
+        "cpu_us_per_chunk": round(cpu / chunks * 1e6, 2),
+    }
+
+
+async def run(chunks: int, requests: int, levels: list[int]) -> list[dict[str, Any]]:
+    process, base_url = _start_mock(chunks)
+    # LiteLLM's OpenAI client reads these per call.
+    os.environ["OPENAI_API_BASE"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    direct = OpenAICompatibleProvider(base_url, api_key="mock")
+    providers: dict[str, tuple[Callable[[], LLMProvider], str]] = {
+        "litellm": (LiteLLMProvider, "openai/mock"),
+        "openai_compat": (lambda: direct, "mock"),
+    }
+    results = []
+    try:
+        for concurrency in levels:
+            row: dict[str, Any] = {"concurrency": concurrency, "chunks_per_response": chunks}
+            for name, (factory, model) in providers.items():
+                row[name] = await _measure(factory(), model, requests, concurrency)
+            row["cpu_speedup"] = round(
+                row["litellm"]["cpu_us_per_chunk"] / row["openai_compat"]["cpu_us_per_chunk"], 2
+            )
+            results.append(row)
+    finally:
+        await direct.aclose()
+        process.terminate()
+        process.wait()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=1000, help="text chunks per response")
+    parser.add_argument("--requests", type=int, default=20, help="responses per measurement")
+    parser.add_argument("--concurrency", default="1,8", help="comma-separated levels")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results = asyncio.run(run(args.chunks, args.requests, levels))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'concurrency':>11} {'provider':>14} {'chunks/s':>10} {'cpu us/chunk':>13}")
+    for row in results:
+        for name in ("litellm", "openai_compat"):
+            stats = row[name]
+            print(
+                f"{row['concurrency']:>11} {name:>14} {stats['chunks_per_s']:>10} "
+                f"{stats['cpu_us_per_chunk']:>13}"
+            )
+        print(f"{'':>11} {'cpu speedup':>14} {row['cpu_speedup']:>10}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Load generator for the chat endpoint: throughput and latency of the whole stack.
+
+Signs up (or logs in) a pool of users, then has `--concurrency` clients send
+chat requests to ``POST /api/ai`` as those users in turn, reading each SSE
+stream to the end. Reports throughput, HTTP statuses, in-stream errors, and
+percentiles of time to first text and total latency.
+
+Run offline against the local mock LLM::
+
+    python -m benchmarks.mock_openai --tokens-per-second 50 --ttft 0.3 --ttft-sigma 0.5
+    MOCK_LLM_BASE_URL=http://127.0.0.1:8099/v1 make dev
+    python -m benchmarks.loadgen --users 20 --concurrency 50 --requests 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+# The catalog model served by the mock LLM (see MOCK_MODEL_ID in src.ai.models.repository).
+_MOCK_MODEL = "mock/mock-llm"
+
+
+@dataclass
+class Result:
+    """One chat request as the client saw it."""
+
+    status: int
+    ttft: float | None = None
+    latency: float = 0.0
+    text_chars: int = 0
+    error: str | None = None
+    queued: bool = False
+
+
+@dataclass
+class Report:
+    """Results of a load test run and its wall-clock duration."""
+
+    results: list[Result] = field(default_factory=list)
+    wall: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        ok = [r for r in self.results if r.status == 200 and r.error is None]
+        ttfts = sorted(r.ttft for r in ok if r.ttft is not None)
+        latencies = sorted(r.latency for r in ok)
+        return {
+            "requests": len(self.results),
+            "ok": len(ok),
+            "statuses": dict(Counter(r.status for r in self.results)),
+            "errors": dict(Counter(r.error for r in self.results if r.error)),
+            "queued": sum(r.queued for r in self.results),
+            "wall_s": round(self.wall, 2),
+            "requests_per_s": round(len(self.results) / self.wall, 2) if self.wall else 0,
+            "chars_per_s": round(sum(r.text_chars for r in ok) / self.wall) if self.wall else 0,
+            "ttft_ms": _percentiles(ttfts),
+            "latency_ms": _percentiles(latencies),
+        }
+
+
+def _percentiles(values: list[float]) -> dict[str, float | None]:
+    def at(q: float) -> float | None:
+        if not values:
+            return None
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+    return {"p50": at(0.5), "p90": at(0.9), "p99": at(0.99), "max": at(1.0)}
+
+
+async def _token(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Bearer token for `email`, signing the user up first if needed."""
+    response = await client.post(
+        "/api/auth/signup", json={"name": email, "email": email, "password": password}
+    )
+    if response.status_code not in (201, 409):
+        response.raise_for_status()
+    response = await client.post("/api/auth/token", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _chat(client: httpx.AsyncClient, token: str, body: dict[str, Any]) -> Result:
+    started = time.perf_counter()
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        async with client.stream("POST", "/api/ai", json=body, headers=headers) as response:
+            result = Result(status=response.status_code)
+            if response.status_code != 200:
+                await response.aread()
+                result.latency = time.perf_counter() - started
+                return result
+            done = False
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    done = True
+                    continue
+                part = json.loads(data)
+                kind = part.get("type")
+                if kind == "text-delta":
+                    if result.ttft is None:
+                        result.ttft = time.perf_counter() - started
+                    result.text_chars += len(part.get("delta", ""))
+                elif kind == "error":
+                    result.error = "stream error"
+                elif kind == "data-queue":
+                    result.queued = True
+            if not done and result.error is None:
+                result.error = "stream cut off"
+    except httpx.HTTPError as e:
+        result = Result(status=0, error=type(e).__name__)
+    result.latency = time.perf_counter() - started
+    return result
+
+
+async def run(
+    base_url: str,
+    users: int,
+    concurrency: int,
+    requests: int,
+    model: str,
+    prompt: str,
+    password: str,
+    timeout: float,
+) -> Report:
+    limits = httpx.Limits(max_connections=concurrency + users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        tokens = await asyncio.gather(
+            *(_token(client, f"loadgen-{i}@example.com", password) for i in range(users))
+        )
+        body = {"modelId": model, "messages": [{"role": "user", "content": prompt}]}
+        report = Report()
+        pending = iter(range(requests))
+
+        async def worker() -> None:
+            for i in pending:
+                report.results.append(await _chat(client, tokens[i % users], body))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        report.wall = time.perf_counter() - started
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="distinct users to spread load over")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight")
+    parser.add_argument("--requests", type=int, default=100, help="total requests")
+    parser.add_argument("--model", default=_MOCK_MODEL)
+    parser.add_argument("--prompt", default="Tell me about the weather.")
+    parser.add_argument("--password", default="loadgen-password")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds per request")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run(
+            args.base_url,
+            args.users,
+            args.concurrency,
+            args.requests,
+            args.model,
+            args.prompt,
+            args.password,
+            args.timeout,
+        )
+    )
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
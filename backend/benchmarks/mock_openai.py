@@ -0,0 +1,341 @@
+"""Local mock of an OpenAI-compatible streaming chat completions API.
+
+Answers ``POST .../chat/completions`` with a scripted SSE stream (text deltas,
+then optionally tool calls, a finish chunk, a usage chunk and ``[DONE]``)
+over HTTP/1.1 keep-alive, using only asyncio. Lets provider implementations
+be tested and benchmarked, and the whole backend load-tested, without a
+network or API keys.
+
+The script sets the pace (tokens per second after a log-normally distributed
+time to first token), tool calls to the tools sent with the request, and
+injected errors (error statuses, streams cut off halfway).
+
+Usage::
+
+    python -m benchmarks.mock_openai --port 8099 --text-chunks 200
+    # then point a client at http://127.0.0.1:8099/v1, or the backend at it with
+    # MOCK_LLM_BASE_URL=http://127.0.0.1:8099/v1 (model "mock/mock-llm")
+    python -m benchmarks.mock_openai --tokens-per-second 50 --ttft 0.4 --ttft-sigma 0.5 \
+        --tool-calls 1 --tool-name load_skill --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+@dataclass
+class MockScript:
+    """Shape of every streamed response.
+
+    Each text chunk counts as one token. `chunk_delay` seconds are slept before
+    each chunk (0 streams back to back), or ``1 / tokens_per_second`` when that
+    is set. Before the first chunk the server waits a time to first token drawn
+    from a log-normal distribution with median `ttft` seconds and shape
+    `ttft_sigma` (0 always waits `ttft`).
+
+    The first call of a conversation (no tool results yet) also streams
+    `tool_calls` calls, cycling through the request's tools (only those in
+    `tool_names`, if set) with arguments made up from their JSON schemas.
+    Without tools in the request, calls go to an ``echo`` tool with an
+    `argument_size` payload.
+
+    `status` other than 200 answers every request with an OpenAI-style error
+    body instead; `error_rate` does so for that fraction of requests with
+    `error_status`, and `midstream_error_rate` cuts that fraction of streams
+    off halfway through the text. `seed` makes the random draws repeatable.
+    """
+
+    text_chunks: int = 100
+    chunk_size: int = 4
+    tool_calls: int = 0
+    argument_size: int = 64
+    fragment_size: int = 16
+    chunk_delay: float = 0.0
+    status: int = 200
+    tokens_per_second: float | None = None
+    ttft: float = 0.0
+    ttft_sigma: float = 0.0
+    tool_names: list[str] | None = None
+    error_rate: float = 0.0
+    error_status: int = 503
+    midstream_error_rate: float = 0.0
+    seed: int | None = None
+
+
+class MockOpenAIServer:
+    """Serves `MockScript` responses on localhost.
+
+    Example::
+
+        async with MockOpenAIServer(MockScript(text_chunks=10)) as server:
+            provider = OpenAICompatibleProvider(server.base_url)
+    """
+
+    def __init__(
+        self, script: MockScript | None = None, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        self.script = script or MockScript()
+        self.host = host
+        self.port = port
+        # The most recent requests, for inspection; long load tests send millions.
+        self.requests: deque[dict[str, Any]] = deque(maxlen=1000)
+        self.connections = 0
+        self.errors = 0
+        self._random = random.Random(self.script.seed)
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> MockOpenAIServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path, _ = request_line.split(" ", 2)
+                if method == "POST" and path.endswith("/chat/completions"):
+                    await self._completion(json.loads(body), writer)
+                elif method == "GET" and path.endswith("/models"):
+                    await _respond(writer, 200, {"object": "list", "data": [{"id": "mock"}]})
+                else:
+                    await _respond(writer, 404, {"error": {"message": f"No route {path}"}})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _completion(self, request: dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        self.requests.append(request)
+        script = self.script
+        status = script.status
+        if status == 200 and self._random.random() < script.error_rate:
+            status = script.error_status
+        if status != 200:
+            self.errors += 1
+            error = {"message": "mock error", "type": "server_error", "code": status}
+            await _respond(writer, status, {"error": error})
+            return
+
+        ttft = script.ttft
+        if ttft and script.ttft_sigma:
+            ttft = self._random.lognormvariate(math.log(ttft), script.ttft_sigma)
+        if ttft:
+            await asyncio.sleep(ttft)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        delay = 1 / script.tokens_per_second if script.tokens_per_second else script.chunk_delay
+        cut_at = None
+        if self._random.random() < script.midstream_error_rate:
+            cut_at = 1 + script.text_chunks // 2
+        tools = _pick_tools(request, script) if _first_call(request) else []
+        for index, payload in enumerate(_stream(script, request, tools)):
+            if index == cut_at:
+                self.errors += 1
+                writer.transport.abort()
+                raise ConnectionResetError("mock stream cut off")
+            if delay and index:
+                await asyncio.sleep(delay)
+            event = b"data: " + payload + b"\n\n"
+            writer.write(b"%x\r\n%b\r\n" % (len(event), event))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def _first_call(request: dict[str, Any]) -> bool:
+    return not any(m.get("role") == "tool" for m in request.get("messages", []))
+
+
+def _pick_tools(request: dict[str, Any], script: MockScript) -> list[dict[str, Any] | None]:
+    """The function definition for each scripted tool call (None: the echo tool)."""
+    if not script.tool_calls:
+        return []
+    functions = [tool.get("function", tool) for tool in request.get("tools") or ()]
+    if script.tool_names is not None:
+        functions = [f for f in functions if f.get("name") in script.tool_names]
+    if not request.get("tools"):
+        return [None] * script.tool_calls
+    if not functions:
+        return []
+    return [functions[i % len(functions)] for i in range(script.tool_calls)]
+
+
+def _sample_value(schema: dict[str, Any], size: int) -> Any:
+    """A value of the JSON schema's type (first enum value if it has one)."""
+    if schema.get("enum"):
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "string")
+    if kind == "object":
+        return _sample_arguments(schema, size)
+    return {
+        "integer": 1,
+        "number": 1.5,
+        "boolean": True,
+        "array": [],
+        "null": None,
+    }.get(kind, "y" * size)
+
+
+def _sample_arguments(schema: dict[str, Any], size: int) -> dict[str, Any]:
+    properties = schema.get("properties") or {}
+    required = schema.get("required") or list(properties)
+    return {name: _sample_value(properties.get(name, {}), size) for name in required}
+
+
+def _prompt_tokens(request: dict[str, Any]) -> int:
+    """Roughly 4 characters per token, like the limits of a real API."""
+    chars = sum(len(str(m.get("content") or "")) for m in request.get("messages", []))
+    return max(1, chars // 4)
+
+
+def _stream(
+    script: MockScript, request: dict[str, Any], tools: list[dict[str, Any] | None]
+) -> list[bytes]:
+    """The SSE data payloads of one response, pre-encoded."""
+    model = request.get("model", "mock")
+    base = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "model": model}
+
+    def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> bytes:
+        choice = {"index": 0, "delta": delta, "finish_reason": finish_reason}
+        return json.dumps({**base, "choices": [choice]}).encode()
+
+    payloads = [chunk({"role": "assistant", "content": ""})]
+    # Vary the text: LiteLLM aborts streams that repeat the same chunk many times.
+    payloads.extend(
+        chunk({"content": _LETTERS[i % len(_LETTERS)] * script.chunk_size})
+        for i in range(script.text_chunks)
+    )
+    for index, function in enumerate(tools):
+        if function is None:
+            name, arguments = "echo", {"payload": "y" * script.argument_size}
+        else:
+            name = function["name"]
+            arguments = _sample_arguments(function.get("parameters") or {}, script.argument_size)
+        encoded = json.dumps(arguments)
+        fragments = [
+            encoded[i : i + script.fragment_size]
+            for i in range(0, len(encoded), script.fragment_size)
+        ] or [""]
+        delta = {"name": name, "arguments": fragments[0]}
+        call = {"index": index, "id": f"call_{index}", "type": "function", "function": delta}
+        payloads.append(chunk({"tool_calls": [call]}))
+        for fragment in fragments[1:]:
+            call = {"index": index, "function": {"arguments": fragment}}
+            payloads.append(chunk({"tool_calls": [call]}))
+    payloads.append(chunk({}, "tool_calls" if tools else "stop"))
+    prompt_tokens = _prompt_tokens(request)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": script.text_chunks,
+        "total_tokens": prompt_tokens + script.text_chunks,
+    }
+    payloads.append(json.dumps({**base, "choices": [], "usage": usage}).encode())
+    payloads.append(b"[DONE]")
+    return payloads
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, body: dict[str, Any]) -> None:
+    data = json.dumps(body).encode()
+    writer.write(
+        b"HTTP/1.1 %d Mock\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%b"
+        % (status, len(data), data)
+    )
+    await writer.drain()
+
+
+async def _serve_forever(server: MockOpenAIServer) -> None:
+    async with server:
+        print(f"Serving mock OpenAI API at {server.base_url}", flush=True)
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--text-chunks", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=4)
+    parser.add_argument("--tool-calls", type=int, default=0)
+    parser.add_argument("--argument-size", type=int, default=64)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--status", type=int, default=200)
+    parser.add_argument("--tokens-per-second", type=float, help="text chunks per second")
+    parser.add_argument("--ttft", type=float, default=0.0, help="median seconds to first token")
+    parser.add_argument("--ttft-sigma", type=float, default=0.0, help="log-normal TTFT spread")
+    parser.add_argument(
+        "--tool-name", action="append", dest="tool_names", help="only call these tools"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--midstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    script = MockScript(
+        text_chunks=args.text_chunks,
+        chunk_size=args.chunk_size,
+        tool_calls=args.tool_calls,
+        argument_size=args.argument_size,
+        chunk_delay=args.chunk_delay,
+        status=args.status,
+        tokens_per_second=args.tokens_per_second,
+        ttft=args.ttft,
+        ttft_sigma=args.ttft_sigma,
+        tool_names=args.tool_names,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        midstream_error_rate=args.midstream_error_rate,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(_serve_forever(MockOpenAIServer(script, args.host, args.port)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
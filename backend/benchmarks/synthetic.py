@@ -0,0 +1,93 @@
+"""Synthetic provider and tool for driving AgentLoop without a network."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from ai.agent.tools.base import Tool
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta, Usage
+from pydantic import BaseModel
+
+
+class SyntheticProvider(LLMProvider):
+    """Streams a configurable response shape.
+
+    The first call streams `text_chunks` text deltas followed by `tool_calls`
+    calls to `EchoTool`, each with a ``payload`` argument of `argument_size`
+    characters split into `fragment_size` pieces. Every later call (after the
+    tool results come back) streams the text again and stops, so one run is
+    two iterations when tools are involved.
+
+    `chunk_delay` seconds are slept before each chunk to model a real stream;
+    0 yields without sleeping.
+    """
+
+    def __init__(
+        self,
+        text_chunks: int = 100,
+        chunk_size: int = 4,
+        tool_calls: int = 0,
+        argument_size: int = 64,
+        fragment_size: int = 16,
+        chunk_delay: float = 0.0,
+    ) -> None:
+        self.text_chunks = text_chunks
+        self.chunk_size = chunk_size
+        self.tool_calls = tool_calls
+        self.argument_size = argument_size
+        self.fragment_size = fragment_size
+        self.chunk_delay = chunk_delay
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        model: str,
+    ) -> AsyncGenerator[ChunkDelta, None]:
+        first_call = not any(m.get("role") == "tool" for m in messages)
+        for chunk in self._chunks(with_tools=first_call and self.tool_calls > 0):
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            yield chunk
+
+    def _chunks(self, with_tools: bool) -> list[ChunkDelta]:
+        text = "x" * self.chunk_size
+        chunks = [ChunkDelta(content=text) for _ in range(self.text_chunks)]
+        if with_tools:
+            arguments = json.dumps({"payload": "y" * self.argument_size})
+            for index in range(self.tool_calls):
+                fragments = [
+                    arguments[i : i + self.fragment_size]
+                    for i in range(0, len(arguments), self.fragment_size)
+                ]
+                chunks.append(
+                    ChunkDelta(
+                        tool_calls=[
+                            ToolCallDelta(index=index, id=f"call_{index}", name=EchoTool.name)
+                        ]
+                    )
+                )
+                chunks.extend(
+                    ChunkDelta(tool_calls=[ToolCallDelta(index=index, arguments=fragment)])
+                    for fragment in fragments
+                )
+            chunks.append(ChunkDelta(finish_reason="tool_calls"))
+        else:
+            chunks.append(ChunkDelta(finish_reason="stop"))
+        chunks.append(ChunkDelta(usage=Usage(prompt_tokens=100, completion_tokens=10)))
+        return chunks
+
+
+class EchoTool(Tool):
+    """Return the size of the payload."""
+
+    name = "echo"
+
+    class Input(BaseModel):
+        payload: str
+
+    async def execute(self, input: Input) -> str:
+        return str(len(input.payload))
@@ -0,0 +1,245 @@
+"""Admission control for agent runs: concurrency limits and a per-user fair queue."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator, Callable, Hashable, Iterable
+from contextlib import aclosing
+from typing import Any
+
+from ai.agent.events import AgentEvent, DataPart, Error
+from ai.agent.metrics import MetricsHook, Timing
+
+from src.ai.metrics import timing_collector
+from src.config import settings
+
+
+class AdmissionRejected(Exception):
+    """The queue is full (overall or for this user); the run was not queued."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """One run's place in the admission controller, from enqueue to release."""
+
+    __slots__ = ("user", "tag", "enqueued_at", "admitted", "released")
+
+    def __init__(self, user: Hashable, tag: float, enqueued_at: float) -> None:
+        self.user = user
+        self.tag = tag
+        self.enqueued_at = enqueued_at
+        self.admitted: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self.released = False
+
+
+class AdmissionController:
+    """Caps concurrent runs overall and per user, queueing the excess fairly.
+
+    Runs start at once while fewer than `max_concurrent` are active overall and
+    fewer than `max_per_user` for their user. Otherwise they queue, at most
+    `max_queue` overall and `max_queued_per_user` per user; beyond that
+    `check` and `enqueue` raise `AdmissionRejected`. Free slots go to queued runs in
+    weighted fair order (start-time fair queuing): each user's runs are
+    tagged with a virtual finish time that grows by ``1 / weight(user)`` per
+    run, so a user who queues a burst waits behind one run of everyone else
+    instead of ahead of them. A run still queued after `queue_timeout`
+    seconds gives up. Each admission's queue wait is reported to `hooks` as a
+    ``queue_wait`` timing.
+
+    Example::
+
+        admission.check(user_id)  # AdmissionRejected -> HTTP 429
+        events = admission.admitted(user_id, run_agent(...))
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 64,
+        max_per_user: int = 4,
+        max_queue: int = 256,
+        max_queued_per_user: int = 16,
+        queue_timeout: float = 30.0,
+        weight: Callable[[Hashable], float] = lambda user: 1.0,
+        update_interval: float = 1.0,
+        retry_after: float = 5.0,
+        hooks: Iterable[MetricsHook] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.queue_timeout = queue_timeout
+        self.update_interval = update_interval
+        self.retry_after = retry_after
+        self._weight = weight
+        self._hooks = list(hooks)
+        self._clock = clock
+        self._queue: list[Ticket] = []
+        self._queued_by_user: Counter[Hashable] = Counter()
+        self._active_by_user: Counter[Hashable] = Counter()
+        self._active = 0
+        self._virtual_time = 0.0
+        self._last_tag: dict[Hashable, float] = {}
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def check(self, user: Hashable) -> None:
+        """Raise `AdmissionRejected` if a run for `user` could not even be queued."""
+        if self._active < self.max_concurrent and self._active_by_user[user] < self.max_per_user:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected("Server is at capacity", self.retry_after)
+        if self._queued_by_user[user] >= self.max_queued_per_user:
+            self.rejected += 1
+            raise AdmissionRejected("Too many queued requests", self.retry_after)
+
+    def enqueue(self, user: Hashable) -> Ticket:
+        """Take a slot now or a place in the queue; raise if the queue is full.
+
+        The ticket must be given back with `release` (as `admitted` does).
+        """
+        self.check(user)
+        tag = max(self._virtual_time, self._last_tag.get(user, 0.0)) + 1 / self._weight(user)
+        self._last_tag[user] = tag
+        ticket = Ticket(user, tag, self._clock())
+        self._queue.append(ticket)
+        self._queued_by_user[user] += 1
+        self._dispatch()
+        if not ticket.admitted.done():
+            self.queued_total += 1
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place in the queue (0 once admitted), in fair-queue order."""
+        if ticket.admitted.done():
+            return 0
+        return 1 + sum(1 for other in self._queue if other.tag < ticket.tag)
+
+    def release(self, ticket: Ticket) -> None:
+        """The run ended (or gave up waiting); free its slot or queue place."""
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket.admitted.done():
+            self._active -= 1
+            self._active_by_user[ticket.user] -= 1
+            if not self._active_by_user[ticket.user]:
+                del self._active_by_user[ticket.user]
+        else:
+            self._queue.remove(ticket)
+            self._unqueue(ticket.user)
+        if not self._queued_by_user[ticket.user] and not self._active_by_user[ticket.user]:
+            # Idle users start over at the current virtual time.
+            self._last_tag.pop(ticket.user, None)
+        self._dispatch()
+
+    async def admitted(
+        self, user: Hashable, events: AsyncGenerator[AgentEvent, None]
+    ) -> AsyncGenerator[AgentEvent, None]:
+        """`events` once a slot for `user` is free, preceded by queue position updates.
+
+        While queued, a transient ``data-queue`` part reports the position
+        whenever it changes. The slot is taken when iteration starts (call
+        `check` up front to turn a full queue into an HTTP 429) and released
+        when the events end or the consumer stops. If the queue is full by
+        then, or the queue timeout passes first, an `Error` is yielded instead
+        and `events` never starts.
+        """
+        async with aclosing(events):
+            try:
+                ticket = self.enqueue(user)
+            except AdmissionRejected as e:
+                yield Error(error_text=f"Too many requests (429): {e}. Please try again later.")
+                return
+            try:
+                deadline = ticket.enqueued_at + self.queue_timeout
+                reported = 0
+                while not ticket.admitted.done():
+                    position = self.position(ticket)
+                    if position != reported:
+                        reported = position
+                        yield self._queue_part(position)
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        yield Error(
+                            error_text="Too many requests (429): still queued after "
+                            f"{self.queue_timeout:g}s. Please try again later."
+                        )
+                        return
+                    await asyncio.wait(
+                        [ticket.admitted], timeout=min(self.update_interval, remaining)
+                    )
+                if reported:
+                    yield self._queue_part(0)
+                async for event in events:
+                    yield event
+            finally:
+                self.release(ticket)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "active": self._active,
+            "queued": len(self._queue),
+            "activeUsers": len(self._active_by_user),
+            "queuedUsers": len(self._queued_by_user),
+            "admitted": self.admitted_total,
+            "queuedTotal": self.queued_total,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "maxConcurrent": self.max_concurrent,
+            "maxQueue": self.max_queue,
+        }
+
+    def _dispatch(self) -> None:
+        while self._active < self.max_concurrent and self._queue:
+            eligible = [t for t in self._queue if self._active_by_user[t.user] < self.max_per_user]
+            if not eligible:
+                return
+            ticket = min(eligible, key=lambda t: t.tag)
+            self._queue.remove(ticket)
+            self._unqueue(ticket.user)
+            self._virtual_time = max(self._virtual_time, ticket.tag - 1 / self._weight(ticket.user))
+            self._active += 1
+            self._active_by_user[ticket.user] += 1
+            self.admitted_total += 1
+            ticket.admitted.set_result(None)
+            timing = Timing("queue_wait", (self._clock() - ticket.enqueued_at) * 1000)
+            for hook in self._hooks:
+                hook(timing)
+
+    def _unqueue(self, user: Hashable) -> None:
+        self._queued_by_user[user] -= 1
+        if not self._queued_by_user[user]:
+            del self._queued_by_user[user]
+
+    def _queue_part(self, position: int) -> DataPart:
+        data = {"position": position, "queued": len(self._queue), "active": self._active}
+        return DataPart(data_type="queue", data=data, id="queue", transient=True)
+
+
+admission = AdmissionController(
+    max_concurrent=settings.agent_max_concurrent_runs,
+    max_per_user=settings.agent_max_runs_per_user,
+    max_queue=settings.agent_admission_max_queue,
+    max_queued_per_user=settings.agent_admission_max_queued_per_user,
+    queue_timeout=settings.agent_admission_queue_timeout,
+    hooks=[timing_collector.record],
+)
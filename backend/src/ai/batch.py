@@ -0,0 +1,173 @@
+"""Batch agent execution for evals and offline jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator, Callable, Iterable
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from ai.agent.events import (
+    Abort,
+    AgentEvent,
+    Error,
+    Finish,
+    TextDelta,
+    ToolInputAvailable,
+    ToolOutputAvailable,
+)
+from ai.providers.base import LLMProvider, Usage
+from sqlalchemy.orm import Session
+
+from src.ai.admission import AdmissionController
+from src.ai.handler import AgentSession, agent_session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """One conversation to run, in OpenAI message format."""
+
+    id: str
+    messages: list[dict[str, Any]]
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch item: "ok", "error" or "timeout"."""
+
+    id: str
+    status: str = "ok"
+    text: str = ""
+    tool_calls: list[dict[str, Any]] = field(default_factory=list)
+    finish_reason: str | None = None
+    usage: Usage = field(default_factory=Usage)
+    duration_ms: float = 0.0
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "text": self.text,
+            "toolCalls": self.tool_calls,
+            "finishReason": self.finish_reason,
+            "usage": self.usage.to_dict(),
+            "durationMs": round(self.duration_ms, 3),
+            "error": self.error,
+        }
+
+
+async def run_batch(
+    items: Iterable[BatchItem],
+    model: str,
+    user_id: UUID | None = None,
+    session_factory: Callable[[], Session] | None = None,
+    prompt_id: str | None = None,
+    concurrency: int = 8,
+    item_timeout: float | None = None,
+    provider: LLMProvider | None = None,
+    admission: AdmissionController | None = None,
+) -> AsyncGenerator[BatchResult, None]:
+    """Run every item through the agent, yielding results as they complete.
+
+    All items share one `AgentSession` (tool catalog, skills, MCP sessions),
+    at most `concurrency` run at a time, and each is cut off after
+    `item_timeout` seconds. A failing or timed-out item is reported in its
+    result and does not affect the others. Closing the generator cancels
+    the items still running. With `admission`, each item also takes a run
+    slot for `user_id` from it, like a chat request, so batches count toward
+    the same limits; time spent queued counts toward `item_timeout`.
+
+    Example::
+
+        items = [BatchItem(id=str(i), messages=m) for i, m in enumerate(dataset)]
+        async for result in run_batch(items, "openai/gpt-4o-mini", concurrency=16):
+            print(result.id, result.status, result.text)
+    """
+    pending = iter(items)
+    results: asyncio.Queue[BatchResult | None] = asyncio.Queue()
+
+    async with agent_session(user_id, session_factory, prompt_id, provider=provider) as session:
+
+        async def worker() -> None:
+            try:
+                for item in pending:
+                    await results.put(
+                        await _run_item(session, item, model, item_timeout, admission)
+                    )
+            finally:
+                results.put_nowait(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+        try:
+            running = len(workers)
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                else:
+                    yield result
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def _run_item(
+    session: AgentSession,
+    item: BatchItem,
+    model: str,
+    timeout: float | None,
+    admission: AdmissionController | None,
+) -> BatchResult:
+    result = BatchResult(id=item.id)
+    text: list[str] = []
+    loop = session.loop(model)
+    events = session.run(loop, item.messages)
+    if admission is not None:
+        events = admission.admitted(session.user_id, events)
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(timeout):
+            async with aclosing(events):
+                async for event in events:
+                    _collect(result, text, event)
+    except TimeoutError:
+        result.status = "timeout"
+        result.error = f"Timed out after {timeout}s"
+    except Exception as e:
+        logger.exception("Batch item %s failed", item.id)
+        result.status = "error"
+        result.error = str(e)
+    result.text = "".join(text)
+    result.usage = loop.usage
+    result.duration_ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+def _collect(result: BatchResult, text: list[str], event: AgentEvent) -> None:
+    if isinstance(event, TextDelta):
+        text.append(event.delta)
+    elif isinstance(event, ToolInputAvailable):
+        result.tool_calls.append(
+            {"toolCallId": event.tool_call_id, "toolName": event.tool_name, "input": event.input}
+        )
+    elif isinstance(event, ToolOutputAvailable):
+        for call in reversed(result.tool_calls):
+            if call["toolCallId"] == event.tool_call_id:
+                call["output"] = event.output
+                break
+    elif isinstance(event, Finish):
+        result.finish_reason = event.finish_reason
+    elif isinstance(event, Error):
+        result.status = "error"
+        result.error = event.error_text
+    elif isinstance(event, Abort):
+        result.status = "error"
+        result.error = event.reason
@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import json
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import TYPE_CHECKING
 
 from ai.agent.events import (
     Abort,
@@ -25,13 +26,18 @@ from ai.agent.events import (
     TextStart,
     ToolInputAvailable,
     ToolInputDelta,
+    ToolInputPartial,
     ToolInputStart,
     ToolOutputAvailable,
 )
 from fastapi.responses import StreamingResponse
 
+if TYPE_CHECKING:
+    from src.ai.runs.registry import RunLog
 
-def _event_to_dict(event: AgentEvent) -> dict:
+
+def event_to_dict(event: AgentEvent) -> dict:
+    """The Data Stream Protocol part for `event`, as sent in one SSE frame."""
     if isinstance(event, MessageStart):
         return {"type": "start", "messageId": event.message_id}
     elif isinstance(event, TextStart):
@@ -58,7 +64,12 @@ def _event_to_dict(event: AgentEvent) -> dict:
     elif isinstance(event, FilePart):
         return {"type": "file", "url": event.url, "mediaType": event.media_type}
     elif isinstance(event, DataPart):
-        return {"type": f"data-{event.data_type}", "data": event.data}
+        part = {"type": f"data-{event.data_type}", "data": event.data}
+        if event.id is not None:
+            part["id"] = event.id
+        if event.transient:
+            part["transient"] = True
+        return part
     elif isinstance(event, ToolInputStart):
         return {
             "type": "tool-input-start",
@@ -71,6 +82,15 @@ def _event_to_dict(event: AgentEvent) -> dict:
             "toolCallId": event.tool_call_id,
             "inputTextDelta": event.input_text_delta,
         }
+    elif isinstance(event, ToolInputPartial):
+        # No native part type exists; send a transient data part keyed by the call
+        # so the client can render the input while it streams.
+        return {
+            "type": "data-tool-input-partial",
+            "id": event.tool_call_id,
+            "data": {"toolCallId": event.tool_call_id, "input": event.input},
+            "transient": True,
+        }
     elif isinstance(event, ToolInputAvailable):
         return {
             "type": "tool-input-available",
@@ -102,10 +122,25 @@ async def format_events(
     events: AsyncGenerator[AgentEvent, None],
 ) -> AsyncGenerator[str, None]:
     async for event in events:
-        yield f"data: {json.dumps(_event_to_dict(event))}\n\n"
+        yield f"data: {json.dumps(event_to_dict(event))}\n\n"
     yield "data: [DONE]\n\n"
 
 
+async def format_run_log(
+    run: RunLog,
+    after: int = 0,
+    is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+    poll_interval: float = 0.5,
+) -> AsyncGenerator[str, None]:
+    """SSE frames of a run's events after `after`, each with its id for resuming."""
+    async for event_id, payload in run.follow(after, is_disconnected, poll_interval):
+        after = event_id
+        yield f"id: {event_id}\ndata: {payload}\n\n"
+    # A follower that stopped early gets no [DONE], so the client knows to resume.
+    if run.done and after == run.last_id:
+        yield "data: [DONE]\n\n"
+
+
 def patch_response_with_headers(response: StreamingResponse) -> StreamingResponse:
     response.headers["x-vercel-ai-ui-message-stream"] = "v1"
     response.headers["Cache-Control"] = "no-cache"
@@ -2,44 +2,297 @@
 
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import asyncio
+import os
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
 from typing import Any
 from uuid import UUID
 
-from ai.agent.context import SystemPrompt
+from ai.agent.context import ContextBudget, SystemPrompt, TokenCounts
 from ai.agent.events import AgentEvent
 from ai.agent.loop import AgentLoop
+from ai.agent.metrics import RunTimings
 from ai.agent.skills import FileSkillSource, SkillsLoader, SkillSource
 from ai.agent.tools.base import Tool
+from ai.agent.tools.cache import ToolResultCache
+from ai.agent.tools.catalog import ToolCatalog
+from ai.agent.tools.runtime import HTTPCache, ToolRuntime
 from ai.agent.tools.weather import GetCurrentWeather
+from ai.providers.base import LLMProvider
+from ai.providers.cache import CachingProvider, SQLiteResponseStore
+from ai.providers.hedging import HedgingProvider
 from ai.providers.litellm import LiteLLMProvider
+from ai.providers.openai_compat import OpenAICompatibleProvider
+from ai.providers.ratelimit import (
+    RateLimitedProvider,
+    SQLiteRateLimitStore,
+    limits_by_prefix,
+    rate_limit_key,
+)
+from ai.providers.resilience import CircuitBreaker, ResilientProvider
+from ai.providers.routing import Route, RoutingProvider
 from sqlalchemy.orm import Session
 
 from ai.mcp import mcp_tools_context
 from src.ai.mcp.repository import UserMcpRepository
+from src.ai.metrics import timing_collector
+from src.ai.models.repository import ModelRepository
 from src.ai.prompts.repository import PromptRepository
-from src.ai.skills.repository import DBSkillSource, UserSkillRepository
+from src.ai.skills.repository import DBSkillSource
 from src.ai.tools import LoadSkillTool, UpdateSkillTool
+from src.ai.usage import usage_writer
+from src.config import settings
 
 _prompt_repo = PromptRepository()
+_model_repo = ModelRepository()
+_builtin_skills = FileSkillSource()
+Tool.result_cache = ToolResultCache(max_entries=settings.agent_tool_cache_size)
+Tool.runtime = ToolRuntime(
+    timeout=settings.agent_tool_http_timeout,
+    max_connections=settings.agent_tool_http_max_connections,
+    max_per_host=settings.agent_tool_http_max_per_host,
+    cache=HTTPCache(max_entries=settings.agent_tool_http_cache_size),
+)
 
+# Last tool catalog per user. Tool instances are bound to the request, so each
+# request rebinds its own tools and only the schemas carry over.
+_catalogs: OrderedDict[UUID | None, ToolCatalog] = OrderedDict()
+_CATALOG_CACHE_SIZE = 512
 
-async def run_agent(
-    messages: list[dict[str, Any]],
-    model: str,
+
+def _tool_catalog(user_id: UUID | None, tools: list[Tool]) -> ToolCatalog:
+    """Catalog for this request's tools, reusing the user's previous schemas."""
+    previous = _catalogs.pop(user_id, None)
+    catalog = previous.rebind(tools) if previous else ToolCatalog.build(tools)
+    _catalogs[user_id] = catalog
+    if len(_catalogs) > _CATALOG_CACHE_SIZE:
+        _catalogs.popitem(last=False)
+    return catalog
+
+
+# Direct OpenAI-compatible providers by (base URL, API key variable), for catalog
+# models with an "endpoint"; each keeps one pooled HTTP client for the process.
+_direct_providers: dict[tuple[str, str | None], OpenAICompatibleProvider] = {}
+
+
+def _route(model_id: str) -> Route:
+    endpoint = _model_repo.get_endpoint(model_id)
+    if endpoint is None:
+        return None
+    key = (endpoint["base_url"], endpoint.get("api_key_env"))
+    provider = _direct_providers.get(key)
+    if provider is None:
+        provider = _direct_providers[key] = OpenAICompatibleProvider(
+            endpoint["base_url"],
+            api_key=os.environ.get(key[1]) if key[1] else None,
+            max_connections=settings.agent_direct_max_connections,
+        )
+    return provider, endpoint.get("model", model_id)
+
+
+def _rate_limit_key(model_id: str) -> str:
+    """Bucket key of the (provider, API key, model) a catalog model is sent to."""
+    endpoint = _model_repo.get_endpoint(model_id)
+    if endpoint is not None:
+        key_env = endpoint.get("api_key_env")
+        api_key = os.environ.get(key_env) if key_env else None
+        return rate_limit_key(endpoint["base_url"], api_key, endpoint.get("model", model_id))
+    provider = model_id.split("/", 1)[0]
+    return rate_limit_key(provider, getattr(settings, f"{provider}_api_key", None), model_id)
+
+
+def preload_assets() -> dict[str, int]:
+    """Read prompts and built-in skills into memory; return how many of each."""
+    return {"prompts": _prompt_repo.preload(), "skills": _builtin_skills.preload()}
+
+
+async def connect_providers() -> int:
+    """Open a pooled connection to each catalog model's direct endpoint."""
+    providers = {}
+    for model in _model_repo.get_all():
+        route = _route(model["id"])
+        if route is not None:
+            providers[id(route[0])] = route[0]
+    await asyncio.gather(*(provider.connect() for provider in providers.values()))
+    return len(providers)
+
+
+async def close_providers() -> None:
+    """Close the HTTP clients of direct providers (on shutdown)."""
+    providers = list(_direct_providers.values())
+    _direct_providers.clear()
+    for provider in providers:
+        await provider.aclose()
+
+
+async def close_tools() -> None:
+    """Close the tools' shared HTTP client (on shutdown)."""
+    await Tool.runtime.aclose()
+
+
+def tool_stats() -> dict[str, Any]:
+    """Counters of the tool result cache and the tools' HTTP runtime."""
+    return {"resultCache": Tool.result_cache.stats(), "http": Tool.runtime.stats()}
+
+
+# One provider chain shared by all runs, so breakers and counters cover the process:
+# per-model choice of LiteLLM or a direct provider, client-side rate limits (waited out
+# on every attempt), retries and a circuit breaker per model, hedging across models, then
+# (when enabled) the response cache on top so hits skip all of it.
+_rate_limited = RateLimitedProvider(
+    RoutingProvider(
+        LiteLLMProvider(cache_control_providers=settings.agent_prompt_cache_providers),
+        _route,
+    ),
+    limits_by_prefix(settings.agent_rate_limits),
+    key=_rate_limit_key,
+    store=(
+        SQLiteRateLimitStore(settings.agent_rate_limit_store_path)
+        if settings.agent_rate_limit_store_path
+        else None
+    ),
+    max_wait=settings.agent_rate_limit_max_wait,
+)
+_resilient = ResilientProvider(
+    _rate_limited,
+    max_retries=settings.agent_provider_max_retries,
+    breaker_factory=lambda: CircuitBreaker(
+        failure_rate=settings.agent_breaker_failure_rate,
+        min_calls=settings.agent_breaker_min_calls,
+        window=settings.agent_breaker_window,
+        reset_timeout=settings.agent_breaker_reset_timeout,
+    ),
+)
+_hedging = HedgingProvider(
+    _resilient,
+    _model_repo.get_fallback_id,
+    ttft_timeout=settings.agent_hedge_ttft,
+    stall_timeout=settings.agent_stream_stall_timeout,
+)
+_caching = (
+    CachingProvider(
+        _hedging,
+        max_entries=settings.agent_response_cache_size,
+        ttl=settings.agent_response_cache_ttl,
+        store=(
+            SQLiteResponseStore(
+                settings.agent_response_cache_path,
+                max_rows=settings.agent_response_cache_max_rows,
+            )
+            if settings.agent_response_cache_path
+            else None
+        ),
+    )
+    if settings.agent_response_cache
+    else None
+)
+_provider: LLMProvider = _caching or _hedging
+
+
+def provider_stats() -> dict[str, Any]:
+    """Counters of the shared provider's wrappers, keyed by wrapper."""
+    stats: dict[str, Any] = {
+        "hedging": _hedging.stats.to_dict(),
+        "retries": _resilient.retries,
+        "rateLimit": _rate_limited.stats(),
+    }
+    if _caching is not None:
+        stats["cache"] = _caching.stats()
+    return stats
+
+
+def model_status(model_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Circuit breaker state per model; models not called yet are closed."""
+    return {model_id: _resilient.breaker(model_id).to_dict() for model_id in model_ids}
+
+
+# Message token counts per model, shared by all runs so a conversation's earlier
+# messages are not recounted on every request.
+_token_counts: dict[str, TokenCounts] = {}
+
+
+def _context_budget(model: str) -> ContextBudget | None:
+    """Budget from the model's context window, capped by settings when configured."""
+    limits = [
+        limit
+        for limit in (_model_repo.get_max_input_tokens(model), settings.agent_max_context_tokens)
+        if limit
+    ]
+    if not limits:
+        return None
+    counts = _token_counts.get(model)
+    if counts is None:
+        counts = _token_counts[model] = TokenCounts()
+    return ContextBudget(max_tokens=min(limits), token_counts=counts)
+
+
+@dataclass
+class AgentSession:
+    """Tools, system prompt and MCP sessions prepared once per user.
+
+    Any number of runs, also concurrent ones, can share a session; each gets
+    its own `AgentLoop` and per-run state.
+    """
+
+    user_id: UUID | None
+    provider: LLMProvider
+    catalog: ToolCatalog
+    system: SystemPrompt
+
+    def loop(self, model: str, timings: RunTimings | None = None) -> AgentLoop:
+        return AgentLoop(
+            provider=self.provider,
+            tools=self.catalog,
+            model=model,
+            system=self.system,
+            parallel_tool_calls=settings.agent_parallel_tool_calls,
+            max_concurrent_tools=settings.agent_max_concurrent_tools,
+            speculative_tool_calls=settings.agent_speculative_tool_calls,
+            context_budget=_context_budget(model),
+            max_tool_result_chars=settings.agent_max_tool_result_chars,
+            timings=timings or RunTimings(hooks=[timing_collector.record]),
+            emit_timings=settings.agent_emit_timings,
+        )
+
+    async def run(
+        self, loop: AgentLoop, messages: list[dict[str, Any]]
+    ) -> AsyncGenerator[AgentEvent, None]:
+        """Run `loop` on `messages`, recording its token usage for the user."""
+        try:
+            async for event in loop.run(messages):
+                yield event
+        finally:
+            # Also counts runs cut short by errors or disconnects.
+            if self.user_id is not None and loop.usage.total_tokens:
+                usage_writer.add(self.user_id, loop.model, loop.usage)
+
+
+@asynccontextmanager
+async def agent_session(
     user_id: UUID | None = None,
-    db: Session | None = None,
+    session_factory: Callable[[], Session] | None = None,
     prompt_id: str | None = None,
-) -> AsyncGenerator[AgentEvent, None]:
-    skill_sources: list[SkillSource] = [FileSkillSource()]
+    timings: RunTimings | None = None,
+    provider: LLMProvider | None = None,
+) -> AsyncIterator[AgentSession]:
+    """Set up the user's tools, skills and MCP servers for one or more runs.
+
+    Database sessions come from `session_factory` and are held only for setup
+    and for each skill lookup or tool call that needs one, never for a whole
+    run, so runs that stream for minutes do not tie up the connection pool.
+    """
+    skill_sources: list[SkillSource] = [_builtin_skills]
     extra_tools: list[Tool] = []
     mcp_configs: list[tuple[str, dict]] = []
 
-    if db and user_id:
-        user_skill_repo = UserSkillRepository(db)
-        skill_sources.insert(0, DBSkillSource(user_skill_repo, user_id))
-        extra_tools.append(UpdateSkillTool(user_skill_repo, user_id))
-        mcp_configs = UserMcpRepository(db).list_configs(user_id)
+    if session_factory and user_id:
+        skill_sources.insert(0, DBSkillSource(session_factory, user_id))
+        extra_tools.append(UpdateSkillTool(session_factory, user_id))
+        with session_factory() as db:
+            mcp_configs = UserMcpRepository(db).list_configs(user_id)
 
     loader = SkillsLoader(skill_sources)
     tools: list[Tool] = [GetCurrentWeather(), LoadSkillTool(loader), *extra_tools]
@@ -47,13 +300,29 @@ async def run_agent(
     prompt_content = _prompt_repo.get_content_by_id(prompt_id) if prompt_id else None
     system = SystemPrompt(base=prompt_content).add_section("Skills", loader.build_summary_xml())
 
-    provider = LiteLLMProvider()
-    async with mcp_tools_context(mcp_configs) as mcp_tools:
-        loop = AgentLoop(
-            provider=provider,
-            tools=tools + mcp_tools,
-            model=model,
+    async with mcp_tools_context(
+        mcp_configs,
+        cache_ttl=settings.agent_mcp_cache_ttl,
+        timings=timings or RunTimings(hooks=[timing_collector.record]),
+    ) as mcp_tools:
+        yield AgentSession(
+            user_id=user_id,
+            provider=provider or _provider,
+            catalog=_tool_catalog(user_id, tools + mcp_tools),
             system=system,
         )
-        async for event in loop.run(messages):
-            yield event
+
+
+async def run_agent(
+    messages: list[dict[str, Any]],
+    model: str,
+    user_id: UUID | None = None,
+    session_factory: Callable[[], Session] | None = None,
+    prompt_id: str | None = None,
+) -> AsyncGenerator[AgentEvent, None]:
+    timings = RunTimings(hooks=[timing_collector.record])
+    async with agent_session(user_id, session_factory, prompt_id, timings) as session:
+        loop = session.loop(model, timings)
+        async with aclosing(session.run(loop, messages)) as events:
+            async for event in events:
+                yield event
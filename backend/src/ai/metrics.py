@@ -0,0 +1,69 @@
+"""In-process latency aggregates fed by agent run timings."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+from ai.agent.metrics import Timing
+from ai.agent.tools.weather import GetCurrentWeather
+
+from src.ai.tools import LoadSkillTool, UpdateSkillTool
+
+logger = logging.getLogger(__name__)
+
+
+class TimingCollector:
+    """Keeps the most recent durations per stage and summarizes them.
+
+    Timings of the given `tools` are kept per tool (``tool:<name>``) so slow
+    tools stand out. Other tools (MCP tools, named by users) share
+    ``tool:other`` and MCP setup is kept as one ``mcp_setup`` stage, so the
+    set of keys stays fixed and does not reveal users' tool or server names.
+    """
+
+    def __init__(self, window: int = 1000, tools: Iterable[str] = ()) -> None:
+        self._window = window
+        self._tools = frozenset(tools)
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timing: Timing) -> None:
+        """MetricsHook: add one timing."""
+        key = timing.name
+        if timing.name == "tool":
+            tool = timing.attributes.get("toolName")
+            key = f"tool:{tool if tool in self._tools else 'other'}"
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self._window)
+            samples.append(timing.duration_ms)
+        logger.debug("timing %s %.1fms", key, timing.duration_ms)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Count, p50, p95 and max (ms) over the recent window, per stage."""
+        with self._lock:
+            snapshot = {key: sorted(samples) for key, samples in self._samples.items()}
+        return {
+            key: {
+                "count": len(values),
+                "p50": _percentile(values, 0.5),
+                "p95": _percentile(values, 0.95),
+                "max": values[-1],
+            }
+            for key, values in sorted(snapshot.items())
+        }
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return round(sorted_values[index], 3)
+
+
+timing_collector = TimingCollector(
+    tools=[tool.name for tool in (GetCurrentWeather, LoadSkillTool, UpdateSkillTool)]
+)
@@ -1,5 +1,10 @@
 """Model repository for data access."""
 
+from src.config import settings
+
+# Offered when settings.mock_llm_base_url points at benchmarks/mock_openai.py.
+MOCK_MODEL_ID = "mock/mock-llm"
+
 
 class ModelRepository:
     """Repository for AI model data access operations."""
@@ -8,17 +13,54 @@ class ModelRepository:
     MODELS_DATA = [
         # {"id": "openai/gpt-5", "name": "GPT-5", "provider": "OpenAI"},
         # {"id": "openai/responses/gpt-5", "name": "GPT-5 Think", "provider": "OpenAI"},
-        {"id": "gemini/gemini-3-flash-preview", "name": "Gemini 3 Flash", "provider": "Google"},
-        {"id": "gemini/gemini-3.1-pro-preview", "name": "Gemini 3.1 Pro", "provider": "Google"},
+        # Models with an "endpoint" are streamed directly from an OpenAI-compatible
+        # API (see OpenAICompatibleProvider) instead of through LiteLLM:
+        # {
+        #     "id": "vllm/llama-3.1-8b",
+        #     "name": "Llama 3.1 8B",
+        #     "provider": "vLLM",
+        #     "endpoint": {
+        #         "base_url": "http://localhost:8000/v1",
+        #         "model": "meta-llama/Llama-3.1-8B-Instruct",
+        #         "api_key_env": "VLLM_API_KEY",
+        #     },
+        # },
+        {
+            "id": "gemini/gemini-3-flash-preview",
+            "name": "Gemini 3 Flash",
+            "provider": "Google",
+            "max_input_tokens": 1_048_576,
+        },
+        {
+            "id": "gemini/gemini-3.1-pro-preview",
+            "name": "Gemini 3.1 Pro",
+            "provider": "Google",
+            "max_input_tokens": 1_048_576,
+            # Hedged to when this model is slow to respond or fails (see HedgingProvider)
+            "fallback": "gemini/gemini-3-flash-preview",
+        },
     ]
 
+    def __init__(self) -> None:
+        self.models = list(self.MODELS_DATA)
+        if settings.mock_llm_base_url:
+            self.models.append(
+                {
+                    "id": MOCK_MODEL_ID,
+                    "name": "Mock LLM",
+                    "provider": "Mock",
+                    "max_input_tokens": 128_000,
+                    "endpoint": {"base_url": settings.mock_llm_base_url, "model": "mock"},
+                }
+            )
+
     def get_all(self) -> list[dict]:
         """Get all models.
 
         Returns:
             List of model dictionaries
         """
-        return list(self.MODELS_DATA)
+        return list(self.models)
 
     def get_by_id(self, model_id: str) -> dict | None:
         """Get model by ID.
@@ -29,7 +71,7 @@ class ModelRepository:
         Returns:
             Model dictionary or None if not found
         """
-        for model in self.MODELS_DATA:
+        for model in self.models:
             if model["id"] == model_id:
                 return model
         return None
@@ -45,8 +87,46 @@ class ModelRepository:
         """
         return self.get_by_id(model_id) is not None
 
+    def get_max_input_tokens(self, model_id: str) -> int | None:
+        """Return the model's input context window in tokens, if known.
+
+        Args:
+            model_id: Model ID
+
+        Returns:
+            Token count or None if the model or its window is unknown
+        """
+        model = self.get_by_id(model_id)
+        return model.get("max_input_tokens") if model else None
+
+    def get_fallback_id(self, model_id: str) -> str | None:
+        """Return the model to fall back to when this one is slow or failing.
+
+        Args:
+            model_id: Model ID
+
+        Returns:
+            Fallback model ID or None if the model has none
+        """
+        model = self.get_by_id(model_id)
+        return model.get("fallback") if model else None
+
+    def get_endpoint(self, model_id: str) -> dict | None:
+        """Return the OpenAI-compatible endpoint to stream this model from directly.
+
+        Args:
+            model_id: Model ID
+
+        Returns:
+            Dict with "base_url" and optionally "model" (upstream model name) and
+            "api_key_env" (environment variable holding the API key), or None if
+            the model goes through LiteLLM
+        """
+        model = self.get_by_id(model_id)
+        return model.get("endpoint") if model else None
+
     def get_default_id(self) -> str:
         """Return the default model ID (first in list)."""
-        if not self.MODELS_DATA:
+        if not self.models:
             raise ValueError("No models configured")
-        return self.MODELS_DATA[0]["id"]
+        return self.models[0]["id"]
@@ -15,3 +15,19 @@ class ModelListResponse(BaseModel):
     """Model list response schema."""
 
     models: list[Model]
+
+
+class ModelStatus(BaseModel):
+    """Circuit breaker state of a model."""
+
+    id: str
+    state: str
+    recentCalls: int
+    recentFailures: int
+    retryAfter: float | None = None
+
+
+class ModelStatusResponse(BaseModel):
+    """Model status response schema."""
+
+    models: list[ModelStatus]
@@ -2,20 +2,33 @@
 
 from pathlib import Path
 
-import frontmatter  # type: ignore[import-untyped]
-
 
 class PromptRepository:
     """Repository for prompt data access operations.
 
     Loads prompts from markdown files with YAML frontmatter in the
-    ``prompts`` directory next to this module.
+    ``prompts`` directory next to this module. Files are read on every call
+    until `preload()` keeps them in memory.
     """
 
     PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
 
+    def __init__(self) -> None:
+        self._prompts: list[dict] | None = None
+
+    def preload(self) -> int:
+        """Load the prompts once and serve later calls from memory.
+
+        Returns:
+            Number of prompts loaded
+        """
+        self._prompts = self._load_prompts()
+        return len(self._prompts)
+
     def _load_prompts(self) -> list[dict]:
         """Load all prompts from prompts/*.md (frontmatter + body as content)."""
+        import frontmatter  # type: ignore[import-untyped]
+
         result: list[dict] = []
         if not self.PROMPTS_DIR.is_dir():
             return result
@@ -43,6 +56,8 @@ class PromptRepository:
         Returns:
             List of prompt dictionaries
         """
+        if self._prompts is not None:
+            return list(self._prompts)
         return self._load_prompts()
 
     def get_by_id(self, prompt_id: str) -> dict | None:
@@ -2,34 +2,56 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from contextlib import AbstractContextManager, aclosing, nullcontext
+
+from ai.agent.streams import coalesce_deltas
+from ai.providers.cache import no_response_cache
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from src.ai.adapters.messages import ClientMessage, convert_to_openai_messages
-from src.ai.formatter import format_events, patch_response_with_headers
-from src.ai.handler import run_agent
+from src.ai.admission import AdmissionRejected, admission
+from src.ai.batch import BatchItem, run_batch
+from src.ai.formatter import format_run_log, patch_response_with_headers
+from src.ai.handler import model_status, provider_stats, run_agent, tool_stats
+from src.ai.metrics import timing_collector
 from src.ai.models.repository import ModelRepository
-from src.auth.dependencies import get_current_user
-from src.database import get_db
+from src.ai.models.schemas import ModelStatus, ModelStatusResponse
+from src.auth.dependencies import get_admin_user, get_current_user
+from src.config import settings
+from src.database import SessionLocal, get_db
 from src.user.models import User
 
 from .mcp import router as mcp_router
 from .models import router as models_router
 from .prompts import router as prompts_router
+from .runs import router as runs_router
+from .runs import run_registry
 from .skills import router as skills_router
+from .usage import router as usage_router
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
 router.include_router(models_router)
 router.include_router(mcp_router)
 router.include_router(prompts_router)
+router.include_router(runs_router)
 router.include_router(skills_router)
+router.include_router(usage_router)
 
 _model_repo = ModelRepository()
 
 
+def _cache_scope(http_request: Request) -> AbstractContextManager[None]:
+    """Bypass the response cache when the client sends Cache-Control: no-cache."""
+    if "no-cache" in http_request.headers.get("cache-control", ""):
+        return no_response_cache()
+    return nullcontext()
+
+
 class ChatRequest(BaseModel):
     messages: list[ClientMessage]
     modelId: str | None = None
@@ -39,19 +61,146 @@ class ChatRequest(BaseModel):
 @router.post("")
 async def handle_chat(
     request: ChatRequest,
-    db: Session = Depends(get_db),
+    http_request: Request,
     current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     model_id = request.modelId or _model_repo.get_default_id()
     if request.modelId and not _model_repo.exists(request.modelId):
         raise HTTPException(status_code=400, detail=f"Invalid modelId: {request.modelId}")
     messages = convert_to_openai_messages(request.messages)
+    try:
+        admission.check(current_user.id)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": f"{e.retry_after:.0f}"}
+        ) from e
+    # The request's session (the one authentication used) would stay checked out until
+    # the response has streamed; the run opens short-lived ones from SessionLocal.
+    db.close()
+    # Queued runs stream data-queue position updates until a slot frees up.
+    events = admission.admitted(
+        current_user.id,
+        run_agent(
+            messages,
+            model_id,
+            user_id=current_user.id,
+            session_factory=SessionLocal,
+            prompt_id=request.promptId,
+        ),
+    )
+    if settings.agent_coalesce_window > 0:
+        events = coalesce_deltas(
+            events, settings.agent_coalesce_window, settings.agent_coalesce_max_chars
+        )
+    # The run continues if the client drops; it can resume from /ai/runs/{id}/stream.
+    with _cache_scope(http_request):
+        run = run_registry.create(current_user.id, events)
     response = StreamingResponse(
-        format_events(
-            run_agent(
-                messages, model_id, user_id=current_user.id, db=db, prompt_id=request.promptId
-            )
+        format_run_log(
+            run, 0, http_request.is_disconnected, settings.agent_disconnect_poll_interval
         ),
         media_type="text/event-stream",
     )
+    response.headers["X-Run-Id"] = run.id
     return patch_response_with_headers(response)
+
+
+class BatchConversation(BaseModel):
+    id: str | None = None
+    messages: list[ClientMessage]
+
+
+class BatchRequest(BaseModel):
+    items: list[BatchConversation] = Field(min_length=1)
+    modelId: str | None = None
+    promptId: str | None = None
+    concurrency: int | None = Field(default=None, ge=1)
+    timeout: float | None = Field(default=None, gt=0)
+
+
+@router.post("/batch")
+async def handle_batch(
+    request: BatchRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Run many conversations; results stream back as NDJSON, one line per item as it ends."""
+    model_id = request.modelId or _model_repo.get_default_id()
+    if request.modelId and not _model_repo.exists(request.modelId):
+        raise HTTPException(status_code=400, detail=f"Invalid modelId: {request.modelId}")
+    if len(request.items) > settings.agent_batch_max_items:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.agent_batch_max_items} items per batch"
+        )
+    items = [
+        BatchItem(id=item.id or str(i), messages=convert_to_openai_messages(item.messages))
+        for i, item in enumerate(request.items)
+    ]
+    # Items take run slots from `admission` like chat requests; more concurrent
+    # items than the user may run at once would only wait in its queue.
+    concurrency = min(
+        request.concurrency or settings.agent_batch_concurrency,
+        settings.agent_batch_max_concurrency,
+        admission.max_per_user,
+    )
+    try:
+        admission.check(current_user.id)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": f"{e.retry_after:.0f}"}
+        ) from e
+
+    # As in handle_chat: items open short-lived sessions, the request's is not needed.
+    db.close()
+
+    async def lines():
+        with _cache_scope(http_request):
+            async with aclosing(
+                run_batch(
+                    items,
+                    model_id,
+                    user_id=current_user.id,
+                    session_factory=SessionLocal,
+                    prompt_id=request.promptId,
+                    concurrency=concurrency,
+                    item_timeout=request.timeout or settings.agent_batch_item_timeout,
+                    admission=admission,
+                )
+            ) as results:
+                async for result in results:
+                    yield json.dumps(result.to_dict()) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/models/status", response_model=ModelStatusResponse)
+async def get_models_status(current_user: User = Depends(get_admin_user)):
+    """Circuit breaker state per model: closed, open (failing fast) or half_open."""
+    status = model_status([m["id"] for m in _model_repo.get_all()])
+    return ModelStatusResponse(models=[ModelStatus(id=i, **s) for i, s in status.items()])
+
+
+@router.get("/metrics/timings")
+async def get_timings(current_user: User = Depends(get_admin_user)):
+    """Recent agent latency percentiles (ms) per stage, tool and MCP server."""
+    return timing_collector.summary()
+
+
+@router.get("/metrics/admission")
+async def get_admission_stats(current_user: User = Depends(get_admin_user)):
+    """Active and queued chat runs and admission counters; queue waits are in /metrics/timings."""
+    return admission.stats()
+
+
+@router.get("/metrics/providers")
+async def get_provider_stats(current_user: User = Depends(get_admin_user)):
+    """Hedging and fallback counters of the model provider since startup."""
+    return provider_stats()
+
+
+@router.get("/metrics/tools")
+async def get_tool_stats(current_user: User = Depends(get_admin_user)):
+    """Tool result cache and tool HTTP client (requests, HTTP cache hits) counters."""
+    return tool_stats()
@@ -0,0 +1,6 @@
+"""Runs domain: detached agent runs that clients can resume."""
+
+from .registry import run_registry
+from .route import router
+
+__all__ = ["router", "run_registry"]
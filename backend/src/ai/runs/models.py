@@ -0,0 +1,29 @@
+"""Run log models for SQLAlchemy."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class AgentRunLog(Base):
+    """Event log of a finished agent run, kept so it can be replayed after a restart."""
+
+    __tablename__ = "agent_run_logs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    # [[event_id, json_payload], ...] in event id order
+    events: Mapped[list[list]] = mapped_column(JSONB, nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
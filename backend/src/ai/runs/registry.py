@@ -0,0 +1,282 @@
+"""Detached agent runs with resumable event logs."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import suppress
+from datetime import datetime, timedelta
+from itertools import islice
+from uuid import UUID, uuid4
+
+from ai.agent.events import Abort, AgentEvent, Error
+from sqlalchemy.orm import Session
+
+from src.ai.formatter import event_to_dict
+from src.config import settings
+from src.database import SessionLocal
+
+from .repository import RunLogRepository
+
+logger = logging.getLogger(__name__)
+
+
+class RunLog:
+    """Append-only, bounded event log of one agent run.
+
+    Events are serialized once, when appended, and numbered from 1 so a
+    client can resume after the last id it received. Only the newest
+    `max_events` are kept; a subscriber that falls further behind than that
+    cannot resume.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        user_id: UUID,
+        max_events: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.id = run_id
+        self.user_id = user_id
+        self._entries: deque[tuple[int, str]] = deque(maxlen=max_events)
+        self._last_id = 0
+        self._changed = asyncio.Event()
+        self._clock = clock
+        self.done = False
+        self.finished_at: float | None = None
+        self.subscribers = 0
+        self.idle_since: float | None = clock()
+        self.task: asyncio.Task[None] | None = None
+        self.cancel_reason: str | None = None
+
+    @classmethod
+    def restore(
+        cls,
+        run_id: str,
+        user_id: UUID,
+        entries: list[tuple[int, str]],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> RunLog:
+        """A finished log rebuilt from stored entries."""
+        log = cls(run_id, user_id, max(len(entries), 1), clock)
+        log._entries.extend((event_id, payload) for event_id, payload in entries)
+        log._last_id = entries[-1][0] if entries else 0
+        log.close()
+        return log
+
+    @property
+    def first_id(self) -> int:
+        """Id of the oldest event still kept."""
+        return self._entries[0][0] if self._entries else self._last_id + 1
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def entries(self) -> list[tuple[int, str]]:
+        return list(self._entries)
+
+    def append(self, event: AgentEvent) -> int:
+        self._last_id += 1
+        self._entries.append((self._last_id, json.dumps(event_to_dict(event))))
+        self._notify()
+        return self._last_id
+
+    def close(self) -> None:
+        self.done = True
+        self.finished_at = self._clock()
+        self._notify()
+
+    async def follow(
+        self,
+        after: int = 0,
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+        poll_interval: float = 0.5,
+    ) -> AsyncGenerator[tuple[int, str], None]:
+        """Yield ``(id, payload)`` for events after `after`, live, until the run ends.
+
+        While the run is silent, `is_disconnected` is checked every
+        `poll_interval` seconds and following stops once it returns True. It
+        also stops if the subscriber fell behind the kept window.
+        """
+        self.subscribers += 1
+        self.idle_since = None
+        try:
+            while True:
+                if after < self._last_id:
+                    if after + 1 < self.first_id:
+                        return
+                    for entry in list(islice(self._entries, after + 1 - self.first_id, None)):
+                        yield entry
+                        after = entry[0]
+                    continue
+                if self.done:
+                    return
+                changed = self._changed
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(changed.wait(), poll_interval)
+                if not changed.is_set() and is_disconnected and await is_disconnected():
+                    return
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers:
+                self.idle_since = self._clock()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class RunRegistry:
+    """Runs agent event streams detached from the requests that start them.
+
+    `create()` drives the events in their own task into a `RunLog`, which any
+    number of requests can follow, so a client that drops can resume instead
+    of starting over and every subscriber shares one execution. A run nobody
+    follows for `orphan_grace` seconds is cancelled, and a finished log is
+    dropped `ttl` seconds after the run ends. With a `session_factory`,
+    finished logs are also written to the database so they can be replayed
+    after a restart or from another worker.
+
+    Call `start()` once an event loop is running to expire and cancel runs in
+    the background, and `aclose()` on shutdown.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_events: int = 10_000,
+        orphan_grace: float = 30.0,
+        session_factory: Callable[[], Session] | None = None,
+        sweep_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._max_events = max_events
+        self._orphan_grace = orphan_grace
+        self._session_factory = session_factory
+        self._sweep_interval = sweep_interval
+        self._clock = clock
+        self._runs: dict[str, RunLog] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def create(self, user_id: UUID, events: AsyncGenerator[AgentEvent, None]) -> RunLog:
+        """Start driving `events` in the background and return its log."""
+        self.sweep()
+        run = RunLog(uuid4().hex, user_id, self._max_events, self._clock)
+        run.task = asyncio.create_task(self._drive(run, events), name=f"agent-run-{run.id}")
+        self._runs[run.id] = run
+        return run
+
+    async def get(self, run_id: str, user_id: UUID) -> RunLog | None:
+        """The user's run, from memory or else the database; None if unknown or expired."""
+        self.sweep()
+        run = self._runs.get(run_id)
+        if run is None and self._session_factory is not None:
+            run = await asyncio.to_thread(self._load, run_id, user_id)
+            if run is not None:
+                self._runs[run.id] = run
+        if run is None or run.user_id != user_id:
+            return None
+        return run
+
+    def cancel(self, run: RunLog, reason: str) -> None:
+        """Cancel a running run; its log ends with an `Abort` carrying `reason`."""
+        if run.task is not None and not run.task.done():
+            run.cancel_reason = reason
+            run.task.cancel()
+
+    def sweep(self) -> None:
+        """Drop expired logs and cancel runs that have gone unfollowed too long."""
+        now = self._clock()
+        for run in list(self._runs.values()):
+            if run.done:
+                if run.finished_at is not None and now - run.finished_at > self._ttl:
+                    del self._runs[run.id]
+            elif run.idle_since is not None and now - run.idle_since > self._orphan_grace:
+                logger.info("Cancelling agent run %s: no subscribers", run.id)
+                self.cancel(run, "no subscribers")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="run-registry")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        tasks = [run.task for run in self._runs.values() if run.task and not run.task.done()]
+        for run in self._runs.values():
+            self.cancel(run, "server shutting down")
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            self.sweep()
+            if self._session_factory is not None:
+                try:
+                    await asyncio.to_thread(self._delete_expired)
+                except Exception:
+                    logger.exception("Failed to delete expired run logs")
+
+    async def _drive(self, run: RunLog, events: AsyncGenerator[AgentEvent, None]) -> None:
+        try:
+            async for event in events:
+                run.append(event)
+        except asyncio.CancelledError:
+            run.append(Abort(reason=run.cancel_reason or "cancelled"))
+        except Exception as e:
+            logger.exception("Agent run %s failed", run.id)
+            run.append(Error(error_text=str(e)))
+        finally:
+            await events.aclose()
+            run.close()
+        if self._session_factory is not None:
+            try:
+                await asyncio.to_thread(self._save, run)
+            except Exception:
+                logger.exception("Failed to persist agent run %s", run.id)
+
+    def _save(self, run: RunLog) -> None:
+        db = self._session_factory()
+        try:
+            RunLogRepository(db).save(run.id, run.user_id, run.entries())
+        finally:
+            db.close()
+
+    def _load(self, run_id: str, user_id: UUID) -> RunLog | None:
+        db = self._session_factory()
+        try:
+            row = RunLogRepository(db).get(run_id, user_id)
+            if row is None:
+                return None
+            entries = [(event_id, payload) for event_id, payload in row.events]
+            return RunLog.restore(row.id, row.user_id, entries, self._clock)
+        finally:
+            db.close()
+
+    def _delete_expired(self) -> None:
+        db = self._session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self._ttl)
+            RunLogRepository(db).delete_completed_before(cutoff)
+        finally:
+            db.close()
+
+
+run_registry = RunRegistry(
+    ttl=settings.agent_run_ttl,
+    max_events=settings.agent_run_max_events,
+    orphan_grace=settings.agent_run_orphan_grace,
+    session_factory=SessionLocal if settings.agent_run_persist else None,
+)
@@ -0,0 +1,38 @@
+"""Run log repository for data access."""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from .models import AgentRunLog
+
+
+class RunLogRepository:
+    """Repository for persisted run event logs."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, run_id: str, user_id: UUID) -> AgentRunLog | None:
+        """Return the user's run log, or None."""
+        return (
+            self.db.query(AgentRunLog)
+            .filter(AgentRunLog.id == run_id, AgentRunLog.user_id == user_id)
+            .first()
+        )
+
+    def save(self, run_id: str, user_id: UUID, events: list[tuple[int, str]]) -> None:
+        """Store a finished run's events."""
+        self.db.merge(AgentRunLog(id=run_id, user_id=user_id, events=[list(e) for e in events]))
+        self.db.commit()
+
+    def delete_completed_before(self, cutoff: datetime) -> int:
+        """Delete logs of runs that finished before `cutoff`; return how many."""
+        count = (
+            self.db.query(AgentRunLog)
+            .filter(AgentRunLog.completed_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return count
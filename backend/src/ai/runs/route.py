@@ -0,0 +1,51 @@
+"""Agent run API endpoints."""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from src.ai.formatter import format_run_log, patch_response_with_headers
+from src.auth.dependencies import get_current_user
+from src.config import settings
+from src.user.models import User
+
+from .registry import RunLog, run_registry
+
+router = APIRouter(prefix="/runs", tags=["runs"])
+
+
+async def _get_run(run_id: str, user: User) -> RunLog:
+    run = await run_registry.get(run_id, user.id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
+@router.get("/{run_id}/stream")
+async def resume_run(
+    run_id: str,
+    http_request: Request,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_current_user),
+):
+    """Replay a run's events after Last-Event-ID, then follow it live until it ends."""
+    run = await _get_run(run_id, current_user)
+    try:
+        after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID") from None
+    if after + 1 < run.first_id:
+        raise HTTPException(status_code=410, detail="Events after Last-Event-ID have expired")
+    response = StreamingResponse(
+        format_run_log(
+            run, after, http_request.is_disconnected, settings.agent_disconnect_poll_interval
+        ),
+        media_type="text/event-stream",
+    )
+    response.headers["X-Run-Id"] = run.id
+    return patch_response_with_headers(response)
+
+
+@router.post("/{run_id}/cancel", status_code=204)
+async def cancel_run(run_id: str, current_user: User = Depends(get_current_user)):
+    """Stop a run for every subscriber; it no longer ends when a client disconnects."""
+    run_registry.cancel(await _get_run(run_id, current_user), "cancelled by user")
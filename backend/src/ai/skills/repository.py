@@ -5,6 +5,7 @@ Default skills: use FileSkillSource from the ai package.
 """
 
 import re
+from collections.abc import Callable
 from uuid import UUID
 
 from ai.agent.skills import Skill as AiSkill
@@ -23,18 +24,24 @@ def _validate_skill_name(name: str) -> bool:
 
 
 class DBSkillSource(SkillSource):
-    """SkillSource backed by the user's DB-stored skills."""
+    """SkillSource backed by the user's DB-stored skills.
 
-    def __init__(self, repo: "UserSkillRepository", user_id: UUID) -> None:
-        self._repo = repo
+    Opens a session from `session_factory` per lookup, so a long agent run does
+    not hold a database connection between them.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], user_id: UUID) -> None:
+        self._session_factory = session_factory
         self._user_id = user_id
 
     def list_metadata(self) -> list[AiSkill]:
-        rows = self._repo.list_by_user(self._user_id)
-        return [AiSkill(name=r.name, description=r.description) for r in rows]
+        with self._session_factory() as db:
+            rows = UserSkillRepository(db).list_by_user(self._user_id)
+            return [AiSkill(name=r.name, description=r.description) for r in rows]
 
     def load_content(self, name: str) -> str | None:
-        return self._repo.get_content_by_name(self._user_id, name)
+        with self._session_factory() as db:
+            return UserSkillRepository(db).get_content_by_name(self._user_id, name)
 
 
 class UserSkillRepository:
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from uuid import UUID
 
 from ai.agent.skills import SkillsLoader
 from ai.agent.tools.base import Tool
 from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
 
 from src.ai.skills.repository import UserSkillRepository
 
@@ -33,12 +35,13 @@ class UpdateSkillTool(Tool):
         description: str = Field(..., description="Short description of what the skill does")
         content: str = Field(..., description="Markdown body of the skill")
 
-    def __init__(self, repo: UserSkillRepository, user_id: UUID) -> None:
-        self._repo = repo
+    def __init__(self, session_factory: Callable[[], Session], user_id: UUID) -> None:
+        self._session_factory = session_factory
         self._user_id = user_id
 
     async def execute(self, input: Input) -> str:
-        row = self._repo.create_or_update(
-            self._user_id, input.name, input.description, input.content
-        )
+        with self._session_factory() as db:
+            row = UserSkillRepository(db).create_or_update(
+                self._user_id, input.name, input.description, input.content
+            )
         return "Skill saved." if row else "Failed to save skill (name may be invalid)."
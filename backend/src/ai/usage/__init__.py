@@ -0,0 +1,6 @@
+"""Usage domain: per-user token accounting."""
+
+from .route import router
+from .writer import usage_writer
+
+__all__ = ["router", "usage_writer"]
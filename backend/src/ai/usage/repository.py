@@ -0,0 +1,71 @@
+"""Usage repository for data access."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .models import UserModelUsage
+
+
+@dataclass
+class UsageTotals:
+    """Token counts to add to one (user, model) row."""
+
+    user_id: UUID
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    runs: int = 0
+
+
+class UsageRepository:
+    """Repository for per-user, per-model token totals."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_by_user(self, user_id: UUID) -> list[UserModelUsage]:
+        """Return the user's totals, one row per model."""
+        return (
+            self.db.query(UserModelUsage)
+            .filter(UserModelUsage.user_id == user_id)
+            .order_by(UserModelUsage.model)
+            .all()
+        )
+
+    def add_totals(self, totals: list[UsageTotals]) -> None:
+        """Add the given counts to existing rows, creating missing ones, in one statement."""
+        if not totals:
+            return
+        now = datetime.utcnow()
+        stmt = insert(UserModelUsage).values(
+            [
+                {
+                    "user_id": t.user_id,
+                    "model": t.model,
+                    "prompt_tokens": t.prompt_tokens,
+                    "completion_tokens": t.completion_tokens,
+                    "cached_tokens": t.cached_tokens,
+                    "runs": t.runs,
+                    "updated_at": now,
+                }
+                for t in totals
+            ]
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserModelUsage.user_id, UserModelUsage.model],
+            set_={
+                "prompt_tokens": UserModelUsage.prompt_tokens + excluded.prompt_tokens,
+                "completion_tokens": UserModelUsage.completion_tokens + excluded.completion_tokens,
+                "cached_tokens": UserModelUsage.cached_tokens + excluded.cached_tokens,
+                "runs": UserModelUsage.runs + excluded.runs,
+                "updated_at": excluded.updated_at,
+            },
+        )
+        self.db.execute(stmt)
+        self.db.commit()
@@ -0,0 +1,23 @@
+"""Usage API endpoints."""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.auth.dependencies import get_current_user
+from src.database import get_db
+from src.user.models import User
+
+from .repository import UsageRepository
+from .schemas import ModelUsage, UsageResponse
+
+router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+@router.get("", response_model=UsageResponse)
+async def get_usage(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Current user's token totals per model (updated every few seconds)."""
+    rows = UsageRepository(db).list_by_user(current_user.id)
+    return UsageResponse(models=[ModelUsage.model_validate(r) for r in rows])
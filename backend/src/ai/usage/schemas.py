@@ -0,0 +1,24 @@
+"""Usage schemas for API responses."""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ModelUsage(BaseModel):
+    """Token totals for one model."""
+
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    runs: int
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class UsageResponse(BaseModel):
+    """Current user's token totals per model."""
+
+    models: list[ModelUsage]
@@ -0,0 +1,115 @@
+"""Batched, non-blocking persistence of token usage."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from uuid import UUID
+
+from ai.providers.base import Usage
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.database import SessionLocal
+
+from .repository import UsageRepository, UsageTotals
+
+logger = logging.getLogger(__name__)
+
+
+class UsageWriter:
+    """Aggregates usage in memory and upserts it in the background.
+
+    `add()` only updates an in-memory total per (user, model), so the chat path
+    never waits on the database. A background task flushes the totals every
+    `flush_interval` seconds, or sooner once `max_pending` keys accumulate,
+    as one upsert statement run in a worker thread. A failed flush keeps the
+    totals for the next attempt.
+
+    Call `start()` once an event loop is running and `aclose()` on shutdown to
+    write what is still pending.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = 2.0,
+        max_pending: int = 1000,
+    ) -> None:
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._pending: dict[tuple[UUID, str], UsageTotals] = {}
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task[None] | None = None
+
+    def add(self, user_id: UUID, model: str, usage: Usage) -> None:
+        """Record one run's usage. Never blocks."""
+        totals = self._pending.get((user_id, model))
+        if totals is None:
+            totals = self._pending[(user_id, model)] = UsageTotals(user_id, model)
+        totals.prompt_tokens += usage.prompt_tokens
+        totals.completion_tokens += usage.completion_tokens
+        totals.cached_tokens += usage.cached_tokens
+        totals.runs += 1
+        if len(self._pending) >= self._max_pending:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run(), name="usage-writer")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            # Not cancelled: a flush in progress has taken the pending totals and
+            # would lose them. The loop finishes it and exits.
+            self._closing = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write all pending totals now."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await asyncio.to_thread(self._write, list(batch.values()))
+        except Exception:
+            logger.exception("Failed to write usage for %d users/models", len(batch))
+            self._merge_back(batch)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._flush_interval)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def _write(self, totals: list[UsageTotals]) -> None:
+        db = self._session_factory()
+        try:
+            UsageRepository(db).add_totals(totals)
+        finally:
+            db.close()
+
+    def _merge_back(self, batch: dict[tuple[UUID, str], UsageTotals]) -> None:
+        for key, failed in batch.items():
+            totals = self._pending.setdefault(key, UsageTotals(*key))
+            totals.prompt_tokens += failed.prompt_tokens
+            totals.completion_tokens += failed.completion_tokens
+            totals.cached_tokens += failed.cached_tokens
+            totals.runs += failed.runs
+
+
+usage_writer = UsageWriter(
+    SessionLocal,
+    flush_interval=settings.usage_flush_interval,
+    max_pending=settings.usage_max_pending,
+)
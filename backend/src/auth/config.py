@@ -11,6 +11,8 @@ class AuthConfig(BaseSettings):
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     jwt_exp_days: int = 7
+    # Emails of users who may read operational metrics (/api/ai/metrics/*, model status)
+    admin_emails: list[str] = []
 
     model_config = {
         "env_file": find_env_file() or ".env",
@@ -75,3 +75,25 @@ async def get_current_user(
         )
 
     return user
+
+
+async def get_admin_user(current_user=Depends(get_current_user)):
+    """
+    Dependency function that only admits admins (see AuthConfig.admin_emails).
+
+    Args:
+        current_user: Authenticated user
+
+    Returns:
+        User: The authenticated user, if an admin
+
+    Raises:
+        HTTPException: 403 if the user is not an admin
+    """
+    admins = {email.lower() for email in auth_settings.admin_emails}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
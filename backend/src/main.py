@@ -2,17 +2,29 @@
 
 from contextlib import asynccontextmanager
 
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.ai.handler import close_providers, close_tools
 from src.ai.route import router as ai_router
+from src.ai.runs import run_registry
+from src.ai.usage import usage_writer
 from src.auth import router as auth_router
 from src.config import settings
+from src.warmup import warmup
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
+    warmup.start()
+    usage_writer.start()
+    run_registry.start()
     yield
+    await run_registry.aclose()
+    await usage_writer.aclose()
+    await close_providers()
+    await close_tools()
+    await warmup.aclose()
 
 
 app = FastAPI(
@@ -45,5 +57,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Liveness: the process is up and serving."""
+    return {"status": "healthy", "ready": warmup.ready}
+
+
+@app.get("/health/ready")
+async def readiness_check(response: Response):
+    """Readiness: startup warmup has finished (503 until then), with per-step results."""
+    if not warmup.ready:
+        response.status_code = 503
+    return warmup.status()
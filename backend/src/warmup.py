@@ -0,0 +1,128 @@
+"""Startup warmup: heavy imports, preloads and connection pools, gating readiness."""
+
+import asyncio
+import importlib
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from sqlalchemy import text
+
+from src.ai.handler import connect_providers, preload_assets
+from src.config import settings
+from src.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use by the modules that need them; each takes 0.1-5s.
+HEAVY_MODULES = (
+    "litellm",
+    "mcp",
+    "mcp.client.stdio",
+    "mcp.client.streamable_http",
+    "frontmatter",
+)
+
+WarmupStep = Callable[[], Awaitable[Any]]
+
+
+def _import_modules() -> list[str]:
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+    return list(HEAVY_MODULES)
+
+
+def _open_db_pool() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+class Warmup:
+    """Runs startup steps in the background and reports when they are done.
+
+    The app serves (and is live) while warming up; readiness turns true once
+    every step has finished. Optional steps may fail: that is logged as a
+    warning and reported by `status()`, and whatever they would have prepared
+    happens on first use instead. `critical` steps (the app cannot serve
+    without them, e.g. the database) are retried every `retry_interval`
+    seconds instead, and the app stays unready until they succeed.
+    """
+
+    def __init__(
+        self,
+        steps: dict[str, WarmupStep],
+        critical: Iterable[str] = (),
+        retry_interval: float = 5.0,
+    ) -> None:
+        self._steps = steps
+        self._critical = frozenset(critical)
+        self.retry_interval = retry_interval
+        self._results: dict[str, dict[str, Any]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.ready = False
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        """Run all steps concurrently, then mark the app ready."""
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self._steps.items()))
+        self.ready = True
+        failed = [name for name, result in self._results.items() if result["status"] != "ok"]
+        if failed:
+            logger.warning("Warmup finished with failed steps: %s", ", ".join(failed))
+
+    async def _run_step(self, name: str, step: WarmupStep) -> None:
+        attempts = 0
+        while True:
+            attempts += 1
+            started = time.perf_counter()
+            result: dict[str, Any] = {"status": "ok"}
+            try:
+                detail = await step()
+                if detail is not None:
+                    result["detail"] = detail
+            except Exception as e:
+                result = {"status": "error", "error": str(e)}
+            result["durationMs"] = round((time.perf_counter() - started) * 1000, 1)
+            if name in self._critical:
+                result["attempts"] = attempts
+            self._results[name] = result
+            if result["status"] == "ok":
+                return
+            if name not in self._critical:
+                logger.warning("Optional warmup step %s failed: %s", name, result["error"])
+                return
+            logger.error(
+                "Critical warmup step %s failed (attempt %d), retrying in %.0fs: %s",
+                name,
+                attempts,
+                self.retry_interval,
+                result["error"],
+            )
+            await asyncio.sleep(self.retry_interval)
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def status(self) -> dict[str, Any]:
+        return {"ready": self.ready, "steps": dict(self._results)}
+
+
+def _default_steps() -> dict[str, WarmupStep]:
+    steps: dict[str, WarmupStep] = {
+        "imports": lambda: asyncio.to_thread(_import_modules),
+        "assets": lambda: asyncio.to_thread(preload_assets),
+        "database": lambda: asyncio.to_thread(_open_db_pool),
+    }
+    if settings.warmup_preconnect:
+        steps["providers"] = connect_providers
+    return steps
+
+
+warmup = Warmup(_default_steps() if settings.warmup_enabled else {}, critical=["database"])
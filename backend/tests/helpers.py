@@ -0,0 +1,22 @@
+"""Test doubles shared by several test modules."""
+
+from typing import Any
+
+from ai.providers.base import ChunkDelta, LLMProvider
+
+
+class Clock:
+    """Manually advanced time source: set or increment `now`."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def drain(
+    provider: LLMProvider, messages: list[dict[str, Any]] | None = None, model: str = "m"
+) -> list[ChunkDelta]:
+    """Every chunk `provider` streams for `messages` (none by default) and no tools."""
+    return [c async for c in provider.stream(messages or [], [], model)]
@@ -0,0 +1,122 @@
+"""Tests for admission control of agent runs."""
+
+import asyncio
+import unittest
+
+from ai.agent.events import DataPart, Error, TextDelta
+
+from src.ai.admission import AdmissionController, AdmissionRejected
+from src.ai.formatter import event_to_dict
+
+
+async def _events(name: str, release: asyncio.Event, started: list[str]):
+    started.append(name)
+    await release.wait()
+    yield TextDelta(id=name, delta=name)
+
+
+async def _collect(events) -> list:
+    return [event async for event in events]
+
+
+class TestAdmissionController(unittest.IsolatedAsyncioTestCase):
+    """Tests for AdmissionController."""
+
+    async def test_fair_order_across_users(self) -> None:
+        admission = AdmissionController(max_concurrent=1, max_per_user=1)
+        first = admission.enqueue("a")
+        burst = [admission.enqueue("a") for _ in range(3)]
+        other = admission.enqueue("b")
+
+        self.assertTrue(first.admitted.done())
+        # b's single run goes ahead of a's burst, which arrived earlier.
+        self.assertEqual(admission.position(other), 1)
+        self.assertEqual([admission.position(t) for t in burst], [2, 3, 4])
+
+        admission.release(first)
+        self.assertTrue(other.admitted.done())
+        admission.release(other)
+        self.assertTrue(burst[0].admitted.done())
+
+    async def test_per_user_limit_lets_other_users_through(self) -> None:
+        admission = AdmissionController(max_concurrent=4, max_per_user=1)
+        a1, a2 = admission.enqueue("a"), admission.enqueue("a")
+        b1 = admission.enqueue("b")
+        self.assertEqual(
+            [t.admitted.done() for t in (a1, a2, b1)],
+            [True, False, True],
+        )
+        self.assertEqual(admission.stats()["active"], 2)
+
+    async def test_full_queue_is_rejected(self) -> None:
+        admission = AdmissionController(max_concurrent=1, max_queue=1, retry_after=7)
+        admission.enqueue("a")
+        admission.check("b")  # one queue place left
+        admission.enqueue("b")
+        with self.assertRaises(AdmissionRejected) as caught:
+            admission.check("c")
+        self.assertEqual(caught.exception.retry_after, 7)
+
+        per_user = AdmissionController(max_concurrent=1, max_queued_per_user=1)
+        per_user.enqueue("a")
+        per_user.enqueue("a")
+        with self.assertRaises(AdmissionRejected):
+            per_user.enqueue("a")
+        per_user.check("b")
+        self.assertEqual(per_user.stats()["rejected"], 1)
+
+    async def test_queued_run_reports_position_then_runs(self) -> None:
+        waits = []
+        admission = AdmissionController(
+            max_concurrent=1, update_interval=0.01, hooks=[waits.append]
+        )
+        release, started = asyncio.Event(), []
+        first, second = (
+            asyncio.create_task(_collect(admission.admitted(user, _events(user, release, started))))
+            for user in ("a", "b")
+        )
+        await asyncio.sleep(0.02)
+        self.assertEqual(started, ["a"])
+        self.assertEqual(admission.stats()["queued"], 1)
+
+        release.set()
+        await first
+        events = await second
+        queue_parts = [e.data["position"] for e in events if isinstance(e, DataPart)]
+        self.assertEqual(queue_parts, [1, 0])
+        frame = event_to_dict(events[0])
+        self.assertEqual(
+            (frame["type"], frame["id"], frame["transient"]), ("data-queue", "queue", True)
+        )
+        self.assertIsInstance(events[-1], TextDelta)
+        self.assertEqual((admission.active, admission.queued), (0, 0))
+        self.assertEqual([t.name for t in waits], ["queue_wait", "queue_wait"])
+
+    async def test_queue_timeout_yields_error_without_running(self) -> None:
+        admission = AdmissionController(max_concurrent=1, queue_timeout=0.02, update_interval=0.01)
+        holder = admission.enqueue("a")
+        started: list[str] = []
+        events = await _collect(admission.admitted("b", _events("b", asyncio.Event(), started)))
+
+        self.assertIsInstance(events[-1], Error)
+        self.assertIn("429", events[-1].error_text)
+        self.assertEqual(started, [])
+        self.assertEqual((admission.queued, admission.stats()["timeouts"]), (0, 1))
+        admission.release(holder)
+        self.assertEqual(admission.active, 0)
+
+    async def test_abandoned_run_frees_its_slot(self) -> None:
+        admission = AdmissionController(max_concurrent=1)
+        release, started = asyncio.Event(), []
+        events = admission.admitted("a", _events("a", release, started))
+        task = asyncio.create_task(_collect(events))
+        await asyncio.sleep(0)
+        self.assertEqual(admission.active, 1)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(admission.active, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""Tests for system prompt assembly and context budgeting of agent messages."""
+
+import unittest
+from typing import Any
+
+from ai.agent.context import ContextBudget, SystemPrompt, TokenCounts, build_messages
+
+
+def _tokens(message: dict[str, Any]) -> int:
+    """One token per character of content, so budgets are easy to reason about."""
+    return len(message.get("content") or "")
+
+
+def _history() -> list[dict[str, Any]]:
+    return [
+        {"role": "system", "content": "s" * 10},
+        {"role": "user", "content": "u" * 10},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{"id": "t1", "type": "function", "function": {}}],
+        },
+        {"role": "tool", "tool_call_id": "t1", "content": "x" * 500},
+        {"role": "assistant", "content": "a" * 10},
+        {"role": "user", "content": "v" * 10},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{"id": "t2", "type": "function", "function": {}}],
+        },
+        {"role": "tool", "tool_call_id": "t2", "content": "y" * 100},
+    ]
+
+
+class TestSystemPrompt(unittest.TestCase):
+    """Tests for SystemPrompt ordering and build_messages."""
+
+    def test_volatile_sections_follow_stable_ones(self) -> None:
+        system = (
+            SystemPrompt(base="base")
+            .add_section("Today", "2026-01-01", cacheable=False)
+            .add_section("Skills", "<skills/>")
+            .add_section("Empty", " ")
+        )
+        stable, volatile = system.build_parts()
+        self.assertEqual(stable, "base\n\n---\n\n# Skills\n\n<skills/>")
+        self.assertEqual(volatile, "# Today\n\n2026-01-01")
+        self.assertEqual(system.build(), f"{stable}\n\n---\n\n{volatile}")
+
+    def test_build_messages_splits_stable_prefix(self) -> None:
+        history = [{"role": "user", "content": "hi"}]
+        system = SystemPrompt(base="base").add_section("Today", "now", cacheable=False)
+        messages = build_messages(system, history)
+        self.assertEqual([m["content"] for m in messages], ["base", "# Today\n\nnow", "hi"])
+
+        messages = build_messages(SystemPrompt(base="base"), history)
+        self.assertEqual([m["role"] for m in messages], ["system", "user"])
+        self.assertEqual(build_messages(SystemPrompt(), history), history)
+
+
+class TestContextBudget(unittest.TestCase):
+    """Tests for ContextBudget.fit."""
+
+    def test_within_budget_is_untouched(self) -> None:
+        messages = _history()
+        self.assertIsNone(ContextBudget(10_000, _tokens).fit(messages))
+        self.assertEqual(messages, _history())
+
+    def test_elides_old_tool_results_before_dropping_turns(self) -> None:
+        messages = _history()
+        report = ContextBudget(300, _tokens).fit(messages)
+
+        self.assertEqual(len(messages), len(_history()))
+        self.assertTrue(messages[3]["content"].startswith("[Tool output elided"))
+        self.assertEqual(messages[7]["content"], "y" * 100)
+        self.assertEqual(report["elidedToolResults"], 1)
+        self.assertEqual(report["droppedMessages"], 0)
+        self.assertTrue(report["fits"])
+
+    def test_drops_whole_turns_keeping_system_and_tool_pairs(self) -> None:
+        messages = _history()
+        report = ContextBudget(130, _tokens).fit(messages)
+
+        self.assertEqual([m["role"] for m in messages], ["system", "user", "assistant", "tool"])
+        self.assertEqual(messages[-1]["tool_call_id"], "t2")
+        self.assertEqual(report["droppedMessages"], 4)
+
+    def test_all_leading_system_messages_are_pinned(self) -> None:
+        messages = [{"role": "system", "content": "t" * 10}, *_history()]
+        ContextBudget(140, _tokens).fit(messages)
+        self.assertEqual([m["role"] for m in messages[:3]], ["system", "system", "user"])
+
+    def test_reserved_tokens_count_against_budget(self) -> None:
+        messages = _history()
+        self.assertIsNone(ContextBudget(700, _tokens).fit(messages, reserved=0))
+        self.assertIsNotNone(ContextBudget(700, _tokens).fit(messages, reserved=100))
+
+    def test_counts_are_cached_by_message(self) -> None:
+        calls = []
+
+        def counter(message: dict[str, Any]) -> int:
+            calls.append(message)
+            return _tokens(message)
+
+        budget = ContextBudget(10_000, counter)
+        messages = _history()
+        budget.fit(messages)
+        messages.append({"role": "assistant", "content": "done"})
+        budget.fit(messages)
+        self.assertEqual(len(calls), len(messages))
+
+    def test_replaced_messages_are_recounted(self) -> None:
+        calls = []
+
+        def counter(message: dict[str, Any]) -> int:
+            calls.append(message)
+            return _tokens(message)
+
+        budget = ContextBudget(10_000, counter)
+        messages = _history()
+        budget.fit(messages)
+        messages[1] = {**messages[1], "content": "changed"}
+        budget.fit(messages)
+        self.assertEqual(len(calls), 2 * len(messages) - 1)
+        self.assertIs(calls[-1], messages[-1])
+
+    def test_shared_counts_carry_over_to_new_budgets(self) -> None:
+        calls = []
+
+        def counter(message: dict[str, Any]) -> int:
+            calls.append(message)
+            return _tokens(message)
+
+        counts = TokenCounts(max_entries=len(_history()))
+        ContextBudget(10_000, counter, counts).fit(_history())
+        # A new request: equal but freshly parsed messages, plus one more.
+        messages = [*_history(), {"role": "user", "content": "next"}]
+        ContextBudget(10_000, counter, counts).fit(messages)
+        self.assertEqual(len(calls), len(messages))
+        # The oldest entry made room for the new one.
+        ContextBudget(10_000, counter, counts).fit(_history()[:1])
+        self.assertEqual(len(calls), len(messages) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,288 @@
+"""Tests for AgentLoop tool execution."""
+
+import asyncio
+import json
+import time
+import unittest
+from typing import Any
+
+from ai.agent.events import DataPart, Finish, ToolInputAvailable, ToolOutputAvailable
+from ai.agent.loop import AgentLoop
+from ai.agent.metrics import RunTimings, Timing
+from ai.agent.results import ReadToolResult, ToolResultStore
+from ai.agent.tools.base import Tool
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta
+from pydantic import BaseModel
+
+from src.ai.metrics import TimingCollector
+
+
+class _SleepTool(Tool):
+    """Sleep for the given number of seconds and echo a label."""
+
+    name = "sleep"
+
+    class Input(BaseModel):
+        label: str
+        seconds: float
+
+    async def execute(self, input: Input) -> str:
+        await asyncio.sleep(input.seconds)
+        return input.label
+
+
+class _ScriptedProvider(LLMProvider):
+    """Yields one scripted list of chunks per call and records the messages it saw.
+
+    A float in a turn's list pauses the stream for that many seconds.
+    """
+
+    def __init__(self, turns: list[list[ChunkDelta | float]]) -> None:
+        self._turns = list(turns)
+        self.seen: list[list[dict[str, Any]]] = []
+
+    async def stream(self, messages, tools, model):
+        self.seen.append([dict(m) for m in messages])
+        for chunk in self._turns.pop(0):
+            if isinstance(chunk, float):
+                await asyncio.sleep(chunk)
+            else:
+                yield chunk
+
+
+def _tool_call_turn(calls: list[tuple[str, dict[str, Any]]]) -> list[ChunkDelta]:
+    chunks = [
+        ChunkDelta(
+            tool_calls=[
+                ToolCallDelta(index=i, id=call_id, name="sleep", arguments=json.dumps(args))
+            ]
+        )
+        for i, (call_id, args) in enumerate(calls)
+    ]
+    chunks.append(ChunkDelta(finish_reason="tool_calls"))
+    return chunks
+
+
+class TestParallelToolCalls(unittest.IsolatedAsyncioTestCase):
+    """Tests for AgentLoop(parallel_tool_calls=True)."""
+
+    def _provider(self) -> _ScriptedProvider:
+        return _ScriptedProvider(
+            [
+                _tool_call_turn(
+                    [
+                        ("slow", {"label": "slow", "seconds": 0.2}),
+                        ("fast", {"label": "fast", "seconds": 0.0}),
+                        ("mid", {"label": "mid", "seconds": 0.1}),
+                    ]
+                ),
+                [ChunkDelta(content="done"), ChunkDelta(finish_reason="stop")],
+            ]
+        )
+
+    async def test_outputs_emitted_in_completion_order(self) -> None:
+        provider = self._provider()
+        loop = AgentLoop(provider, [_SleepTool()], model="m", parallel_tool_calls=True)
+        started = time.perf_counter()
+        events = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+        elapsed = time.perf_counter() - started
+
+        outputs = [e.tool_call_id for e in events if isinstance(e, ToolOutputAvailable)]
+        self.assertEqual(outputs, ["fast", "mid", "slow"])
+        inputs = [e.tool_call_id for e in events if isinstance(e, ToolInputAvailable)]
+        self.assertEqual(inputs, ["slow", "fast", "mid"])
+        self.assertLess(elapsed, 0.28)
+
+    async def test_history_keeps_call_order(self) -> None:
+        provider = self._provider()
+        loop = AgentLoop(provider, [_SleepTool()], model="m", parallel_tool_calls=True)
+        _ = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+
+        tool_messages = [m for m in provider.seen[1] if m["role"] == "tool"]
+        self.assertEqual([m["tool_call_id"] for m in tool_messages], ["slow", "fast", "mid"])
+        self.assertEqual([m["content"] for m in tool_messages], ["slow", "fast", "mid"])
+
+    async def test_concurrency_cap_of_one_is_sequential(self) -> None:
+        provider = self._provider()
+        loop = AgentLoop(
+            provider,
+            [_SleepTool()],
+            model="m",
+            parallel_tool_calls=True,
+            max_concurrent_tools=1,
+        )
+        events = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+        outputs = [e.tool_call_id for e in events if isinstance(e, ToolOutputAvailable)]
+        self.assertEqual(outputs, ["slow", "fast", "mid"])
+
+
+class TestSequentialToolCalls(unittest.IsolatedAsyncioTestCase):
+    """The default path interleaves input/output events per call."""
+
+    async def test_events_interleave(self) -> None:
+        provider = _ScriptedProvider(
+            [
+                _tool_call_turn(
+                    [
+                        ("a", {"label": "a", "seconds": 0.0}),
+                        ("b", {"label": "b", "seconds": 0.0}),
+                    ]
+                ),
+                [ChunkDelta(finish_reason="stop")],
+            ]
+        )
+        loop = AgentLoop(provider, [_SleepTool()], model="m")
+        events = [
+            (type(e).__name__, e.tool_call_id)
+            async for e in loop.run([{"role": "user", "content": "hi"}])
+            if isinstance(e, ToolInputAvailable | ToolOutputAvailable)
+        ]
+        self.assertEqual(
+            events,
+            [
+                ("ToolInputAvailable", "a"),
+                ("ToolOutputAvailable", "a"),
+                ("ToolInputAvailable", "b"),
+                ("ToolOutputAvailable", "b"),
+            ],
+        )
+
+
+class TestSpeculativeToolCalls(unittest.IsolatedAsyncioTestCase):
+    """Tests for AgentLoop(speculative_tool_calls=True)."""
+
+    def _provider(self) -> _ScriptedProvider:
+        first = _tool_call_turn([("a", {"label": "a", "seconds": 0.2})])
+        # The call's JSON is complete long before the model finishes its turn.
+        first.insert(1, ChunkDelta(content="still talking"))
+        first.insert(2, 0.2)
+        return _ScriptedProvider([first, [ChunkDelta(finish_reason="stop")]])
+
+    async def _run(self, speculative: bool) -> tuple[list[Any], float]:
+        loop = AgentLoop(
+            self._provider(), [_SleepTool()], model="m", speculative_tool_calls=speculative
+        )
+        started = time.perf_counter()
+        events = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+        return events, time.perf_counter() - started
+
+    async def test_overlaps_tool_with_generation(self) -> None:
+        _, elapsed = await self._run(speculative=True)
+        self.assertLess(elapsed, 0.35)
+
+    async def test_events_match_non_speculative_path(self) -> None:
+        speculative, _ = await self._run(speculative=True)
+        baseline, _ = await self._run(speculative=False)
+
+        def shape(events: list[Any]) -> list[tuple[str, Any]]:
+            return [(type(e).__name__, getattr(e, "tool_call_id", None)) for e in events]
+
+        self.assertEqual(shape(speculative), shape(baseline))
+
+    async def test_tool_error_surfaces_after_stream(self) -> None:
+        class _Broken(Tool):
+            name = "sleep"
+
+            async def execute(self, input: Any) -> str:
+                raise RuntimeError("boom")
+
+        loop = AgentLoop(self._provider(), [_Broken()], model="m", speculative_tool_calls=True)
+        seen: list[str] = []
+        with self.assertRaises(RuntimeError):
+            async for event in loop.run([{"role": "user", "content": "hi"}]):
+                seen.append(type(event).__name__)
+        self.assertEqual(seen[-1], "ToolInputAvailable")
+
+
+class TestToolResultElision(unittest.IsolatedAsyncioTestCase):
+    """Tests for AgentLoop(max_tool_result_chars=...)."""
+
+    async def test_oversized_output_is_previewed_with_handle(self) -> None:
+        big = "x" * 500 + "y" * 500
+        provider = _ScriptedProvider(
+            [
+                _tool_call_turn([("a", {"label": big, "seconds": 0.0})]),
+                [ChunkDelta(finish_reason="stop")],
+            ]
+        )
+        loop = AgentLoop(provider, [_SleepTool()], model="m", max_tool_result_chars=100)
+        events = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+
+        output = next(e.output for e in events if isinstance(e, ToolOutputAvailable))
+        self.assertEqual(output, big)
+        (tool_message,) = [m for m in provider.seen[1] if m["role"] == "tool"]
+        self.assertLess(len(tool_message["content"]), 400)
+        self.assertTrue(tool_message["content"].startswith("x" * 25))
+        self.assertTrue(tool_message["content"].endswith("y" * 25))
+        self.assertIn("result-1", tool_message["content"])
+
+    async def test_small_output_passes_through(self) -> None:
+        store = ToolResultStore(threshold=10)
+        self.assertEqual(store.elide("short"), "short")
+        self.assertIsNone(store.get("result-1"))
+
+    async def test_reader_pages_through_stored_output(self) -> None:
+        store = ToolResultStore(threshold=10)
+        store.elide("0123456789abcdefghij-")
+        reader = ReadToolResult(store)
+
+        first = await reader.call({"handle": "result-1"})
+        self.assertTrue(first.startswith("0123456789\n"))
+        self.assertIn("next offset 10", first)
+        last = await reader.call({"handle": "result-1", "offset": 20, "limit": 50})
+        self.assertTrue(last.startswith("-\n"))
+        self.assertIn("end of result", last)
+        missing = await reader.call({"handle": "nope"})
+        self.assertIn("No stored result", missing)
+
+
+class TestTimings(unittest.IsolatedAsyncioTestCase):
+    """Tests for AgentLoop latency records."""
+
+    async def test_records_stages_and_emits_data_part(self) -> None:
+        provider = _ScriptedProvider(
+            [
+                [0.05, *_tool_call_turn([("a", {"label": "a", "seconds": 0.05})])],
+                [ChunkDelta(content="done"), ChunkDelta(finish_reason="stop")],
+            ]
+        )
+        collector = TimingCollector(tools=["sleep"])
+        timings = RunTimings(hooks=[collector.record])
+        loop = AgentLoop(provider, [_SleepTool()], model="m", timings=timings, emit_timings=True)
+        events = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+
+        self.assertIsInstance(events[-1], Finish)
+        part = events[-2]
+        self.assertIsInstance(part, DataPart)
+        self.assertEqual(part.data_type, "timings")
+        names = [r["name"] for r in part.data["records"]]
+        self.assertEqual(names, ["ttft", "stream", "tool", "ttft", "stream", "run"])
+
+        ttft, _, tool = part.data["records"][:3]
+        self.assertGreaterEqual(ttft["durationMs"], 45)
+        self.assertGreaterEqual(tool["durationMs"], 45)
+        self.assertEqual((tool["toolName"], tool["iteration"], tool["error"]), ("sleep", 0, False))
+        self.assertEqual(set(collector.summary()), {"ttft", "stream", "tool:sleep", "run"})
+
+    def test_collector_groups_other_tools_and_mcp_servers(self) -> None:
+        collector = TimingCollector(tools=["sleep"])
+        for name, attributes in [
+            ("tool", {"toolName": "sleep"}),
+            ("tool", {"toolName": "acme__search"}),
+            ("tool", {"toolName": "private__lookup"}),
+            ("mcp_setup", {"server": "acme"}),
+        ]:
+            collector.record(Timing(name=name, duration_ms=1.0, attributes=attributes))
+        summary = collector.summary()
+        self.assertEqual(set(summary), {"tool:sleep", "tool:other", "mcp_setup"})
+        self.assertEqual(summary["tool:other"]["count"], 2)
+
+    async def test_no_data_part_by_default(self) -> None:
+        provider = _ScriptedProvider([[ChunkDelta(content="hi"), ChunkDelta(finish_reason="stop")]])
+        loop = AgentLoop(provider, [], model="m")
+        events = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+        self.assertFalse(any(isinstance(e, DataPart) for e in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
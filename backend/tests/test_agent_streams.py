@@ -0,0 +1,148 @@
+"""Tests for agent event stream stages."""
+
+import asyncio
+import time
+import unittest
+from contextlib import asynccontextmanager
+
+from ai.agent.events import (
+    Finish,
+    TextDelta,
+    ToolInputAvailable,
+    ToolInputDelta,
+    ToolInputStart,
+)
+from ai.agent.loop import AgentLoop
+from ai.agent.streams import coalesce_deltas
+from ai.agent.tools.base import Tool
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta
+from pydantic import BaseModel
+
+
+class _HangingTool(Tool):
+    """Never finishes unless cancelled."""
+
+    name = "hang"
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    class Input(BaseModel):
+        pass
+
+    async def execute(self, input: Input) -> str:
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "done"
+
+
+class _ClosingProvider(LLMProvider):
+    """Streams one tool call, then records whether its stream was closed."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def stream(self, messages, tools, model):
+        try:
+            yield ChunkDelta(
+                tool_calls=[ToolCallDelta(index=0, id="c", name="hang", arguments="{}")]
+            )
+            yield ChunkDelta(finish_reason="tool_calls")
+        finally:
+            self.closed = True
+
+
+class TestCoalesceDeltas(unittest.IsolatedAsyncioTestCase):
+    """Tests for coalesce_deltas."""
+
+    async def test_merges_runs_and_flushes_on_other_events(self) -> None:
+        async def events():
+            for piece in "abc":
+                yield TextDelta(id="t1", delta=piece)
+            yield TextDelta(id="t2", delta="d")
+            yield ToolInputStart(tool_call_id="c", tool_name="echo")
+            yield ToolInputDelta(tool_call_id="c", input_text_delta='{"a"')
+            yield ToolInputDelta(tool_call_id="c", input_text_delta=": 1}")
+            yield Finish(finish_reason="stop")
+
+        out = [e async for e in coalesce_deltas(events(), max_delay=60)]
+        self.assertEqual(
+            out,
+            [
+                TextDelta(id="t1", delta="abc"),
+                TextDelta(id="t2", delta="d"),
+                ToolInputStart(tool_call_id="c", tool_name="echo"),
+                ToolInputDelta(tool_call_id="c", input_text_delta='{"a": 1}'),
+                Finish(finish_reason="stop"),
+            ],
+        )
+
+    async def test_max_chars_flushes(self) -> None:
+        async def events():
+            for _ in range(5):
+                yield TextDelta(id="t", delta="xx")
+
+        out = [e async for e in coalesce_deltas(events(), max_delay=60, max_chars=4)]
+        self.assertEqual([e.delta for e in out], ["xxxx", "xxxx", "xx"])
+
+    async def test_window_bounds_latency(self) -> None:
+        async def events():
+            yield TextDelta(id="t", delta="a")
+            await asyncio.sleep(60)
+            yield TextDelta(id="t", delta="b")
+
+        stream = coalesce_deltas(events(), max_delay=0.01)
+        started = time.perf_counter()
+        first = await anext(stream)
+        self.assertEqual(first, TextDelta(id="t", delta="a"))
+        self.assertLess(time.perf_counter() - started, 1)
+        await stream.aclose()
+
+    async def test_closing_cancels_run(self) -> None:
+        provider, tool = _ClosingProvider(), _HangingTool()
+        loop = AgentLoop(provider, [tool], model="m")
+        stream = coalesce_deltas(loop.run([{"role": "user", "content": "hi"}]), max_delay=60)
+        async for event in stream:
+            if isinstance(event, ToolInputAvailable):
+                break
+        await asyncio.sleep(0.01)
+        await stream.aclose()
+        self.assertTrue(tool.cancelled)
+        self.assertTrue(provider.closed)
+
+    async def test_context_managers_exit_in_their_own_task(self) -> None:
+        tasks: list[asyncio.Task] = []
+
+        @asynccontextmanager
+        async def session():
+            tasks.append(asyncio.current_task())
+            try:
+                yield
+            finally:
+                tasks.append(asyncio.current_task())
+
+        async def events():
+            async with session():
+                yield Finish(finish_reason="stop")
+                await asyncio.sleep(60)
+
+        stream = coalesce_deltas(events())
+        await anext(stream)
+        await stream.aclose()
+        self.assertEqual(len(tasks), 2)
+        self.assertIs(tasks[0], tasks[1])
+
+    async def test_errors_propagate(self) -> None:
+        async def events():
+            yield TextDelta(id="t", delta="a")
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            _ = [e async for e in coalesce_deltas(events())]
+
+
+if __name__ == "__main__":
+    unittest.main()
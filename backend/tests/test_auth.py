@@ -0,0 +1,31 @@
+"""Tests for the admin-only dependency guarding operational endpoints."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from src.auth.config import auth_settings
+from src.auth.dependencies import get_admin_user
+
+
+class TestGetAdminUser(unittest.IsolatedAsyncioTestCase):
+    """Tests for get_admin_user."""
+
+    async def test_admits_configured_admins_only(self) -> None:
+        admin = SimpleNamespace(email="Ops@Example.com")
+        user = SimpleNamespace(email="user@example.com")
+        with patch.object(auth_settings, "admin_emails", ["ops@example.com"]):
+            self.assertIs(await get_admin_user(admin), admin)
+            with self.assertRaises(HTTPException) as caught:
+                await get_admin_user(user)
+        self.assertEqual(caught.exception.status_code, 403)
+
+    async def test_no_admins_by_default(self) -> None:
+        with self.assertRaises(HTTPException):
+            await get_admin_user(SimpleNamespace(email="ops@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for batch agent execution."""
+
+import asyncio
+import unittest
+
+from ai.providers.base import ChunkDelta, LLMProvider, Usage
+
+from src.ai.admission import AdmissionController
+from src.ai.batch import BatchItem, run_batch
+
+
+class _EchoProvider(LLMProvider):
+    """Answers with the last user message after `delay` seconds; tracks concurrency."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def stream(self, messages, tools, model):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            content = messages[-1]["content"]
+            if content == "fail":
+                raise RuntimeError("provider down")
+            await asyncio.sleep(60 if content == "hang" else self.delay)
+            yield ChunkDelta(content=f"re: {content}", finish_reason="stop")
+            yield ChunkDelta(usage=Usage(prompt_tokens=3, completion_tokens=2))
+        finally:
+            self.running -= 1
+
+
+def _items(*contents: str) -> list[BatchItem]:
+    return [
+        BatchItem(id=str(i), messages=[{"role": "user", "content": c}])
+        for i, c in enumerate(contents)
+    ]
+
+
+async def _run(items: list[BatchItem], provider: LLMProvider, **kwargs):
+    return [r async for r in run_batch(items, "m", provider=provider, **kwargs)]
+
+
+class TestRunBatch(unittest.IsolatedAsyncioTestCase):
+    """Tests for run_batch."""
+
+    async def test_runs_every_item_within_concurrency(self) -> None:
+        provider = _EchoProvider()
+        results = await _run(_items(*(f"q{i}" for i in range(10))), provider, concurrency=3)
+        self.assertEqual(sorted(int(r.id) for r in results), list(range(10)))
+        self.assertEqual(provider.max_running, 3)
+        by_id = {r.id: r for r in results}
+        self.assertEqual(by_id["4"].text, "re: q4")
+        self.assertEqual(by_id["4"].status, "ok")
+        self.assertEqual(by_id["4"].finish_reason, "stop")
+        self.assertEqual(by_id["4"].usage, Usage(prompt_tokens=3, completion_tokens=2))
+
+    async def test_items_take_admission_slots(self) -> None:
+        provider = _EchoProvider()
+        admission = AdmissionController(max_concurrent=2, max_per_user=2)
+        results = await _run(
+            _items(*(f"q{i}" for i in range(6))), provider, concurrency=4, admission=admission
+        )
+        self.assertEqual([r.status for r in results], ["ok"] * 6)
+        self.assertEqual(provider.max_running, 2)
+        self.assertEqual((admission.admitted_total, admission.active), (6, 0))
+
+    async def test_failures_and_timeouts_are_per_item(self) -> None:
+        results = await _run(
+            _items("ok", "fail", "hang"), _EchoProvider(), concurrency=3, item_timeout=0.1
+        )
+        by_id = {r.id: r for r in results}
+        self.assertEqual(by_id["0"].status, "ok")
+        self.assertEqual(by_id["1"].status, "error")
+        self.assertEqual(by_id["2"].status, "timeout")
+        self.assertEqual([r.id for r in results][-1], "2")
+
+    async def test_results_stream_as_they_complete(self) -> None:
+        results = run_batch(_items("hang", "fast"), "m", provider=_EchoProvider(), concurrency=2)
+        first = await asyncio.wait_for(anext(results), 1)
+        self.assertEqual(first.id, "1")
+        await results.aclose()
+
+    async def test_to_dict_is_camel_case(self) -> None:
+        (result,) = await _run(_items("hi"), _EchoProvider())
+        data = result.to_dict()
+        self.assertEqual(data["finishReason"], "stop")
+        self.assertEqual(data["toolCalls"], [])
+        self.assertIn("durationMs", data)
+
+
+if __name__ == "__main__":
+    unittest.main()
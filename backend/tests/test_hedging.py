@@ -0,0 +1,110 @@
+"""Tests for the hedging provider wrapper."""
+
+import asyncio
+import unittest
+
+from ai.providers.base import ChunkDelta, LLMProvider
+from ai.providers.hedging import HedgingProvider, StreamStalled
+from ai.providers.ratelimit import RateLimit, RateLimitedProvider
+
+
+class _ScriptedProvider(LLMProvider):
+    """Per model: seconds before the first chunk, a stall after it, or a failure."""
+
+    def __init__(self, first: dict[str, float], fail: set[str] = (), stall: set[str] = ()):
+        self.first = first
+        self.fail = set(fail)
+        self.stall = set(stall)
+        self.cancelled: list[str] = []
+
+    async def stream(self, messages, tools, model):
+        try:
+            if model in self.fail:
+                raise RuntimeError(f"{model} down")
+            await asyncio.sleep(self.first[model])
+            yield ChunkDelta(content=model)
+            if model in self.stall:
+                await asyncio.sleep(60)
+            yield ChunkDelta(finish_reason="stop")
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+
+
+class _SlowStore:
+    """Rate-limit store that always makes the caller wait `wait` seconds."""
+
+    def __init__(self, wait: float) -> None:
+        self.wait = wait
+
+    async def reserve(self, debits, now):
+        return self.wait
+
+    async def credit(self, name, amount, rate, capacity, now):
+        pass
+
+
+async def _content(provider: LLMProvider, model: str = "slow") -> list[str]:
+    return [c.content async for c in provider.stream([], [], model) if c.content]
+
+
+class TestHedgingProvider(unittest.IsolatedAsyncioTestCase):
+    """Tests for HedgingProvider."""
+
+    async def test_fast_primary_is_not_hedged(self) -> None:
+        inner = _ScriptedProvider({"slow": 0, "fast": 0})
+        provider = HedgingProvider(inner, {"slow": "fast"}, ttft_timeout=0.1)
+        self.assertEqual(await _content(provider), ["slow"])
+        self.assertEqual(provider.stats.hedges, 0)
+
+    async def test_late_first_chunk_hedges_and_cancels_loser(self) -> None:
+        inner = _ScriptedProvider({"slow": 60, "fast": 0.01})
+        provider = HedgingProvider(inner, {"slow": "fast"}, ttft_timeout=0.02)
+        self.assertEqual(await _content(provider), ["fast"])
+        self.assertEqual(inner.cancelled, ["slow"])
+        self.assertEqual((provider.stats.hedges, provider.stats.hedge_wins), (1, 1))
+
+    async def test_primary_can_still_win_after_hedge(self) -> None:
+        inner = _ScriptedProvider({"slow": 0.05, "fast": 60})
+        provider = HedgingProvider(inner, {"slow": "fast"}, ttft_timeout=0.02)
+        self.assertEqual(await _content(provider), ["slow"])
+        self.assertEqual(inner.cancelled, ["fast"])
+        self.assertEqual((provider.stats.hedges, provider.stats.hedge_wins), (1, 0))
+
+    async def test_failed_primary_falls_back(self) -> None:
+        inner = _ScriptedProvider({"fast": 0}, fail={"slow"})
+        provider = HedgingProvider(inner, lambda model: "fast", ttft_timeout=10)
+        self.assertEqual(await _content(provider), ["fast"])
+        self.assertEqual(provider.stats.fallbacks, 1)
+
+    async def test_failure_without_fallback_propagates(self) -> None:
+        provider = HedgingProvider(_ScriptedProvider({}, fail={"slow"}), {}, ttft_timeout=1)
+        with self.assertRaises(RuntimeError):
+            await _content(provider)
+
+    async def test_stall_between_chunks_raises(self) -> None:
+        inner = _ScriptedProvider({"slow": 0}, stall={"slow"})
+        provider = HedgingProvider(inner, {}, stall_timeout=0.02)
+        with self.assertRaises(StreamStalled):
+            await _content(provider)
+        self.assertEqual(provider.stats.stalls, 1)
+        self.assertEqual(inner.cancelled, ["slow"])
+
+    async def test_rate_limiter_wait_does_not_hedge_or_stall(self) -> None:
+        inner = RateLimitedProvider(
+            _ScriptedProvider({"slow": 0.01, "fast": 0}),
+            lambda model: RateLimit(rpm=60),
+            store=_SlowStore(0.1),
+        )
+        provider = HedgingProvider(inner, {"slow": "fast"}, ttft_timeout=0.05, stall_timeout=0.05)
+        self.assertEqual(await _content(provider), ["slow"])
+        self.assertEqual((provider.stats.hedges, provider.stats.stalls), (0, 0))
+
+        # Without a fallback the first-chunk wait is the stall timeout.
+        provider = HedgingProvider(inner, {}, stall_timeout=0.05)
+        self.assertEqual(await _content(provider), ["slow"])
+        self.assertEqual(provider.stats.stalls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
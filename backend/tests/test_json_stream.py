@@ -0,0 +1,66 @@
+"""Tests for the incremental tool-argument JSON parser."""
+
+import json
+import unittest
+
+from ai.utils.json_stream import IncrementalJSONParser
+
+_DOC = {
+    "path": "src/app.py",
+    "content": 'print("hi")\n\\ é {not: structure} [x]',
+    "flags": [1, 2.5, {"nested": True}],
+    "none": None,
+}
+
+
+def _feed(text: str, size: int) -> IncrementalJSONParser:
+    parser = IncrementalJSONParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+    return parser
+
+
+class TestIncrementalJSONParser(unittest.TestCase):
+    """Tests for IncrementalJSONParser."""
+
+    def test_round_trips_any_fragmentation(self) -> None:
+        text = json.dumps(_DOC)
+        for size in (1, 2, 3, 7, len(text)):
+            parser = _feed(text, size)
+            self.assertTrue(parser.complete)
+            self.assertEqual(parser.text, text)
+            self.assertEqual(parser.value(), _DOC)
+
+    def test_completion_detected_when_object_closes(self) -> None:
+        text = json.dumps(_DOC)
+        parser = IncrementalJSONParser()
+        self.assertFalse(parser.feed(text[:-1]))
+        self.assertTrue(parser.feed(text[-1]))
+
+    def test_braces_inside_strings_do_not_close(self) -> None:
+        parser = _feed('{"a": "}\\"}"', 1)
+        self.assertFalse(parser.complete)
+        self.assertEqual(parser.partial(), {"a": '}"}'})
+
+    def test_partial_closes_open_string_value(self) -> None:
+        parser = _feed('{"path": "a.py", "content": "line 1\\nli', 4)
+        self.assertEqual(parser.partial(), {"path": "a.py", "content": "line 1\nli"})
+
+    def test_partial_drops_incomplete_key_and_escape(self) -> None:
+        self.assertEqual(_feed('{"a": 1, "ke', 3).partial(), {"a": 1})
+        self.assertEqual(_feed('{"a": "x\\u00', 3).partial(), {"a": "x"})
+
+    def test_partial_never_raises_on_any_prefix(self) -> None:
+        text = json.dumps(_DOC)
+        for end in range(len(text) + 1):
+            _feed(text[:end], 5).partial()
+
+    def test_invalid_json_raises_on_value(self) -> None:
+        parser = _feed('{"a": 1}} trailing', 4)
+        self.assertTrue(parser.complete)
+        with self.assertRaises(json.JSONDecodeError):
+            parser.value()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Tests for the scriptable mock LLM server and its catalog model."""
+
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+from ai.agent.tools.weather import GetCurrentWeather
+from ai.providers.base import ChunkDelta
+from ai.providers.openai_compat import OpenAICompatibleError, OpenAICompatibleProvider
+
+from benchmarks.mock_openai import MockOpenAIServer, MockScript
+from src.ai.models.repository import MOCK_MODEL_ID, ModelRepository
+from src.config import settings
+
+_MESSAGES = [{"role": "user", "content": "x" * 400}]
+
+
+class TestMockScript(unittest.IsolatedAsyncioTestCase):
+    """Tests for MockOpenAIServer's scripted behavior."""
+
+    async def asyncSetUp(self) -> None:
+        self.server = MockOpenAIServer(MockScript(text_chunks=10, seed=1))
+        await self.server.start()
+        self.provider = OpenAICompatibleProvider(self.server.base_url)
+
+    async def asyncTearDown(self) -> None:
+        await self.provider.aclose()
+        await self.server.aclose()
+
+    async def _drain(self, tools=(), messages=_MESSAGES) -> list[ChunkDelta]:
+        return [c async for c in self.provider.stream(messages, list(tools), "mock")]
+
+    async def test_paced_by_ttft_and_tokens_per_second(self) -> None:
+        self.server.script.ttft = 0.05
+        self.server.script.tokens_per_second = 200
+        started = time.perf_counter()
+        chunks = await self._drain()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05 + 10 / 200)
+        self.assertEqual(chunks[-1].usage.prompt_tokens, 100)
+        self.assertEqual(chunks[-1].usage.completion_tokens, 10)
+
+    async def test_calls_request_tools_with_schema_arguments(self) -> None:
+        self.server.script.tool_calls = 2
+        weather = GetCurrentWeather().to_schema()
+        other = {"type": "function", "function": {"name": "other", "parameters": {}}}
+        self.server.script.tool_names = ["get_current_weather"]
+        chunks = await self._drain([other, weather])
+
+        calls: dict[int, list[str]] = {}
+        for chunk in chunks:
+            for tc in chunk.tool_calls:
+                calls.setdefault(tc.index, []).append(tc.name or "")
+                calls[tc.index].append(tc.arguments)
+        self.assertEqual(set(calls), {0, 1})
+        self.assertEqual(calls[0][0], "get_current_weather")
+        arguments = json.loads("".join(calls[0][1::2]))
+        self.assertEqual(arguments, {"latitude": 1.5, "longitude": 1.5})
+        self.assertEqual(chunks[-2].finish_reason, "tool_calls")
+
+        # Once the conversation has tool results, the model answers with text.
+        answered = [*_MESSAGES, {"role": "tool", "tool_call_id": "call_0", "content": "{}"}]
+        chunks = await self._drain([weather], answered)
+        self.assertEqual(chunks[-2].finish_reason, "stop")
+
+    async def test_injected_errors(self) -> None:
+        self.server.script.error_rate = 1.0
+        with self.assertRaises(OpenAICompatibleError) as caught:
+            await self._drain()
+        self.assertEqual(caught.exception.status_code, 503)
+
+        self.server.script.error_rate = 0.0
+        self.server.script.midstream_error_rate = 1.0
+        received: list[ChunkDelta] = []
+        with self.assertRaises(ConnectionError):
+            async for chunk in self.provider.stream(_MESSAGES, [], "mock"):
+                received.append(chunk)
+        self.assertTrue(any(c.content for c in received))
+        self.assertEqual(self.server.errors, 2)
+
+
+class TestMockCatalogModel(unittest.TestCase):
+    """The mock model is in the catalog only when its base URL is configured."""
+
+    def test_offered_with_base_url(self) -> None:
+        self.assertFalse(ModelRepository().exists(MOCK_MODEL_ID))
+        with patch.object(settings, "mock_llm_base_url", "http://127.0.0.1:8099/v1"):
+            repo = ModelRepository()
+        self.assertEqual(
+            repo.get_endpoint(MOCK_MODEL_ID),
+            {"base_url": "http://127.0.0.1:8099/v1", "model": "mock"},
+        )
+        self.assertNotEqual(repo.get_default_id(), MOCK_MODEL_ID)
+
+
+if __name__ == "__main__":
+    unittest.main()
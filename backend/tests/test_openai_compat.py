@@ -0,0 +1,89 @@
+"""Tests for the direct OpenAI-compatible provider."""
+
+import json
+import unittest
+
+from ai.providers.openai_compat import (
+    OpenAICompatibleError,
+    OpenAICompatibleProvider,
+    SSEDecoder,
+)
+from ai.providers.routing import RoutingProvider
+
+from benchmarks.mock_openai import MockOpenAIServer, MockScript
+from tests.helpers import drain
+
+_MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class TestSSEDecoder(unittest.TestCase):
+    """Tests for SSEDecoder."""
+
+    def test_events_split_across_reads(self) -> None:
+        decoder = SSEDecoder()
+        body = b': comment\r\nevent: x\r\ndata: {"a":1}\r\n\r\ndata:[DONE]\n\n'
+        events = []
+        for i in range(len(body)):
+            events.extend(decoder.feed(body[i : i + 1]))
+        self.assertEqual(events, [b'{"a":1}', b"[DONE]"])
+
+    def test_multi_line_data_and_unterminated_event(self) -> None:
+        decoder = SSEDecoder()
+        self.assertEqual(decoder.feed(b"data: a\ndata: b\n\ndata: c"), [b"a\nb"])
+        self.assertEqual(decoder.feed(b"\n\n"), [b"c"])
+
+
+class TestOpenAICompatibleProvider(unittest.IsolatedAsyncioTestCase):
+    """Tests for OpenAICompatibleProvider against the local mock server."""
+
+    async def asyncSetUp(self) -> None:
+        self.server = MockOpenAIServer(MockScript(text_chunks=3, tool_calls=2))
+        await self.server.start()
+        self.provider = OpenAICompatibleProvider(self.server.base_url, api_key="k")
+
+    async def asyncTearDown(self) -> None:
+        await self.provider.aclose()
+        await self.server.aclose()
+
+    async def test_streams_text_tool_calls_and_usage(self) -> None:
+        chunks = await drain(self.provider, _MESSAGES, "mock")
+
+        self.assertEqual("".join(c.content or "" for c in chunks), "aaaabbbbcccc")
+        arguments: dict[int, str] = {}
+        for chunk in chunks:
+            for tc in chunk.tool_calls:
+                arguments[tc.index] = arguments.get(tc.index, "") + tc.arguments
+        self.assertEqual(set(arguments), {0, 1})
+        self.assertEqual(json.loads(arguments[1]), {"payload": "y" * 64})
+        self.assertEqual(chunks[-2].finish_reason, "tool_calls")
+        self.assertEqual(chunks[-1].usage.completion_tokens, 3)
+
+        request = self.server.requests[0]
+        self.assertEqual((request["model"], request["stream"]), ("mock", True))
+        self.assertNotIn("tools", request)
+
+    async def test_connection_is_reused(self) -> None:
+        await drain(self.provider, _MESSAGES, "mock")
+        await drain(self.provider, _MESSAGES, "mock")
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.connections, 1)
+
+    async def test_error_status_raises_with_status_code(self) -> None:
+        self.server.script.status = 503
+        with self.assertRaises(OpenAICompatibleError) as caught:
+            await drain(self.provider, _MESSAGES, "mock")
+        self.assertEqual(caught.exception.status_code, 503)
+        self.assertEqual(str(caught.exception), "mock error")
+
+    async def test_routing_sends_upstream_model_name(self) -> None:
+        router = RoutingProvider(
+            self.provider,
+            lambda model: (self.provider, "upstream") if model == "catalog/id" else None,
+        )
+        await drain(router, _MESSAGES, "catalog/id")
+        await drain(router, _MESSAGES, "other")
+        self.assertEqual([r["model"] for r in self.server.requests], ["upstream", "other"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Tests for provider-side prompt cache breakpoints and cached token reporting."""
+
+import unittest
+from types import SimpleNamespace
+
+from ai.providers.litellm import _usage, mark_cacheable_prefix
+
+_TOOLS = [
+    {"type": "function", "function": {"name": "a"}},
+    {"type": "function", "function": {"name": "b"}},
+]
+
+
+class TestMarkCacheablePrefix(unittest.TestCase):
+    """Tests for mark_cacheable_prefix."""
+
+    def test_marks_last_tool_and_first_system_message(self) -> None:
+        messages = [
+            {"role": "system", "content": "stable"},
+            {"role": "system", "content": "volatile"},
+            {"role": "user", "content": "hi"},
+        ]
+        marked, tools = mark_cacheable_prefix(messages, _TOOLS)
+
+        self.assertNotIn("cache_control", tools[0])
+        self.assertEqual(tools[1]["cache_control"], {"type": "ephemeral"})
+        self.assertEqual(
+            marked[0]["content"],
+            [{"type": "text", "text": "stable", "cache_control": {"type": "ephemeral"}}],
+        )
+        self.assertEqual(marked[1:], messages[1:])
+        # The caller's lists are left untouched.
+        self.assertEqual(messages[0]["content"], "stable")
+        self.assertNotIn("cache_control", _TOOLS[1])
+
+    def test_without_system_message_only_tools_are_marked(self) -> None:
+        messages = [{"role": "user", "content": "hi"}]
+        marked, tools = mark_cacheable_prefix(messages, [])
+        self.assertEqual((marked, tools), (messages, []))
+
+
+class TestUsage(unittest.TestCase):
+    """Tests for cached token extraction from LiteLLM usage blocks."""
+
+    def test_prompt_tokens_details(self) -> None:
+        raw = SimpleNamespace(
+            prompt_tokens=100,
+            completion_tokens=5,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=80),
+        )
+        self.assertEqual(_usage(raw).cached_tokens, 80)
+
+    def test_anthropic_cache_read_tokens(self) -> None:
+        raw = SimpleNamespace(
+            prompt_tokens=100,
+            completion_tokens=5,
+            prompt_tokens_details=None,
+            cache_read_input_tokens=64,
+        )
+        usage = _usage(raw)
+        self.assertEqual((usage.prompt_tokens, usage.cached_tokens), (100, 64))
+
+
+if __name__ == "__main__":
+    unittest.main()
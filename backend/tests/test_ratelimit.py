@@ -0,0 +1,185 @@
+"""Tests for client-side rate limiting of provider calls."""
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from ai.providers.base import ChunkDelta, LLMProvider, Usage
+from ai.providers.ratelimit import (
+    MemoryRateLimitStore,
+    RateLimit,
+    RateLimitedProvider,
+    RateLimitExceeded,
+    SQLiteRateLimitStore,
+    estimate_tokens,
+    limits_by_prefix,
+    rate_limit_key,
+)
+from ai.providers.resilience import CircuitBreaker, ResilientProvider, is_transient
+
+from tests.helpers import Clock, drain
+
+_MESSAGES = [{"role": "user", "content": "x" * 40}]
+
+
+class _UsageProvider(LLMProvider):
+    def __init__(self, total_tokens: int | None) -> None:
+        self.total_tokens = total_tokens
+        self.calls = 0
+
+    async def stream(self, messages, tools, model):
+        self.calls += 1
+        yield ChunkDelta(content="ok")
+        if self.total_tokens is not None:
+            yield ChunkDelta(usage=Usage(prompt_tokens=self.total_tokens, completion_tokens=0))
+
+
+class TestStores(unittest.IsolatedAsyncioTestCase):
+    """Tests for the bucket stores."""
+
+    async def _check_store(self, store) -> None:
+        # 1 per second, holding 2: two go at once, the third waits a second.
+        debit = [("k:rpm", 1, 1.0, 2)]
+        self.assertEqual([await store.reserve(debit, 0.0) for _ in range(3)], [0, 0, 1.0])
+        # Half a second later the debt is half paid; a refund pays the rest.
+        self.assertEqual(await store.reserve(debit, 0.5), 1.5)
+        await store.credit("k:rpm", 3, 1.0, 2, 0.5)
+        self.assertEqual(await store.reserve(debit, 0.5), 0)
+        # A bucket never refills past its capacity.
+        self.assertEqual(await store.reserve([("k:rpm", 3, 1.0, 2)], 100.0), 1.0)
+
+    async def test_memory_store(self) -> None:
+        await self._check_store(MemoryRateLimitStore())
+
+    async def test_sqlite_store_is_shared_between_instances(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "limits.db"
+            await self._check_store(SQLiteRateLimitStore(path))
+            other = SQLiteRateLimitStore(path)
+            # The first store left the bucket one request in debt at t=100.
+            self.assertEqual(await other.reserve([("k:rpm", 1, 1.0, 2)], 100.0), 2.0)
+            other.close()
+
+
+class TestRateLimitedProvider(unittest.IsolatedAsyncioTestCase):
+    """Tests for RateLimitedProvider."""
+
+    async def test_waits_for_tokens_then_reconciles_usage(self) -> None:
+        inner = _UsageProvider(total_tokens=10)
+        # 1000 tokens per second; each call is estimated at 30010 + 10 tokens.
+        provider = RateLimitedProvider(
+            inner,
+            lambda model: RateLimit(tpm=60_000),
+            completion_tokens=30_010,
+            clock=Clock(1000.0),
+        )
+        await drain(provider, _MESSAGES)
+        self.assertEqual(provider.throttled, 0)
+        # The first call used 10 tokens, not 30020: the rest went back to the bucket.
+        await drain(provider, _MESSAGES)
+        self.assertEqual(provider.throttled, 0)
+
+        inner.total_tokens = None
+        await drain(provider, _MESSAGES)
+        await drain(provider, _MESSAGES)  # no usage reported: the estimate stands
+        self.assertEqual(provider.throttled, 1)
+        self.assertAlmostEqual(provider.stats()["waitedSeconds"], 0.06, places=3)
+        self.assertEqual(inner.calls, 4)
+
+    async def test_max_wait_rejects_and_refunds(self) -> None:
+        inner = _UsageProvider(total_tokens=None)
+        provider = RateLimitedProvider(
+            inner, lambda model: RateLimit(rpm=1), max_wait=5, clock=Clock(1000.0)
+        )
+        await drain(provider, _MESSAGES)
+        with self.assertRaises(RateLimitExceeded) as caught:
+            await drain(provider, _MESSAGES)
+        self.assertFalse(is_transient(caught.exception))
+        self.assertAlmostEqual(caught.exception.retry_after, 60)
+        with self.assertRaises(RateLimitExceeded) as caught:
+            await drain(provider, _MESSAGES)
+        # The rejected call's reservation was refunded, so the wait did not grow.
+        self.assertAlmostEqual(caught.exception.retry_after, 60)
+        self.assertEqual(inner.calls, 1)
+
+    async def test_cancelled_wait_gives_reservation_back(self) -> None:
+        provider = RateLimitedProvider(
+            _UsageProvider(total_tokens=None), lambda model: RateLimit(rpm=1), clock=Clock(1000.0)
+        )
+        await drain(provider, _MESSAGES)
+        waiting = asyncio.create_task(drain(provider, _MESSAGES))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        provider.max_wait = 0
+        with self.assertRaises(RateLimitExceeded) as caught:
+            await drain(provider, _MESSAGES)
+        # One request in debt (60s), not two (120s).
+        self.assertAlmostEqual(caught.exception.retry_after, 60)
+
+    async def test_throttling_does_not_trip_the_breaker(self) -> None:
+        inner = _UsageProvider(total_tokens=None)
+        limited = RateLimitedProvider(
+            inner, lambda model: RateLimit(rpm=1), max_wait=0, clock=Clock(1000.0)
+        )
+        resilient = ResilientProvider(
+            limited, base_delay=0, breaker_factory=lambda: CircuitBreaker(min_calls=2)
+        )
+        await drain(resilient, _MESSAGES)
+        for _ in range(3):
+            with self.assertRaises(RateLimitExceeded):
+                await drain(resilient, _MESSAGES)
+        self.assertEqual(resilient.breaker("m").state, "closed")
+        self.assertEqual(resilient.retries, 0)
+
+    async def test_unlimited_models_and_separate_keys(self) -> None:
+        inner = _UsageProvider(total_tokens=None)
+        provider = RateLimitedProvider(
+            inner,
+            limits_by_prefix({"limited": {"rpm": 1}}),
+            max_wait=0,
+            clock=Clock(1000.0),
+        )
+        for _ in range(3):
+            await drain(provider, _MESSAGES, "free/model")
+        await drain(provider, _MESSAGES, "limited/a")
+        await drain(provider, _MESSAGES, "limited/b")  # its own bucket
+        with self.assertRaises(RateLimitExceeded):
+            await drain(provider, _MESSAGES, "limited/a")
+
+
+class TestHelpers(unittest.TestCase):
+    """Tests for limit lookup, keys and estimates."""
+
+    def test_most_specific_limit_wins(self) -> None:
+        lookup = limits_by_prefix(
+            {"gemini": {"rpm": 10}, "gemini/flash": {"tpm": 100}, "*": {"rpm": 1}}
+        )
+        self.assertEqual(lookup("gemini/flash"), RateLimit(tpm=100))
+        self.assertEqual(lookup("gemini/pro"), RateLimit(rpm=10))
+        self.assertEqual(lookup("openai/gpt"), RateLimit(rpm=1))
+        self.assertIsNone(limits_by_prefix({})("openai/gpt"))
+
+    def test_key_hides_api_key(self) -> None:
+        key = rate_limit_key("openai", "sk-secret", "gpt")
+        self.assertNotIn("sk-secret", key)
+        self.assertNotEqual(key, rate_limit_key("openai", "sk-other", "gpt"))
+        self.assertEqual(rate_limit_key("local", None, "m"), "local:-:m")
+
+    def test_estimate_counts_messages_tools_and_completion(self) -> None:
+        messages = [
+            {"role": "user", "content": "x" * 40},
+            {"role": "user", "content": [{"type": "text", "text": "y" * 20}]},
+            {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{"function": {"name": "f", "arguments": "z" * 20}}],
+            },
+        ]
+        self.assertEqual(estimate_tokens(messages, [], 100), 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
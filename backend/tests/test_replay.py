@@ -0,0 +1,109 @@
+"""Tests for the record/replay providers."""
+
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from ai.agent.loop import AgentLoop
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta, Usage
+from ai.providers.replay import RecordingProvider, ReplayProvider, load_fixture
+
+from src.ai.formatter import format_events
+
+
+class _SlowProvider(LLMProvider):
+    """Two chunks, 50 ms apart."""
+
+    async def stream(self, messages, tools, model):
+        yield ChunkDelta(tool_calls=[ToolCallDelta(index=0, id="c", name="t", arguments="{}")])
+        await asyncio.sleep(0.05)
+        yield ChunkDelta(content="done", finish_reason="stop", usage=Usage(3, 2, 1))
+
+
+class _EndlessProvider(LLMProvider):
+    """Streams until closed, then notes it."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def stream(self, messages, tools, model):
+        try:
+            while True:
+                yield ChunkDelta(content="x")
+        finally:
+            self.closed = True
+
+
+class TestRecordReplay(unittest.IsolatedAsyncioTestCase):
+    """Tests for RecordingProvider and ReplayProvider."""
+
+    async def asyncSetUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    async def _record(self, name: str) -> tuple[Path, list[ChunkDelta]]:
+        path = Path(self.dir.name) / name
+        recorder = RecordingProvider(_SlowProvider(), path)
+        chunks = [c async for c in recorder.stream([], [], "m")]
+        return path, chunks
+
+    async def test_round_trip(self) -> None:
+        for name in ("calls.jsonl", "calls.jsonl.gz"):
+            path, recorded = await self._record(name)
+            replayed = [c async for c in ReplayProvider(path, realtime=False).stream([], [], "m")]
+            self.assertEqual(replayed, recorded)
+            (call,) = load_fixture(path)
+            self.assertTrue(call["complete"])
+            self.assertGreaterEqual(call["chunks"][1]["d"], 45)
+
+    async def test_realtime_and_fast_modes(self) -> None:
+        path, _ = await self._record("calls.jsonl")
+
+        async def elapsed(provider: ReplayProvider) -> float:
+            started = time.perf_counter()
+            _ = [c async for c in provider.stream([], [], "m")]
+            return time.perf_counter() - started
+
+        self.assertGreaterEqual(await elapsed(ReplayProvider(path)), 0.045)
+        self.assertLess(await elapsed(ReplayProvider(path, realtime=False)), 0.01)
+
+    async def test_abandoned_stream_is_marked_incomplete(self) -> None:
+        path = Path(self.dir.name) / "calls.jsonl"
+        stream = RecordingProvider(_SlowProvider(), path).stream([], [], "m")
+        await anext(stream)
+        await stream.aclose()
+        (call,) = load_fixture(path)
+        self.assertFalse(call["complete"])
+        self.assertEqual(len(call["chunks"]), 1)
+
+    async def test_abandoned_stream_closes_inner(self) -> None:
+        inner = _EndlessProvider()
+        stream = RecordingProvider(inner, Path(self.dir.name) / "calls.jsonl").stream([], [], "m")
+        await anext(stream)
+        await stream.aclose()
+        self.assertTrue(inner.closed)
+
+    async def test_exhausted_fixture(self) -> None:
+        path, _ = await self._record("calls.jsonl")
+        provider = ReplayProvider(path, realtime=False)
+        _ = [c async for c in provider.stream([], [], "m")]
+        with self.assertRaises(RuntimeError):
+            _ = [c async for c in provider.stream([], [], "m")]
+        looping = ReplayProvider(path, realtime=False, loop=True)
+        for _ in range(3):
+            _ = [c async for c in looping.stream([], [], "m")]
+
+    async def test_replays_agent_run_through_formatter(self) -> None:
+        calls = [{"model": "m", "chunks": [{"d": 0, "c": "hel"}, {"d": 1, "c": "lo", "f": "stop"}]}]
+        loop = AgentLoop(ReplayProvider(calls, realtime=False), [], model="m")
+        lines = [line async for line in format_events(loop.run([]))]
+        deltas = [json.loads(line[6:])["delta"] for line in lines if '"text-delta"' in line]
+        self.assertEqual(deltas, ["hel", "lo"])
+        self.assertEqual(lines[-1], "data: [DONE]\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""Tests for provider retries and circuit breakers."""
+
+import unittest
+
+from ai.providers.base import ChunkDelta, LLMProvider
+from ai.providers.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientProvider,
+    is_transient,
+)
+
+from tests.helpers import Clock, drain
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _FlakyProvider(LLMProvider):
+    """Raises the queued errors, one per call, then streams normally."""
+
+    def __init__(self, *errors: Exception, fail_after_first_chunk: bool = False) -> None:
+        self.errors = list(errors)
+        self.fail_after_first_chunk = fail_after_first_chunk
+        self.calls = 0
+
+    async def stream(self, messages, tools, model):
+        self.calls += 1
+        if self.errors and not self.fail_after_first_chunk:
+            raise self.errors.pop(0)
+        yield ChunkDelta(content="ok")
+        if self.errors:
+            raise self.errors.pop(0)
+        yield ChunkDelta(finish_reason="stop")
+
+
+class TestResilientProvider(unittest.IsolatedAsyncioTestCase):
+    """Tests for ResilientProvider."""
+
+    async def test_retries_transient_errors_before_first_chunk(self) -> None:
+        inner = _FlakyProvider(_StatusError(429), _StatusError(503))
+        provider = ResilientProvider(inner, max_retries=2, base_delay=0.001)
+        chunks = await drain(provider)
+        self.assertEqual(chunks[0].content, "ok")
+        self.assertEqual((inner.calls, provider.retries), (3, 2))
+
+    async def test_gives_up_after_max_retries(self) -> None:
+        inner = _FlakyProvider(*(_StatusError(500) for _ in range(3)))
+        provider = ResilientProvider(inner, max_retries=1, base_delay=0.001)
+        with self.assertRaises(_StatusError):
+            await drain(provider)
+        self.assertEqual(inner.calls, 2)
+
+    async def test_client_errors_are_not_retried(self) -> None:
+        inner = _FlakyProvider(_StatusError(400))
+        provider = ResilientProvider(inner, base_delay=0.001)
+        with self.assertRaises(_StatusError):
+            await drain(provider)
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(provider.breaker("m").to_dict()["recentFailures"], 0)
+
+    async def test_errors_after_first_chunk_are_not_retried(self) -> None:
+        inner = _FlakyProvider(_StatusError(503), fail_after_first_chunk=True)
+        provider = ResilientProvider(inner, base_delay=0.001)
+        with self.assertRaises(_StatusError):
+            await drain(provider)
+        self.assertEqual(inner.calls, 1)
+
+    async def test_open_breaker_fails_fast(self) -> None:
+        inner = _FlakyProvider(*(_StatusError(503) for _ in range(2)))
+        provider = ResilientProvider(
+            inner,
+            max_retries=0,
+            breaker_factory=lambda: CircuitBreaker(min_calls=2, reset_timeout=60),
+        )
+        for _ in range(2):
+            with self.assertRaises(_StatusError):
+                await drain(provider)
+        with self.assertRaises(CircuitOpenError):
+            await drain(provider)
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(provider.status()["m"]["state"], OPEN)
+
+    async def test_client_error_on_probe_does_not_close_breaker(self) -> None:
+        clock = Clock()
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=10, clock=clock)
+        breaker.record(False)
+        clock.now = 10
+        inner = _FlakyProvider(_StatusError(400))
+        provider = ResilientProvider(inner, breaker_factory=lambda: breaker)
+        with self.assertRaises(_StatusError):
+            await drain(provider)
+        self.assertEqual(breaker.state, HALF_OPEN)
+        await drain(provider)  # the probe slot was released for the next call
+        self.assertEqual(breaker.state, CLOSED)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for CircuitBreaker."""
+
+    def test_opens_on_failure_rate_and_probes_after_timeout(self) -> None:
+        clock = Clock()
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, reset_timeout=10, clock=clock)
+        for ok in (True, False, True, False):
+            breaker.acquire("m")
+            breaker.record(ok)
+        self.assertEqual(breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.acquire("m")
+
+        clock.now = 10
+        self.assertEqual(breaker.state, HALF_OPEN)
+        breaker.acquire("m")
+        with self.assertRaises(CircuitOpenError):
+            breaker.acquire("m")  # only one probe at a time
+        breaker.record(True)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_failed_probe_reopens(self) -> None:
+        clock = Clock()
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=10, clock=clock)
+        breaker.record(False)
+        clock.now = 10
+        breaker.acquire("m")
+        breaker.record(False)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.to_dict()["retryAfter"], 10)
+
+    def test_old_outcomes_leave_the_window(self) -> None:
+        clock = Clock()
+        breaker = CircuitBreaker(min_calls=2, window=5, clock=clock)
+        breaker.record(False)
+        clock.now = 6
+        breaker.record(False)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_is_transient(self) -> None:
+        self.assertTrue(is_transient(_StatusError(429)))
+        self.assertTrue(is_transient(TimeoutError()))
+        self.assertFalse(is_transient(_StatusError(401)))
+        self.assertFalse(is_transient(ValueError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""Tests for the exact-match response cache."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ai.providers.base import ChunkDelta, LLMProvider, ToolCallDelta, Usage
+from ai.providers.cache import (
+    CachingProvider,
+    SQLiteResponseStore,
+    cache_key,
+    no_response_cache,
+)
+
+from tests.helpers import Clock, drain
+
+_MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class _CountingProvider(LLMProvider):
+    def __init__(self, finish_reason: str = "stop") -> None:
+        self.finish_reason = finish_reason
+        self.calls = 0
+
+    async def stream(self, messages, tools, model):
+        self.calls += 1
+        yield ChunkDelta(content="hel")
+        yield ChunkDelta(
+            content="lo",
+            tool_calls=[ToolCallDelta(index=0, id="c1", name="echo", arguments="{}")],
+        )
+        yield ChunkDelta(finish_reason=self.finish_reason)
+        yield ChunkDelta(usage=Usage(prompt_tokens=7, completion_tokens=2))
+
+
+class TestCachingProvider(unittest.IsolatedAsyncioTestCase):
+    """Tests for CachingProvider."""
+
+    async def test_hit_replays_recorded_stream_without_usage(self) -> None:
+        inner = _CountingProvider()
+        provider = CachingProvider(inner)
+        first = await drain(provider, _MESSAGES)
+        second = await drain(provider, _MESSAGES)
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual([c.content for c in second], [c.content for c in first])
+        self.assertEqual(second[1].tool_calls, first[1].tool_calls)
+        self.assertIsNone(second[-1].usage)
+        self.assertEqual((provider.hits, provider.misses), (1, 1))
+
+    async def test_different_requests_miss(self) -> None:
+        inner = _CountingProvider()
+        provider = CachingProvider(inner)
+        await drain(provider, _MESSAGES)
+        await drain(provider, [{"role": "user", "content": "other"}])
+        self.assertEqual(inner.calls, 2)
+
+    async def test_truncated_and_abandoned_streams_are_not_stored(self) -> None:
+        inner = _CountingProvider(finish_reason="length")
+        provider = CachingProvider(inner)
+        await drain(provider, _MESSAGES)
+        await drain(provider, _MESSAGES)
+        self.assertEqual(inner.calls, 2)
+
+        provider = CachingProvider(_CountingProvider())
+        stream = provider.stream(_MESSAGES, [], "m")
+        await anext(stream)
+        await stream.aclose()
+        self.assertEqual(provider.stats()["entries"], 0)
+
+    async def test_ttl_and_lru(self) -> None:
+        clock = Clock(1000.0)
+        inner = _CountingProvider()
+        provider = CachingProvider(inner, max_entries=1, ttl=10, clock=clock)
+        await drain(provider, _MESSAGES)
+        clock.now += 11
+        await drain(provider, _MESSAGES)
+        self.assertEqual(inner.calls, 2)
+
+        await drain(provider, [{"role": "user", "content": "other"}])
+        await drain(provider, _MESSAGES)
+        self.assertEqual(inner.calls, 4)
+
+    async def test_opt_out(self) -> None:
+        inner = _CountingProvider()
+        provider = CachingProvider(inner)
+        await drain(provider, _MESSAGES)
+        with no_response_cache():
+            await drain(provider, _MESSAGES)
+        self.assertEqual((inner.calls, provider.bypassed), (2, 1))
+
+    async def test_sqlite_tier_survives_new_provider(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteResponseStore(Path(tmp) / "cache.db")
+            inner = _CountingProvider()
+            await drain(CachingProvider(inner, store=store), _MESSAGES)
+            chunks = await drain(CachingProvider(inner, store=store), _MESSAGES)
+            self.assertEqual(inner.calls, 1)
+            self.assertEqual("".join(c.content or "" for c in chunks), "hello")
+            store.close()
+
+    async def test_sqlite_tier_purges_expired_and_excess_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteResponseStore(Path(tmp) / "cache.db", max_rows=2)
+            store.set("old", "m", [], expires_at=100.0)
+            for key in ("a", "b", "c"):
+                store.set(key, "m", [], expires_at=None)
+            self.assertEqual(store.purge(now=200.0), 2)
+            self.assertIsNone(store.get("old", now=0.0))
+            self.assertIsNone(store.get("a", now=0.0))
+            self.assertIsNotNone(store.get("c", now=0.0))
+            store.close()
+
+    async def test_writes_purge_the_sqlite_tier(self) -> None:
+        clock = Clock(1000.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteResponseStore(Path(tmp) / "cache.db")
+            store.set("stale", "m", [], expires_at=500.0)
+            provider = CachingProvider(_CountingProvider(), ttl=10, store=store, clock=clock)
+            with patch("ai.providers.cache._PURGE_EVERY", 2):
+                await drain(provider, _MESSAGES)
+                self.assertIsNotNone(store.get("stale", now=0.0))
+                await drain(provider, [{"role": "user", "content": "other"}])
+            self.assertIsNone(store.get("stale", now=0.0))
+            store.close()
+
+    def test_key_is_order_independent(self) -> None:
+        a = cache_key("m", [{"role": "user", "content": "x"}], [{"a": 1, "b": 2}])
+        b = cache_key("m", [{"content": "x", "role": "user"}], [{"b": 2, "a": 1}])
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, cache_key("n", [{"role": "user", "content": "x"}], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""Tests for detached agent runs and their event logs."""
+
+import asyncio
+import json
+import unittest
+import uuid
+
+from ai.agent.events import Finish, TextDelta
+
+from src.ai.formatter import format_run_log
+from src.ai.runs.registry import RunLog, RunRegistry
+from tests.helpers import Clock
+
+
+async def _text(n: int, gate: asyncio.Event | None = None):
+    for i in range(n):
+        yield TextDelta(id="t", delta=str(i))
+    if gate is not None:
+        await gate.wait()
+    yield Finish(finish_reason="stop")
+
+
+async def _hang():
+    yield TextDelta(id="t", delta="a")
+    await asyncio.sleep(60)
+
+
+async def _collect(entries):
+    return [entry async for entry in entries]
+
+
+def _types(entries: list[tuple[int, str]]) -> list[str]:
+    return [json.loads(payload)["type"] for _, payload in entries]
+
+
+class TestRunRegistry(unittest.IsolatedAsyncioTestCase):
+    """Tests for RunRegistry and RunLog."""
+
+    async def test_subscribers_share_one_execution(self) -> None:
+        calls = 0
+
+        async def events():
+            nonlocal calls
+            calls += 1
+            async for event in _text(3):
+                yield event
+
+        registry = RunRegistry()
+        user = uuid.uuid4()
+        run = registry.create(user, events())
+        first, second = await asyncio.gather(_collect(run.follow()), _collect(run.follow()))
+        self.assertEqual(calls, 1)
+        self.assertEqual(first, second)
+        self.assertEqual([event_id for event_id, _ in first], [1, 2, 3, 4])
+
+    async def test_resume_replays_then_tails(self) -> None:
+        gate = asyncio.Event()
+        registry = RunRegistry()
+        run = registry.create(uuid.uuid4(), _text(3, gate))
+        await asyncio.sleep(0)
+
+        resumed = asyncio.create_task(_collect(run.follow(after=2)))
+        await asyncio.sleep(0)
+        gate.set()
+        entries = await resumed
+        self.assertEqual([event_id for event_id, _ in entries], [3, 4])
+        self.assertEqual(_types(entries), ["text-delta", "finish"])
+
+    async def test_unfollowed_run_is_cancelled_after_grace(self) -> None:
+        clock = Clock()
+        registry = RunRegistry(orphan_grace=10, clock=clock)
+        run = registry.create(uuid.uuid4(), _hang())
+        await asyncio.sleep(0)
+        registry.sweep()
+        self.assertFalse(run.done)
+
+        clock.now = 11
+        registry.sweep()
+        await asyncio.gather(run.task)
+        self.assertTrue(run.done)
+        _, payload = run.entries()[-1]
+        self.assertEqual(json.loads(payload), {"type": "abort", "reason": "no subscribers"})
+
+    async def test_finished_run_expires_after_ttl(self) -> None:
+        clock = Clock()
+        registry = RunRegistry(ttl=60, clock=clock)
+        user = uuid.uuid4()
+        run = registry.create(user, _text(1))
+        await asyncio.gather(run.task)
+
+        self.assertIs(await registry.get(run.id, user), run)
+        self.assertIsNone(await registry.get(run.id, uuid.uuid4()))
+        clock.now = 61
+        self.assertIsNone(await registry.get(run.id, user))
+        self.assertEqual(len(registry), 0)
+
+    async def test_failure_ends_log_with_error(self) -> None:
+        async def events():
+            yield TextDelta(id="t", delta="a")
+            raise RuntimeError("boom")
+
+        run = RunRegistry().create(uuid.uuid4(), events())
+        entries = await _collect(run.follow())
+        self.assertEqual(_types(entries), ["text-delta", "error"])
+        self.assertTrue(run.done)
+
+    async def test_log_is_bounded(self) -> None:
+        run = RunLog("r", uuid.uuid4(), max_events=3)
+        for i in range(5):
+            run.append(TextDelta(id="t", delta=str(i)))
+        run.close()
+        self.assertEqual(run.first_id, 3)
+        self.assertEqual(await _collect(run.follow(after=0)), [])
+        self.assertEqual(len(await _collect(run.follow(after=2))), 3)
+
+    async def test_restore_round_trip(self) -> None:
+        run = RunLog("r", uuid.uuid4())
+        run.append(TextDelta(id="t", delta="a"))
+        run.append(Finish(finish_reason="stop"))
+        run.close()
+        restored = RunLog.restore(run.id, run.user_id, run.entries())
+        self.assertTrue(restored.done)
+        self.assertEqual(await _collect(restored.follow(after=1)), run.entries()[1:])
+
+
+class TestFormatRunLog(unittest.IsolatedAsyncioTestCase):
+    """Tests for format_run_log."""
+
+    async def test_frames_carry_ids_and_done(self) -> None:
+        run = RunLog("r", uuid.uuid4())
+        run.append(TextDelta(id="t", delta="a"))
+        run.close()
+        frames = [f async for f in format_run_log(run)]
+        self.assertEqual(
+            frames,
+            [
+                'id: 1\ndata: {"type": "text-delta", "id": "t", "delta": "a"}\n\n',
+                "data: [DONE]\n\n",
+            ],
+        )
+
+    async def test_disconnect_stops_without_done(self) -> None:
+        run = RunLog("r", uuid.uuid4())
+        run.append(TextDelta(id="t", delta="a"))
+
+        async def gone() -> bool:
+            return True
+
+        frames = [f async for f in format_run_log(run, 0, gone, poll_interval=0.01)]
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(run.subscribers, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Tests for the app's import cost and startup warmup."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from src.warmup import HEAVY_MODULES, Warmup
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Seconds `import src.main` may take in a fresh interpreter. Importing litellm alone
+# takes several, so this catches a heavy module creeping back onto the import path.
+_IMPORT_BUDGET = float(os.environ.get("IMPORT_BUDGET_SECONDS", "3.0"))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import src.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+class TestImportBudget(unittest.TestCase):
+    """`import src.main` stays cheap and leaves heavy modules for the warmup."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            cwd=_BACKEND_DIR,
+            env={**os.environ, "PYTHONPATH": str(_BACKEND_DIR)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        cls.result = json.loads(output.strip().splitlines()[-1])
+
+    def test_heavy_modules_are_not_imported(self) -> None:
+        loaded = set(self.result["modules"])
+        self.assertEqual([name for name in HEAVY_MODULES if name in loaded], [])
+
+    def test_import_time_within_budget(self) -> None:
+        self.assertLess(self.result["seconds"], _IMPORT_BUDGET)
+
+
+class TestWarmup(unittest.IsolatedAsyncioTestCase):
+    """Tests for Warmup."""
+
+    async def test_ready_after_all_steps_even_if_an_optional_one_fails(self) -> None:
+        release = asyncio.Event()
+
+        async def slow() -> str:
+            await release.wait()
+            return "done"
+
+        async def broken() -> None:
+            raise RuntimeError("no database")
+
+        warmup = Warmup({"slow": slow, "broken": broken})
+        warmup.start()
+        await asyncio.sleep(0)
+        self.assertFalse(warmup.status()["ready"])
+
+        release.set()
+        await warmup._task
+        status = warmup.status()
+        self.assertTrue(status["ready"])
+        self.assertEqual(status["steps"]["slow"]["detail"], "done")
+        self.assertEqual(status["steps"]["broken"]["status"], "error")
+        self.assertEqual(status["steps"]["broken"]["error"], "no database")
+        await warmup.aclose()
+
+    async def test_unready_until_critical_step_succeeds(self) -> None:
+        failures = 2
+
+        async def database() -> None:
+            nonlocal failures
+            if failures:
+                failures -= 1
+                raise RuntimeError("no database")
+
+        warmup = Warmup({"database": database}, critical=["database"], retry_interval=0.01)
+        warmup.start()
+        await asyncio.sleep(0.005)
+        status = warmup.status()
+        self.assertFalse(status["ready"])
+        self.assertEqual(status["steps"]["database"]["status"], "error")
+
+        await warmup._task
+        status = warmup.status()
+        self.assertTrue(status["ready"])
+        self.assertEqual(status["steps"]["database"]["status"], "ok")
+        self.assertEqual(status["steps"]["database"]["attempts"], 3)
+        await warmup.aclose()
+
+    async def test_no_steps_is_ready_at_once(self) -> None:
+        warmup = Warmup({})
+        await warmup.run()
+        self.assertTrue(warmup.ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Tests for the tools' shared HTTP runtime."""
+
+import asyncio
+import json
+import unittest
+
+import httpx
+from ai.agent.tools.runtime import HTTPCache, ToolRuntime, freshness
+from ai.agent.tools.weather import GetCurrentWeather
+
+from tests.helpers import Clock
+
+
+def _runtime(handler, clock=None, **kwargs) -> ToolRuntime:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = HTTPCache(clock=clock) if clock else HTTPCache()
+    return ToolRuntime(client=client, cache=cache, **kwargs)
+
+
+class TestFreshness(unittest.TestCase):
+    """Tests for freshness()."""
+
+    def test_cache_control_wins_over_default(self) -> None:
+        def headers(**values: str) -> httpx.Headers:
+            return httpx.Headers({k.replace("_", "-"): v for k, v in values.items()})
+
+        self.assertEqual(freshness(headers(cache_control="max-age=60"), 300), 60)
+        self.assertEqual(freshness(headers(cache_control="public, max-age=60", age="20"), 0), 40)
+        self.assertIsNone(freshness(headers(cache_control="no-store"), 300))
+        self.assertIsNone(freshness(headers(cache_control="no-cache, max-age=60"), 300))
+        self.assertIsNone(freshness(headers(cache_control="max-age=0"), 300))
+        self.assertIsNone(freshness(headers(cache_control="private, max-age=60"), 300))
+        self.assertIsNone(freshness(headers(vary="*"), 300))
+        self.assertEqual(freshness(headers(), 300), 300)
+        self.assertIsNone(freshness(headers(), None))
+        expires = headers(
+            date="Mon, 01 Jan 2024 00:00:00 GMT", expires="Mon, 01 Jan 2024 00:02:00 GMT"
+        )
+        self.assertEqual(freshness(expires, None), 120)
+
+
+class TestToolRuntime(unittest.IsolatedAsyncioTestCase):
+    """Tests for ToolRuntime."""
+
+    async def test_weather_for_same_point_hits_cache(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"current": {"temperature_2m": 21.5}})
+
+        clock = Clock(1000.0)
+        tool = GetCurrentWeather()
+        tool.runtime = _runtime(handler, clock)
+        point = GetCurrentWeather.Input(latitude=52.52, longitude=13.41)
+        first = await tool.execute(point)
+        clock.now += 60
+        second = await tool.execute(point)
+        await tool.execute(GetCurrentWeather.Input(latitude=48.85, longitude=2.35))
+
+        self.assertEqual(first, second)
+        self.assertEqual(json.loads(second)["current"]["temperature_2m"], 21.5)
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0].url.params["latitude"], "52.52")
+
+        clock.now += GetCurrentWeather.http_cache_ttl
+        await tool.execute(point)
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(tool.runtime.stats()["cacheHits"], 1)
+        await tool.runtime.aclose()
+
+    async def test_no_store_and_errors_are_not_cached(self) -> None:
+        statuses = iter([500, 200, 200])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(next(statuses), headers={"Cache-Control": "no-store"}, text="x")
+
+        runtime = _runtime(handler)
+        responses = [await runtime.get("https://api.test/a", cache_ttl=60) for _ in range(3)]
+        self.assertEqual([r.status_code for r in responses], [500, 200, 200])
+        self.assertEqual((runtime.requests, len(runtime.cache)), (3, 0))
+        await runtime.aclose()
+
+    async def test_request_headers_and_credentials(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            language = request.headers.get("accept-language", "-")
+            return httpx.Response(200, headers={"Vary": "Accept-Language"}, text=language)
+
+        runtime = _runtime(handler)
+        url = "https://api.test/a"
+        german, english = {"Accept-Language": "de"}, {"Accept-Language": "en"}
+        texts = [
+            (await runtime.get(url, headers=headers, cache_ttl=60)).text
+            for headers in (german, english, german, english)
+        ]
+        self.assertEqual(texts, ["de", "en", "de", "en"])
+        self.assertEqual(runtime.requests, 2)
+
+        for name, value in (("Authorization", "Bearer a"), ("Cookie", "session=a")):
+            for _ in range(2):
+                await runtime.get(url, headers={name: value}, cache_ttl=60)
+        self.assertEqual((runtime.requests, len(runtime.cache)), (6, 2))
+        await runtime.aclose()
+
+    async def test_per_host_concurrency_limit(self) -> None:
+        active, peak = {"a.test": 0, "b.test": 0}, {"a.test": 0, "b.test": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            host = request.url.host
+            active[host] += 1
+            peak[host] = max(peak[host], active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+            return httpx.Response(200)
+
+        runtime = _runtime(handler, max_per_host=2)
+        urls = [f"https://{host}/{i}" for host in active for i in range(5)]
+        await asyncio.gather(*(runtime.get(url) for url in urls))
+        self.assertEqual(peak, {"a.test": 2, "b.test": 2})
+        await runtime.aclose()
+
+    async def test_aclose_then_reopens(self) -> None:
+        runtime = ToolRuntime(timeout=3, connect_timeout=1)
+        client = runtime.client
+        self.assertIs(runtime.client, client)
+        self.assertEqual(client.timeout.read, 3)
+        await runtime.aclose()
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(runtime.client, client)
+        await runtime.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
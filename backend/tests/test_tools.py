@@ -1,148 +1,273 @@
-"""Tests for tool registry and schema extraction."""
+"""Tests for tool schemas, the tool catalog and the tool result cache."""
 
+import asyncio
 import unittest
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 
-from src.ai.tools import AVAILABLE_TOOLS, TOOL_DEFINITIONS
-from src.ai.tools.schema import function_to_openai_tool
+from ai.agent.tools.base import Tool
+from ai.agent.tools.cache import ToolResultCache, cache_key
+from ai.agent.tools.catalog import ToolCatalog
+from ai.agent.tools.runtime import ToolRuntime
+from ai.agent.tools.weather import GetCurrentWeather
+from pydantic import BaseModel, Field
 
+from ai.mcp import MCPToolWrapper
 
-def _sample_tool(lat: float, lon: float) -> str:
-    """Get weather at a place.
 
-    Args:
-        lat: Latitude of the location
-        lon: Longitude of the location
+class _EchoTool(Tool):
+    """Echo the given text."""
 
-    Returns:
-        A string.
-    """
-    return f"{lat},{lon}"
+    name = "echo"
 
+    class Input(BaseModel):
+        text: str = Field(description="Text to echo")
+        times: int = 1
 
-def _tool_with_default(a: int, b: int = 1) -> str:
-    """Tool with a default parameter."""
-    return f"{a},{b}"
+    async def execute(self, input: Input) -> str:
+        return input.text * input.times
 
 
-def _tool_with_optional(x: str | None) -> str:
-    """Tool with optional parameter (pipe syntax)."""
-    return x or ""
+class _CountingTool(Tool):
+    """Count executions; cacheable."""
 
+    name = "counting"
+    cacheable = True
+    result_cache = ToolResultCache()
 
-def _tool_complex_types(
-    ids: list[int],
-    counts: dict[str, int],
-    value: str | int,
-) -> str:
-    """Tool with list, dict, and union type args."""
-    return str(ids) + str(counts) + str(value)
+    class Input(BaseModel):
+        key: str
 
+    def __init__(self) -> None:
+        self.calls = 0
 
-def _tool_no_docstring(a: int, b: str) -> bool:
-    return True
+    async def execute(self, input: Input) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"{input.key}:{self.calls}"
 
 
-class TestSchemaExtractor(unittest.TestCase):
-    """Tests for function_to_openai_tool."""
+def _mcp_tool(server: str, name: str, schema: dict, annotations: object = None) -> MCPToolWrapper:
+    tool_def = SimpleNamespace(
+        name=name, description=f"{name} tool", inputSchema=schema, annotations=annotations
+    )
+    return MCPToolWrapper(Mock(), server, tool_def)
+
+
+class TestToolSchema(unittest.TestCase):
+    """Tests for Tool.to_schema."""
 
     def test_returns_openai_format(self) -> None:
-        """Result has type, function.name, function.description, function.parameters."""
-        result = function_to_openai_tool("_sample_tool", _sample_tool)
-        self.assertEqual(result["type"], "function")
-        self.assertIn("function", result)
-        fn = result["function"]
-        self.assertEqual(fn["name"], "_sample_tool")
-        self.assertIn("description", fn)
-        self.assertIn("parameters", fn)
+        """Schema has type, function.name, function.description, function.parameters."""
+        fn = _EchoTool().to_schema()["function"]
+        self.assertEqual(fn["name"], "echo")
+        self.assertEqual(fn["description"], "Echo the given text.")
         self.assertEqual(fn["parameters"]["type"], "object")
-        self.assertIn("properties", fn["parameters"])
-        self.assertIn("required", fn["parameters"])
-
-    def test_parameter_schema_from_type_hints(self) -> None:
-        """Parameters get correct JSON Schema types from annotations."""
-        result = function_to_openai_tool("_sample_tool", _sample_tool)
-        props = result["function"]["parameters"]["properties"]
-        self.assertEqual(props["lat"]["type"], "number")
-        self.assertEqual(props["lon"]["type"], "number")
-        self.assertEqual(props["lat"]["description"], "Latitude of the location")
-        self.assertEqual(props["lon"]["description"], "Longitude of the location")
-        self.assertCountEqual(result["function"]["parameters"]["required"], ["lat", "lon"])
-
-    def test_default_parameter_not_required(self) -> None:
-        """Parameters with default values are not in required."""
-        result = function_to_openai_tool("_tool_with_default", _tool_with_default)
-        required = result["function"]["parameters"]["required"]
-        self.assertIn("a", required)
-        self.assertNotIn("b", required)
-        props = result["function"]["parameters"]["properties"]
-        self.assertEqual(props["b"]["type"], "integer")
-
-    def test_optional_parameter_not_required(self) -> None:
-        """Optional (str | None) parameter is not in required."""
-        result = function_to_openai_tool("_tool_with_optional", _tool_with_optional)
-        required = result["function"]["parameters"]["required"]
-        self.assertNotIn("x", required)
-        props = result["function"]["parameters"]["properties"]
-        self.assertEqual(props["x"]["type"], "string")
-
-    def test_complex_type_annotations(self) -> None:
-        """list[int], dict[str, int], and str | int get correct schema."""
-        result = function_to_openai_tool("_tool_complex_types", _tool_complex_types)
-        props = result["function"]["parameters"]["properties"]
-        self.assertEqual(props["ids"]["type"], "array")
-        self.assertIn("items", props["ids"])
-        self.assertEqual(props["ids"]["items"]["type"], "integer")
-        self.assertEqual(props["counts"]["type"], "object")
-        self.assertIn("additionalProperties", props["counts"])
-        self.assertEqual(props["counts"]["additionalProperties"]["type"], "integer")
-        self.assertEqual(props["value"]["type"], "string")
-
-    def test_function_without_docstring(self) -> None:
-        """Function without docstring gets empty description and types from annotations."""
-        result = function_to_openai_tool("_tool_no_docstring", _tool_no_docstring)
-        fn = result["function"]
-        self.assertEqual(fn["description"], "")
-        props = fn["parameters"]["properties"]
-        self.assertEqual(props["a"]["type"], "integer")
-        self.assertEqual(props["b"]["type"], "string")
-
-
-class TestRegistry(unittest.TestCase):
-    """Tests for TOOL_DEFINITIONS and AVAILABLE_TOOLS."""
-
-    def test_registry_exports_get_current_weather(self) -> None:
-        """Registry includes get_current_weather in definitions and implementations."""
-        names = [d["function"]["name"] for d in TOOL_DEFINITIONS]
-        self.assertIn("get_current_weather", names)
-        self.assertIn("get_current_weather", AVAILABLE_TOOLS)
-        self.assertTrue(callable(AVAILABLE_TOOLS["get_current_weather"]))
+        self.assertEqual(fn["parameters"]["properties"]["text"]["description"], "Text to echo")
+        self.assertEqual(fn["parameters"]["required"], ["text"])
 
     def test_get_current_weather_schema_shape(self) -> None:
         """get_current_weather definition matches expected OpenAI shape."""
-        by_name = {d["function"]["name"]: d for d in TOOL_DEFINITIONS}
-        self.assertIn("get_current_weather", by_name)
-        fn = by_name["get_current_weather"]["function"]
+        fn = GetCurrentWeather().to_schema()["function"]
         self.assertEqual(fn["name"], "get_current_weather")
         self.assertGreater(len(fn["description"]), 0)
         params = fn["parameters"]
-        self.assertEqual(params["type"], "object")
-        self.assertIn("latitude", params["properties"])
-        self.assertIn("longitude", params["properties"])
         self.assertEqual(params["properties"]["latitude"]["type"], "number")
         self.assertEqual(params["properties"]["longitude"]["type"], "number")
         self.assertCountEqual(params["required"], ["latitude", "longitude"])
 
-    def test_get_current_weather_callable(self) -> None:
-        """AVAILABLE_TOOLS['get_current_weather'] can be called with latitude, longitude."""
-        mock_response = Mock()
-        mock_response.json.return_value = {"current": {"temperature_2m": 10}}
-        mock_response.raise_for_status = Mock()
-        with patch(
-            "src.ai.tools.get_current_weather.requests.get",
-            return_value=mock_response,
-        ):
-            fn = AVAILABLE_TOOLS["get_current_weather"]
-            result = fn(latitude=52.52, longitude=13.405)
-        self.assertIsInstance(result, dict)
-        self.assertEqual(result, {"current": {"temperature_2m": 10}})
+    def test_schema_is_generated_once_per_class(self) -> None:
+        """Instances of a class share one schema; other classes get their own."""
+        self.assertIs(_EchoTool().to_schema(), _EchoTool().to_schema())
+        self.assertIsNot(_EchoTool().to_schema(), GetCurrentWeather().to_schema())
+
+    def test_mcp_schema_cached_by_definition(self) -> None:
+        """MCP schemas are shared across sessions while the tool definition is unchanged."""
+        schema = {"properties": {"path": {"type": "string"}}}
+        first = _mcp_tool("files", "read_file", schema)
+        second = _mcp_tool("files", "read_file", dict(schema))
+        changed = _mcp_tool("files", "read_file", {"properties": {}})
+
+        self.assertEqual(first.schema_key, second.schema_key)
+        self.assertIs(first.to_schema(), second.to_schema())
+        self.assertNotEqual(first.schema_key, changed.schema_key)
+        fn = first.to_schema()["function"]
+        self.assertEqual(fn["name"], "files:read_file")
+        self.assertEqual(fn["parameters"]["type"], "object")
+
+
+class TestToolCatalog(unittest.TestCase):
+    """Tests for ToolCatalog."""
+
+    def test_build_maps_names_to_tools_and_schemas(self) -> None:
+        echo, weather = _EchoTool(), GetCurrentWeather()
+        catalog = ToolCatalog.build([echo, weather])
+        self.assertIs(catalog.tools["echo"], echo)
+        self.assertIn("get_current_weather", catalog)
+        self.assertEqual(len(catalog.schemas), 2)
+        with self.assertRaises(TypeError):
+            catalog.tools["x"] = echo  # type: ignore[index]
+
+    def test_rebind_keeps_schemas_for_same_signature(self) -> None:
+        catalog = ToolCatalog.build([_EchoTool(), _mcp_tool("s", "t", {})])
+        fresh = [_EchoTool(), _mcp_tool("s", "t", {})]
+        rebound = catalog.rebind(fresh)
+        self.assertIs(rebound.schemas, catalog.schemas)
+        self.assertIs(rebound.tools["echo"], fresh[0])
+
+    def test_rebind_rebuilds_when_tools_change(self) -> None:
+        catalog = ToolCatalog.build([_EchoTool()])
+        rebound = catalog.rebind([_EchoTool(), GetCurrentWeather()])
+        self.assertEqual(len(rebound.schemas), 2)
+
+    def test_extend_appends_tools(self) -> None:
+        catalog = ToolCatalog.build([_EchoTool()])
+        extended = catalog.extend([GetCurrentWeather()])
+        self.assertEqual(list(extended.tools), ["echo", "get_current_weather"])
+        self.assertEqual(len(catalog), 1)
+
+
+class TestGetCurrentWeather(unittest.IsolatedAsyncioTestCase):
+    """Tests for GetCurrentWeather.call."""
+
+    async def test_returns_api_json(self) -> None:
+        response = Mock()
+        response.json.return_value = {"current": {"temperature_2m": 10}}
+        with patch.object(ToolRuntime, "get", AsyncMock(return_value=response)) as get:
+            result = await GetCurrentWeather().call({"latitude": 52.52, "longitude": 13.405})
+        self.assertEqual(result, '{"current": {"temperature_2m": 10}}')
+        self.assertEqual(get.call_args.kwargs["params"]["latitude"], 52.52)
+
+
+class TestToolResultCache(unittest.IsolatedAsyncioTestCase):
+    """Tests for ToolResultCache and cacheable tools."""
+
+    async def asyncSetUp(self) -> None:
+        self.now = 0.0
+        self.cache = ToolResultCache(max_entries=2, clock=lambda: self.now)
+
+    async def _get(self, key: str, output: str, ttl: float | None = None) -> str:
+        async def call() -> str:
+            return output
+
+        return await self.cache.get_or_call(key, call, ttl=ttl)
+
+    async def test_hit_after_miss(self) -> None:
+        self.assertEqual(await self._get("k", "first"), "first")
+        self.assertEqual(await self._get("k", "second"), "first")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    async def test_ttl_expiry(self) -> None:
+        await self._get("k", "first", ttl=10)
+        self.now = 11
+        self.assertEqual(await self._get("k", "second", ttl=10), "second")
+
+    async def test_lru_eviction(self) -> None:
+        await self._get("a", "a")
+        await self._get("b", "b")
+        await self._get("a", "-")  # a becomes most recently used
+        await self._get("c", "c")
+        self.assertEqual(await self._get("a", "new"), "a")
+        self.assertEqual(await self._get("b", "new"), "new")
+
+    async def test_concurrent_calls_coalesce(self) -> None:
+        tool = _CountingTool()
+        results = await asyncio.gather(*(tool.call({"key": "x"}) for _ in range(5)))
+        self.assertEqual(set(results), {"x:1"})
+        self.assertEqual(tool.calls, 1)
+        self.assertEqual(await tool.call({"key": "y"}), "y:2")
+
+    async def test_exceptions_are_not_cached(self) -> None:
+        async def fail() -> str:
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            await self.cache.get_or_call("k", fail)
+        self.assertEqual(await self._get("k", "ok"), "ok")
+
+    async def test_mcp_annotations_control_caching(self) -> None:
+        read_only = _mcp_tool("s", "read", {}, SimpleNamespace(readOnlyHint=True))
+        idempotent = _mcp_tool(
+            "s", "put", {}, SimpleNamespace(readOnlyHint=False, idempotentHint=True)
+        )
+        plain = _mcp_tool("s", "write", {})
+        self.assertTrue(read_only.cacheable)
+        self.assertEqual(read_only.cache_ttl, 60.0)
+        self.assertTrue(idempotent.cacheable)
+        self.assertEqual(idempotent.cache_ttl, 0)
+        self.assertFalse(plain.cacheable)
+
+    async def test_mcp_write_invalidates_server_reads(self) -> None:
+        from mcp.types import CallToolResult, TextContent
+
+        state = {"value": "old"}
+
+        async def call_tool(name: str, arguments: dict) -> CallToolResult:
+            if name == "write":
+                state["value"] = arguments["value"]
+            return CallToolResult(content=[TextContent(type="text", text=state["value"])])
+
+        session = Mock(call_tool=call_tool)
+        read_only = SimpleNamespace(readOnlyHint=True)
+        tools = {
+            (server, name): MCPToolWrapper(
+                session,
+                server,
+                SimpleNamespace(name=name, description=None, inputSchema={}, annotations=hint),
+                cache_scope=server,
+            )
+            for server in ("a", "b")
+            for name, hint in (("read", read_only), ("write", None))
+        }
+        with patch.object(Tool, "result_cache", self.cache):
+            self.assertEqual(await tools["a", "read"].call({}), "old")
+            self.assertEqual(await tools["b", "read"].call({}), "old")
+            self.assertEqual(await tools["a", "write"].call({"value": "new"}), "new")
+            self.assertEqual(await tools["a", "read"].call({}), "new")
+            # Another server's entries are left alone.
+            self.assertEqual(await tools["b", "read"].call({}), "old")
+
+    async def test_unscoped_mcp_write_keeps_builtin_entries(self) -> None:
+        from mcp.types import CallToolResult, TextContent
+
+        async def call_tool(name: str, arguments: dict) -> CallToolResult:
+            return CallToolResult(content=[TextContent(type="text", text="done")])
+
+        write = MCPToolWrapper(
+            Mock(call_tool=call_tool),
+            "s",
+            SimpleNamespace(name="write", description=None, inputSchema={}, annotations=None),
+        )
+        await self.cache.get_or_call(cache_key("weather", {}), self._output("sunny"))
+        with patch.object(Tool, "result_cache", self.cache):
+            self.assertEqual(await write.call({}), "done")
+        self.assertEqual(
+            await self.cache.get_or_call(cache_key("weather", {}), self._output("rain")), "sunny"
+        )
+
+    async def test_invalidate_drops_running_calls(self) -> None:
+        started = asyncio.Event()
+
+        async def slow() -> str:
+            started.set()
+            await asyncio.sleep(0.01)
+            return "stale"
+
+        key = ("s", "read", "{}")
+        running = asyncio.create_task(self.cache.get_or_call(key, slow))
+        await started.wait()
+        self.cache.invalidate("s")
+        self.assertEqual(await self.cache.get_or_call(key, self._output("fresh")), "fresh")
+        self.assertEqual(await running, "stale")
+        self.assertEqual(await self.cache.get_or_call(key, self._output("later")), "fresh")
+
+    @staticmethod
+    def _output(output: str):
+        async def call() -> str:
+            return output
+
+        return call
+
+
+if __name__ == "__main__":
+    unittest.main()
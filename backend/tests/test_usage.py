@@ -0,0 +1,108 @@
+"""Tests for token usage capture and the batched usage writer."""
+
+import asyncio
+import time
+import unittest
+import uuid
+from unittest.mock import Mock
+
+from ai.agent.loop import AgentLoop
+from ai.providers.base import ChunkDelta, LLMProvider, Usage
+
+from src.ai.usage.repository import UsageTotals
+from src.ai.usage.writer import UsageWriter
+
+
+class _UsageProvider(LLMProvider):
+    """Reports usage on a trailing chunk, the way streamed usage arrives."""
+
+    async def stream(self, messages, tools, model):
+        yield ChunkDelta(content="hi", finish_reason="stop")
+        yield ChunkDelta(usage=Usage(prompt_tokens=5, completion_tokens=1))
+        yield ChunkDelta(usage=Usage(prompt_tokens=10, completion_tokens=2, cached_tokens=4))
+
+
+class _RecordingWriter(UsageWriter):
+    def __init__(self, fail: bool = False, **kwargs) -> None:
+        super().__init__(Mock(), **kwargs)
+        self.fail = fail
+        self.batches: list[list[UsageTotals]] = []
+
+    def _write(self, totals: list[UsageTotals]) -> None:
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append(totals)
+
+
+class TestAgentLoopUsage(unittest.IsolatedAsyncioTestCase):
+    """Tests for AgentLoop.usage."""
+
+    async def test_keeps_latest_usage_per_call(self) -> None:
+        loop = AgentLoop(_UsageProvider(), [], model="m")
+        _ = [e async for e in loop.run([{"role": "user", "content": "hi"}])]
+        self.assertEqual(loop.usage, Usage(prompt_tokens=10, completion_tokens=2, cached_tokens=4))
+        self.assertEqual(loop.usage.total_tokens, 12)
+
+
+class TestUsageWriter(unittest.IsolatedAsyncioTestCase):
+    """Tests for UsageWriter."""
+
+    async def test_aggregates_per_user_and_model(self) -> None:
+        writer = _RecordingWriter()
+        user = uuid.uuid4()
+        writer.add(user, "a", Usage(prompt_tokens=1, completion_tokens=2))
+        writer.add(user, "a", Usage(prompt_tokens=3, cached_tokens=1))
+        writer.add(user, "b", Usage(completion_tokens=7))
+        await writer.flush()
+
+        (batch,) = writer.batches
+        by_model = {t.model: t for t in batch}
+        self.assertEqual(by_model["a"], UsageTotals(user, "a", 4, 2, 1, 2))
+        self.assertEqual(by_model["b"], UsageTotals(user, "b", 0, 7, 0, 1))
+        await writer.flush()
+        self.assertEqual(len(writer.batches), 1)
+
+    async def test_failed_flush_is_retried(self) -> None:
+        writer = _RecordingWriter(fail=True)
+        user = uuid.uuid4()
+        writer.add(user, "a", Usage(prompt_tokens=1))
+        with self.assertLogs("src.ai.usage.writer", level="ERROR"):
+            await writer.flush()
+        writer.add(user, "a", Usage(prompt_tokens=2))
+        writer.fail = False
+        await writer.flush()
+        self.assertEqual(writer.batches[0][0].prompt_tokens, 3)
+        self.assertEqual(writer.batches[0][0].runs, 2)
+
+    async def test_background_flush_and_close(self) -> None:
+        writer = _RecordingWriter(flush_interval=60, max_pending=2)
+        writer.start()
+        writer.add(uuid.uuid4(), "a", Usage(prompt_tokens=1))
+        writer.add(uuid.uuid4(), "a", Usage(prompt_tokens=1))
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(writer.batches), 1)
+        writer.add(uuid.uuid4(), "a", Usage(prompt_tokens=1))
+        await writer.aclose()
+        self.assertEqual(len(writer.batches), 2)
+
+    async def test_close_waits_for_running_flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        writing = asyncio.Event()
+
+        class _SlowWriter(_RecordingWriter):
+            def _write(self, totals: list[UsageTotals]) -> None:
+                loop.call_soon_threadsafe(writing.set)
+                time.sleep(0.05)
+                super()._write(totals)
+
+        writer = _SlowWriter(flush_interval=60, max_pending=1)
+        writer.start()
+        writer.add(uuid.uuid4(), "a", Usage(prompt_tokens=1))
+        await writing.wait()
+        await writer.aclose()
+        self.assertEqual(len(writer.batches), 1)
+        self.assertEqual(writer.batches[0][0].prompt_tokens, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()